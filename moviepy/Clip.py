@@ -2,7 +2,11 @@
 are common to the two subclasses of Clip, VideoClip and AudioClip.
 """
 
+import asyncio
 import copy as _copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import reduce
 from numbers import Real
 from operator import add
@@ -25,6 +29,217 @@ from moviepy.decorators import (
 )
 
 
+# State of the render pass of the current thread, if any (see ``render_pass``)
+RENDER_PASS = threading.local()
+
+
+@contextmanager
+def render_pass(shared=None):
+    """Context in which the frames of the clips used several times to compute
+    a frame, like a video used both as a blurred background and as foreground
+    of a composition, or a clip and the mask derived from it, are computed only
+    once per frame.
+
+    The frames computed by ``get_frame`` at the times asked for a frame are
+    kept until a frame at another time is asked, for the frame functions asked
+    twice for a frame. The copies of a clip (like the clips returned by
+    ``with_position`` or ``with_effects``) share its frame function, so they
+    share its frames too. Nested render passes are part of the first one.
+    Render passes are specific to a thread. The frames of a clip are only kept
+    from the frame where it is first found shared, so a render pass is best
+    kept for all the frames rendered by the thread, or given the set
+    ``shared`` of the frame functions found shared by the previous render
+    passes of the frames, which it updates.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        with render_pass():
+            for t in times:
+                frame, mask = clip.get_frame(t), clip.mask.get_frame(t)
+    """
+    started = start_render_pass(shared)
+    try:
+        yield
+    finally:
+        if started:
+            stop_render_pass()
+
+
+def start_render_pass(shared=None):
+    """Starts a render pass in the current thread (see ``render_pass``), for
+    the threads and processes rendering frames until they end, and returns
+    True, or returns False if the thread is already in a render pass.
+    ``shared`` is the set of the frame functions already found shared, if any.
+    """
+    if getattr(RENDER_PASS, "frames", None) is not None:
+        return False
+
+    # frames of the shared frame functions and number of requests of the
+    # frames, at the time of the current frame
+    RENDER_PASS.frames, RENDER_PASS.requests, RENDER_PASS.time = {}, {}, None
+    RENDER_PASS.shared = set() if shared is None else shared
+    RENDER_PASS.depth = 0
+    return True
+
+
+def stop_render_pass():
+    """Ends the render pass of the current thread, started with
+    ``start_render_pass``.
+    """
+    RENDER_PASS.frames = RENDER_PASS.requests = RENDER_PASS.shared = None
+
+
+@contextmanager
+def render_pass_executor():
+    """Context returning an executor computing the functions submitted to it
+    one after the other in a thread of its own, in a single render pass (see
+    ``render_pass``), to compute the frames of a clip in asyncio coroutines
+    with ``loop.run_in_executor``. The thread is stopped when leaving the
+    context, without waiting for the function it computes.
+    """
+    executor = ThreadPoolExecutor(1, initializer=start_render_pass)
+    try:
+        yield executor
+    finally:
+        executor.shutdown(wait=False)
+
+
+def request_render_pass_frame(key):
+    """Returns the frame ``key``, as ``(frame_function, t)``, if it is kept by
+    the render pass of the current thread, else counts its request and returns
+    None (see ``render_pass``).
+    """
+    if (RENDER_PASS.depth == 0) and (key[1] != RENDER_PASS.time):
+        # a new frame is rendered, the previous one is emitted
+        RENDER_PASS.frames.clear()
+        RENDER_PASS.requests.clear()
+        RENDER_PASS.time = key[1]
+
+    if key in RENDER_PASS.frames:
+        return RENDER_PASS.frames[key]
+    RENDER_PASS.requests[key] = RENDER_PASS.requests.get(key, 0) + 1
+    if RENDER_PASS.requests[key] > 1:
+        RENDER_PASS.shared.add(key[0])
+    return None
+
+
+def keep_render_pass_frame(key, frame):
+    """Keeps the computed frame ``key``, as ``(frame_function, t)``, in the
+    render pass of the current thread if its frame function is shared.
+    """
+    if key[0] in RENDER_PASS.shared:
+        RENDER_PASS.frames[key] = frame
+
+
+def compute_frame(frame_function, t):
+    """Returns ``frame_function(t)``, computed once for all its uses if the
+    current thread is in a render pass and the frame function is shared, like
+    ``Clip.get_frame``.
+    """
+    if (getattr(RENDER_PASS, "frames", None) is None) or not isinstance(t, Real):
+        return frame_function(t)
+
+    # the keys keep the frame functions alive, so that they are not mistaken
+    # for new ones with the same id
+    key = (frame_function, t)
+    frame = request_render_pass_frame(key)
+    if frame is None:
+        RENDER_PASS.depth += 1
+        try:
+            frame = frame_function(t)
+        finally:
+            RENDER_PASS.depth -= 1
+        keep_render_pass_frame(key, frame)
+    return frame
+
+
+def run_frame_steps(get_frame, steps, t, reuse_last=False):
+    """Returns the frame at time ``t`` of a clip made with the steps ``steps``
+    (see ``Clip.with_frame_step``) from a clip whose frames are given by
+    ``get_frame``.
+
+    The steps are run in a loop, from the last one: the changes of time are
+    applied to ``t``, the frame is computed, and the transformations of images
+    are applied to it. Only the steps of ``transform`` get a function giving
+    the frames before them.
+
+    In a render pass, the frames of the clips made by the steps are kept and
+    reused when they are shared, like the frames of ``get_frame`` (see
+    ``render_pass``), except the frame of the clip made by the last step unless
+    ``reuse_last``, since ``get_frame`` does it for the clips made with steps.
+    """
+    in_render_pass = (getattr(RENDER_PASS, "frames", None) is not None) and (
+        RENDER_PASS.depth > 0
+    )
+    # image functions and render pass keys of the steps run, from the last one
+    steps_run = []
+    for index in range(len(steps) - 1, -1, -1):
+        kind, func, frame_function, _ = steps[index]
+        key = None
+        if (
+            in_render_pass
+            and (reuse_last or (index < len(steps) - 1))
+            and isinstance(t, Real)
+        ):
+            key = (frame_function, t)
+            frame = request_render_pass_frame(key)
+            if frame is not None:
+                break
+        steps_run.append((func if kind == "image" else None, key))
+        if kind == "time":
+            t = func(t)
+        elif kind == "transform":
+            previous_steps = steps[:index]
+            frame = func(
+                lambda t: run_frame_steps(get_frame, previous_steps, t, True), t
+            )
+            break
+    else:
+        frame = get_frame(t)
+
+    for image_func, key in reversed(steps_run):
+        if image_func is not None:
+            frame = image_func(frame)
+        if key is not None:
+            keep_render_pass_frame(key, frame)
+    return frame
+
+
+def run_frame_steps_batch(get_frames, steps, times):
+    """Returns the frames at the times ``times`` of a clip made with the steps
+    ``steps`` (see ``Clip.with_frame_step``) from a clip whose frames are given
+    by ``get_frames``, with the batch functions of the steps.
+
+    The transformations of images are applied in a loop to the stacks of
+    frames, from the last step which has no batch function, whose frames are
+    computed one by one, or which is a step of ``transform``, whose batch
+    function gets a function giving the frames before it.
+    """
+    batch_funcs = []
+    for index in range(len(steps) - 1, -1, -1):
+        kind, _, frame_function, batch_func = steps[index]
+        if batch_func is None:
+            frames = np.stack([compute_frame(frame_function, t) for t in times])
+            break
+        if kind != "image":
+            previous_steps = steps[:index]
+            frames = batch_func(
+                lambda ts: run_frame_steps_batch(get_frames, previous_steps, ts),
+                times,
+            )
+            break
+        batch_funcs.append(batch_func)
+    else:
+        frames = get_frames(times)
+
+    for batch_func in reversed(batch_funcs):
+        frames = batch_func(lambda ts, frames=frames: frames, times)
+    return frames
+
+
 class Clip:
     """Base class of all clips (VideoClips and AudioClips).
 
@@ -59,6 +274,25 @@ class Clip:
         self.memoized_t = None
         self.memoized_frame = None
 
+        # (filename, start_time) of the part of a media file played unmodified
+        # by the clip, if any (see ``write_videofile(smart_render=True)``).
+        self.source = None
+        # Parameters the media file played by the clip was opened with, if any
+        # (see ``VideoFileClip.reader_options``)
+        self.reader_options = None
+        # How the clip was made from another clip, if known: a tuple
+        # ("subclipped", clip, start_time, end_time) or ("effect", clip, effect)
+        self.operation = None
+        # (frames_function, frame_function) if ``frames_function`` computes the
+        # frames at an array of times at once, faster than ``frame_function``
+        # (see ``get_frames``). Ignored once ``frame_function`` is replaced.
+        self.frames_function = None
+        # (clip, steps, frame_function) if ``frame_function`` runs a flat list
+        # of steps on the frames of a clip (see ``with_frame_step``), as
+        # tuples (kind, func, frame_function, batch_func) with the frame and
+        # batch functions of the clip made by each step
+        self.frame_steps = None
+
     def copy(self):
         """Allows the usage of ``.copy()`` in clips as chained methods invocation."""
         return _copy.copy(self)
@@ -75,6 +309,8 @@ class Clip:
           Moment of the clip whose frame will be returned.
         """
         # Coming soon: smart error handling for debugging at this point
+        if (getattr(RENDER_PASS, "frames", None) is not None) and isinstance(t, Real):
+            return self.get_render_pass_frame(t)
         if self.memoize:
             if t == self.memoized_t:
                 return self.memoized_frame
@@ -86,7 +322,35 @@ class Clip:
         else:
             return self.frame_function(t)
 
-    def transform(self, func, apply_to=None, keep_duration=True):
+    def get_render_pass_frame(self, t):
+        """Gets the frame at time ``t`` during a render pass, computed once for
+        all its uses if the clip is shared (see ``render_pass``).
+        """
+        return compute_frame(self.frame_function, t)
+
+    def get_frames(self, times):
+        """Gets the frames of the clip at several times, stacked in an array of
+        shape (N, ...) like (N, H, W, 3) for a RGB video clip.
+
+        The frames are computed at once by ``frames_function`` if the clip has
+        one for its current ``frame_function``, like the clips transformed by
+        effects which can process stacks of frames (see ``transform``), else
+        one by one with ``get_frame``.
+
+        Parameters
+        ----------
+
+        times : list or np.ndarray
+          Times (in seconds) of the frames.
+        """
+        times = np.asarray(times, dtype=float)
+        if (self.frames_function is not None) and (
+            self.frames_function[1] is self.frame_function
+        ):
+            return self.frames_function[0](times)
+        return np.stack([self.get_frame(t) for t in times])
+
+    def transform(self, func, apply_to=None, keep_duration=True, batch_func=None):
         """General processing of a clip.
 
         Returns a new Clip whose frames are a transformation
@@ -112,6 +376,13 @@ class Clip:
           Set to True if the transformation does not change the
           ``duration`` of the clip.
 
+        batch_func : function, optional
+          A function with signature (gfs, ts -> frames) doing the same as
+          ``func`` for an array of times ``ts``, where ``gfs`` is the current
+          clip's ``get_frames`` method, returning the stack of the transformed
+          frames. It is used by ``get_frames`` to transform several frames at
+          once.
+
         Examples
         --------
 
@@ -122,12 +393,61 @@ class Clip:
         >>> filter = lambda get_frame,t : get_frame(t)[int(t):int(t)+50, :]
         >>> new_clip = clip.transform(filter, apply_to='mask')
 
+        """
+        return self.with_frame_step(
+            ("transform", func),
+            apply_to=apply_to,
+            keep_duration=keep_duration,
+            batch_func=batch_func,
+        )
+
+    def with_frame_step(self, step, apply_to=None, keep_duration=True, batch_func=None):
+        """Returns a new clip whose frames are the frames of the current clip
+        transformed by ``step``, used by ``transform``, ``time_transform`` and
+        ``image_transform``.
+
+        The clips made with successive steps hold the first clip and the flat
+        list of the steps, run in a single loop by their ``frame_function``
+        (see ``run_frame_steps``), instead of functions calling the
+        ``get_frame`` of the clip before them. This spares the conversion of
+        the times and the Python calls of each step, and long chains of
+        ``image_transform`` and ``time_transform`` don't hit the recursion
+        limit. The functions of ``transform`` and the batch functions other
+        than the ones of ``image_transform`` still call the function giving
+        the frames before them, so the chains they make are nested calls.
+
+        Parameters
+        ----------
+
+        step : tuple
+          ``("transform", func)`` for a function ``func`` like the one of
+          ``transform``, ``("time", time_func)`` for a change of time like the
+          one of ``time_transform``, or ``("image", image_func)`` for a
+          transformation of images like the one of ``image_transform``.
+
+        apply_to, keep_duration, batch_func
+          See ``transform``.
         """
         if apply_to is None:
             apply_to = []
 
-        # mf = copy(self.frame_function)
-        new_clip = self.with_updated_frame_function(lambda t: func(self.get_frame, t))
+        clip, steps = self, []
+        if (self.frame_steps is not None) and (
+            self.frame_steps[2] is self.frame_function
+        ):
+            clip, steps, _ = self.frame_steps
+
+        def frame_function(t):
+            return run_frame_steps(clip.get_frame, steps, t)
+
+        steps = steps + [step + (frame_function, batch_func)]
+        new_clip = self.with_updated_frame_function(frame_function)
+        new_clip.frame_steps = (clip, steps, frame_function)
+        if batch_func is not None:
+            new_clip.frames_function = (
+                lambda ts: run_frame_steps_batch(clip.get_frames, steps, ts),
+                frame_function,
+            )
 
         if not keep_duration:
             new_clip.duration = None
@@ -139,8 +459,8 @@ class Clip:
         for attribute in apply_to:
             attribute_value = getattr(new_clip, attribute, None)
             if attribute_value is not None:
-                new_attribute_value = attribute_value.transform(
-                    func, keep_duration=keep_duration
+                new_attribute_value = attribute_value.with_frame_step(
+                    step, keep_duration=keep_duration, batch_func=batch_func
                 )
                 setattr(new_clip, attribute, new_attribute_value)
 
@@ -182,10 +502,8 @@ class Clip:
         if apply_to is None:
             apply_to = []
 
-        return self.transform(
-            lambda get_frame, t: get_frame(time_func(t)),
-            apply_to,
-            keep_duration=keep_duration,
+        return self.with_frame_step(
+            ("time", time_func), apply_to, keep_duration=keep_duration
         )
 
     def with_effects(self, effects: List["Effect"]):
@@ -202,7 +520,10 @@ class Clip:
             # We always copy effect before using it, see Effect.copy
             # to see why we need to
             effect_copy = effect.copy()
-            new_clip = effect_copy.apply(new_clip)
+            clip = new_clip
+            new_clip = effect_copy.apply(clip)
+            if new_clip is not clip:
+                new_clip.operation = ("effect", clip, effect_copy)
 
         return new_clip
 
@@ -325,6 +646,8 @@ class Clip:
           New frame creator function for the clip.
         """
         self.frame_function = frame_function
+        self.source = self.operation = self.frames_function = None
+        self.reader_options = None
 
     def with_fps(self, fps, change_duration=False):
         """Returns a copy of the clip with a new default fps for functions like
@@ -451,6 +774,11 @@ class Clip:
             new_clip.duration = end_time - start_time
             new_clip.end = new_clip.start + new_clip.duration
 
+        new_clip.operation = ("subclipped", self, start_time, end_time)
+        if getattr(self, "source", None) is not None:
+            filename, source_start = self.source
+            new_clip.source = (filename, source_start + start_time)
+
         return new_clip
 
     @convert_parameter_to_seconds(["start_time", "end_time"])
@@ -509,7 +837,9 @@ class Clip:
 
     @requires_duration
     @use_clip_fps_by_default
-    def iter_frames(self, fps=None, with_times=False, logger=None, dtype=None):
+    def iter_frames(
+        self, fps=None, with_times=False, logger=None, dtype=None, batch_size=None
+    ):
         """Iterates over all the frames of the clip.
 
         Returns each frame of the clip as a HxWxN Numpy array,
@@ -537,6 +867,12 @@ class Clip:
           Type to cast Numpy array frames. Use ``dtype="uint8"`` when using the
           pictures to write video, images..
 
+        batch_size : int, optional
+          If defined, the frames are computed ``batch_size`` at a time with
+          ``get_frames``, which saves the Python overhead of each frame for
+          clips whose effects can process stacks of frames. The frames yielded
+          are then views of the batches.
+
         Examples
         --------
 
@@ -551,21 +887,83 @@ class Clip:
                   for frame in myclip.iter_frames()])
         """
         logger = proglog.default_bar_logger(logger)
-        for frame_index in logger.iter_bar(
-            frame_index=np.arange(0, int(self.duration * fps))
-        ):
+        n_frames = int(self.duration * fps)
+        # the frames of clips shared in the clip are computed once per frame,
+        # in a render pass per frame or batch, so that no pass is left open
+        # in the thread of the caller between the frames
+        shared = set()
+        for frame_index in logger.iter_bar(frame_index=np.arange(0, n_frames)):
             # int is used to ensure that floating point errors are rounded
             # down to the nearest integer
             t = frame_index / fps
 
-            frame = self.get_frame(t)
-            if (dtype is not None) and (frame.dtype != dtype):
-                frame = frame.astype(dtype)
+            if batch_size:
+                if frame_index % batch_size == 0:
+                    last_index = min(frame_index + batch_size, n_frames)
+                    times = np.arange(frame_index, last_index) / fps
+                    with render_pass(shared):
+                        batch = self.get_frames(times)
+                    if (dtype is not None) and (batch.dtype != dtype):
+                        batch = batch.astype(dtype)
+                frame = batch[frame_index % batch_size]
+            else:
+                with render_pass(shared):
+                    frame = self.get_frame(t)
+                if (dtype is not None) and (frame.dtype != dtype):
+                    frame = frame.astype(dtype)
             if with_times:
                 yield t, frame
             else:
                 yield frame
 
+    @requires_duration
+    @use_clip_fps_by_default
+    async def iter_frames_async(self, fps=None, with_times=False, dtype=None):
+        """Iterates over all the frames of the clip in asyncio coroutines,
+        with ``async for``. Like ``iter_frames``, but each frame is computed in
+        a thread of the iterator when it is asked, so the event loop isn't
+        blocked while the frames are computed, and no frame is computed in
+        advance.
+
+        Parameters
+        ----------
+
+        fps : int, optional
+          Frames per second for clip iteration. Is optional if the clip already
+          has a ``fps`` attribute.
+
+        with_times : bool, optional
+          If ``True`` yield tuples of ``(t, frame)`` where ``t`` is the current
+          time for the frame, otherwise only a ``frame`` object.
+
+        dtype : type, optional
+          Type to cast Numpy array frames.
+
+        Examples
+        --------
+
+        .. code:: python
+
+            async for frame in clip.iter_frames_async(fps=10):
+                await websocket.send(frame.tobytes())
+        """
+
+        def compute_frame(t):
+            frame = self.get_frame(t)
+            if (dtype is not None) and (frame.dtype != dtype):
+                frame = frame.astype(dtype)
+            return frame
+
+        loop = asyncio.get_running_loop()
+        with render_pass_executor() as executor:
+            for frame_index in range(int(self.duration * fps)):
+                t = frame_index / fps
+                frame = await loop.run_in_executor(executor, compute_frame, t)
+                if with_times:
+                    yield t, frame
+                else:
+                    yield frame
+
     @convert_parameter_to_seconds(["t"])
     def is_playing(self, t):
         """If ``t`` is a time, returns true if t is between the start and the end
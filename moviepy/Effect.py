@@ -2,8 +2,11 @@
 
 import copy as _copy
 from abc import ABCMeta, abstractmethod
+from typing import TYPE_CHECKING
 
-from moviepy.Clip import Clip
+
+if TYPE_CHECKING:
+    from moviepy.Clip import Clip
 
 
 class Effect(metaclass=ABCMeta):
@@ -29,7 +32,7 @@ class Effect(metaclass=ABCMeta):
         return _copy.copy(self)
 
     @abstractmethod
-    def apply(self, clip: Clip) -> Clip:
+    def apply(self, clip: "Clip") -> "Clip":
         """Apply the current effect on a clip
 
         Parameters
@@ -1,42 +1,57 @@
 """Imports everything that you need from the MoviePy submodules so that every thing
 can be directly imported with ``from moviepy import *``.
+
+The names are imported from the submodules the first time they are used
+(:pep:`562`), so that ``import moviepy`` stays fast and only imports the parts
+of MoviePy which are used.
 """
 
-from moviepy.audio import fx as afx
-from moviepy.audio.AudioClip import (
-    AudioArrayClip,
-    AudioClip,
-    CompositeAudioClip,
-    concatenate_audioclips,
-)
-from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.Effect import Effect
-from moviepy.tools import convert_to_seconds
+from moviepy.lazy_imports import lazy_imports
 from moviepy.version import __version__
-from moviepy.video import fx as vfx, tools as videotools
-from moviepy.video.compositing.CompositeVideoClip import (
-    CompositeVideoClip,
-    clips_array,
-    concatenate_videoclips,
-)
-from moviepy.video.io import ffmpeg_tools
-from moviepy.video.io.display_in_notebook import display_in_notebook
-from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.video.VideoClip import (
-    BitmapClip,
-    ColorClip,
-    DataVideoClip,
-    ImageClip,
-    TextClip,
-    UpdatedVideoClip,
-    VideoClip,
-)
 
 
-# Add display in notebook to video and audioclip
-VideoClip.display_in_notebook = display_in_notebook
-AudioClip.display_in_notebook = display_in_notebook
+# Modules and attributes of the names of MoviePy, imported when first used
+__getattr__, __dir__ = lazy_imports(
+    __name__,
+    {
+        "afx": ("moviepy.audio.fx", None),
+        "AudioArrayClip": ("moviepy.audio.AudioClip", "AudioArrayClip"),
+        "AudioClip": ("moviepy.audio.AudioClip", "AudioClip"),
+        "CompositeAudioClip": ("moviepy.audio.AudioClip", "CompositeAudioClip"),
+        "concatenate_audioclips": ("moviepy.audio.AudioClip", "concatenate_audioclips"),
+        "AudioFileClip": ("moviepy.audio.io.AudioFileClip", "AudioFileClip"),
+        "Effect": ("moviepy.Effect", "Effect"),
+        "convert_to_seconds": ("moviepy.tools", "convert_to_seconds"),
+        "vfx": ("moviepy.video.fx", None),
+        "videotools": ("moviepy.video.tools", None),
+        "CompositeVideoClip": (
+            "moviepy.video.compositing.CompositeVideoClip",
+            "CompositeVideoClip",
+        ),
+        "clips_array": ("moviepy.video.compositing.CompositeVideoClip", "clips_array"),
+        "concatenate_videoclips": (
+            "moviepy.video.compositing.CompositeVideoClip",
+            "concatenate_videoclips",
+        ),
+        "ffmpeg_tools": ("moviepy.video.io.ffmpeg_tools", None),
+        "display_in_notebook": (
+            "moviepy.video.io.display_in_notebook",
+            "display_in_notebook",
+        ),
+        "ImageSequenceClip": (
+            "moviepy.video.io.ImageSequenceClip",
+            "ImageSequenceClip",
+        ),
+        "VideoFileClip": ("moviepy.video.io.VideoFileClip", "VideoFileClip"),
+        "BitmapClip": ("moviepy.video.VideoClip", "BitmapClip"),
+        "ColorClip": ("moviepy.video.VideoClip", "ColorClip"),
+        "DataVideoClip": ("moviepy.video.VideoClip", "DataVideoClip"),
+        "ImageClip": ("moviepy.video.VideoClip", "ImageClip"),
+        "TextClip": ("moviepy.video.VideoClip", "TextClip"),
+        "UpdatedVideoClip": ("moviepy.video.VideoClip", "UpdatedVideoClip"),
+        "VideoClip": ("moviepy.video.VideoClip", "VideoClip"),
+    },
+)
 
 
 # Importing with `from moviepy import *` will only import these names
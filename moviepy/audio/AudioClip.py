@@ -307,6 +307,15 @@ class AudioClip(Clip):
             video_flag=video_flag,
         )
 
+    def display_in_notebook(self, *args, **kwargs):
+        """Displays the clip in a Jupyter Notebook. Imports IPython the first
+        time it is used. See ``moviepy.video.io.display_in_notebook`` for the
+        parameters.
+        """
+        from moviepy.video.io.display_in_notebook import display_in_notebook
+
+        return display_in_notebook(self, *args, **kwargs)
+
     def __add__(self, other):
         if isinstance(other, AudioClip):
             return concatenate_audioclips([self, other])
@@ -1,14 +1,6 @@
 """All the audio effects that can be applied to AudioClip and VideoClip."""
 
-# import every video fx function
-
-from moviepy.audio.fx.AudioDelay import AudioDelay
-from moviepy.audio.fx.AudioFadeIn import AudioFadeIn
-from moviepy.audio.fx.AudioFadeOut import AudioFadeOut
-from moviepy.audio.fx.AudioLoop import AudioLoop
-from moviepy.audio.fx.AudioNormalize import AudioNormalize
-from moviepy.audio.fx.MultiplyStereoVolume import MultiplyStereoVolume
-from moviepy.audio.fx.MultiplyVolume import MultiplyVolume
+from moviepy.lazy_imports import lazy_imports
 
 
 __all__ = (
@@ -20,3 +12,9 @@ __all__ = (
     "MultiplyStereoVolume",
     "MultiplyVolume",
 )
+
+
+# every effect is imported from its module the first time it is used
+__getattr__, __dir__ = lazy_imports(
+    __name__, {name: (f"{__name__}.{name}", name) for name in __all__}
+)
@@ -39,6 +39,11 @@ class AudioFileClip(AudioClip):
     buffersize
       See Parameters.
 
+    reader_options
+      The other parameters the file was opened with, to open it again (see
+      ``moviepy.video.io.clip_graph``). None for the copies of the clip whose
+      frames are modified.
+
     Lifetime
     --------
 
@@ -74,6 +79,10 @@ class AudioFileClip(AudioClip):
         self.end = self.reader.duration
         self.buffersize = self.reader.buffersize
         self.filename = filename
+        self.source = (filename, 0)
+        self.reader_options = dict(
+            decode_file=decode_file, buffersize=buffersize, nbytes=nbytes, fps=fps
+        )
 
         self.frame_function = lambda t: self.reader.get_frame(t)
         self.nchannels = self.reader.nchannels
@@ -4,7 +4,7 @@ import subprocess as sp
 
 import proglog
 
-from moviepy.config import FFMPEG_BINARY
+from moviepy.config import ffmpeg_binary
 from moviepy.decorators import requires_duration
 from moviepy.tools import cross_platform_popen_params, ffmpeg_escape_filename
 
@@ -71,7 +71,7 @@ class FFMPEG_AudioWriter:
 
         # order is important
         cmd = [
-            FFMPEG_BINARY,
+            ffmpeg_binary(),
             "-y",
             "-loglevel",
             "error" if logfile == sp.PIPE else "info",
@@ -103,7 +103,11 @@ class FFMPEG_AudioWriter:
             {"stdout": sp.DEVNULL, "stderr": logfile, "stdin": sp.PIPE}
         )
 
-        self.proc = sp.Popen(cmd, **popen_params)
+        self.proc = self.start_process(cmd, popen_params)
+
+    def start_process(self, cmd, popen_params):
+        """Starts and returns the ffmpeg process of the writer."""
+        return sp.Popen(cmd, **popen_params)
 
     def write_frames(self, frames_array):
         """Send the audio frame (a chunck of ``AudioClip``) to ffmpeg for writting"""
@@ -2,7 +2,7 @@
 
 import subprocess as sp
 
-from moviepy.config import FFPLAY_BINARY
+from moviepy.config import ffplay_binary
 from moviepy.decorators import requires_duration
 from moviepy.tools import cross_platform_popen_params
 from moviepy.video.io import ffmpeg_tools
@@ -35,7 +35,7 @@ class FFPLAY_AudioPreviewer:
     ):
         # order is important
         cmd = [
-            FFPLAY_BINARY,
+            ffplay_binary(),
             "-autoexit",  # If you don't precise, ffplay won't stop at end
             "-nodisp",  # If you don't precise a window is
             "-f",
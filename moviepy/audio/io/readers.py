@@ -5,12 +5,16 @@ import warnings
 
 import numpy as np
 
-from moviepy.config import FFMPEG_BINARY
+from moviepy.config import ffmpeg_binary
 from moviepy.tools import cross_platform_popen_params, ffmpeg_escape_filename
-from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.ffmpeg_reader import (
+    ThreadSafeReader,
+    cursor_attribute,
+    ffmpeg_parse_infos,
+)
 
 
-class FFMPEG_AudioReader:
+class FFMPEG_AudioReader(ThreadSafeReader):
     """A class to read the audio in either video files or audio files
     using ffmpeg. ffmpeg will read any audio and transform them into
     raw data.
@@ -36,8 +40,18 @@ class FFMPEG_AudioReader:
     nbytes
       Desired number of bytes (1,2,4) in the signal that will be
       received from ffmpeg
+
+    max_cursors
+      ``get_frame`` can be called from several threads, each thread reading
+      the file with its own ffmpeg process, position and buffer (see
+      ``ThreadSafeReader``), at most ``max_cursors`` processes if it is not
+      None.
     """
 
+    pos = cursor_attribute("pos")
+    buffer = cursor_attribute("buffer")
+    buffer_startframe = cursor_attribute("buffer_startframe")
+
     def __init__(
         self,
         filename,
@@ -47,10 +61,12 @@ class FFMPEG_AudioReader:
         fps=44100,
         nbytes=2,
         nchannels=2,
+        max_cursors=None,
     ):
         # TODO bring FFMPEG_AudioReader more in line with FFMPEG_VideoReader
         # E.g. here self.pos is still 1-indexed.
         # (or have them inherit from a shared parent class)
+        self.init_cursors(max_cursors, pos=0, buffer=None, buffer_startframe=1)
         self.filename = filename
         self.nbytes = nbytes
         self.fps = fps
@@ -61,18 +77,15 @@ class FFMPEG_AudioReader:
         self.duration = infos["duration"]
         self.bitrate = infos["audio_bitrate"]
         self.infos = infos
-        self.proc = None
 
         self.n_frames = int(self.fps * self.duration)
         self.buffersize = min(self.n_frames + 1, buffersize)
-        self.buffer = None
-        self.buffer_startframe = 1
         self.initialize()
         self.buffer_around(1)
 
     def initialize(self, start_time=0):
         """Opens the file, creates the pipe."""
-        self.close()  # if any
+        self.close_cursor(self.cursor)  # if any
 
         if start_time != 0:
             offset = min(1, start_time)
@@ -89,7 +102,7 @@ class FFMPEG_AudioReader:
             i_arg = ["-i", ffmpeg_escape_filename(self.filename), "-vn"]
 
         cmd = (
-            [FFMPEG_BINARY]
+            [ffmpeg_binary()]
             + i_arg
             + [
                 "-loglevel",
@@ -177,7 +190,7 @@ class FFMPEG_AudioReader:
         arbitrary frames whenever possible, by moving between adjacent
         frames.
         """
-        if (pos < self.pos) or (pos > (self.pos + 1000000)):
+        if (not self.proc) or (pos < self.pos) or (pos > (self.pos + 1000000)):
             t = 1.0 * pos / self.fps
             self.initialize(t)
         elif pos > self.pos:
@@ -196,76 +209,84 @@ class FFMPEG_AudioReader:
           timestamp is returned. If `tt` is a NumPy array of timestamps, an
           array of frames corresponding to each timestamp is returned.
         """
-        if isinstance(tt, np.ndarray):
-            # lazy implementation, but should not cause problems in
-            # 99.99 %  of the cases
-
-            # elements of t that are actually in the range of the
-            # audio file.
-            in_time = (tt >= 0) & (tt < self.duration)
-
-            # Check that the requested time is in the valid range
-            if not in_time.any():
-                raise IOError(
-                    "Error in file %s, " % (self.filename)
-                    + "Accessing time t=%.02f-%.02f seconds, " % (tt[0], tt[-1])
-                    + "with clip duration=%f seconds, " % self.duration
-                )
-
-            # The np.round in the next line is super-important.
-            # Removing it results in artifacts in the noise.
-            frames = np.round((self.fps * tt)).astype(int)[in_time]
-            fr_min, fr_max = frames.min(), frames.max()
-
-            # if min and max frames don't fit the buffer, it results in IndexError
-            # we avoid that by recursively calling this function on smaller length
-            # and concatenate the results:w
-            max_frame_threshold = fr_min + self.buffersize // 2
-            threshold_idx = np.searchsorted(frames, max_frame_threshold, side="right")
-            if threshold_idx != len(frames):
-                in_time_head = in_time[0:threshold_idx]
-                in_time_tail = in_time[threshold_idx:]
-                return np.concatenate(
-                    [self.get_frame(in_time_head), self.get_frame(in_time_tail)]
-                )
-
-            if not (0 <= (fr_min - self.buffer_startframe) < len(self.buffer)):
-                self.buffer_around(fr_min)
-            elif not (0 <= (fr_max - self.buffer_startframe) < len(self.buffer)):
-                self.buffer_around(fr_max)
-
-            try:
-                result = np.zeros((len(tt), self.nchannels))
-                indices = frames - self.buffer_startframe
-                result[in_time] = self.buffer[indices]
-                return result
-
-            except IndexError as error:
-                warnings.warn(
-                    "Error in file %s, " % (self.filename)
-                    + "At time t=%.02f-%.02f seconds, " % (tt[0], tt[-1])
-                    + "indices wanted: %d-%d, " % (indices.min(), indices.max())
-                    + "but len(buffer)=%d\n" % (len(self.buffer))
-                    + str(error),
-                    UserWarning,
+        with self.using_cursor():
+            if isinstance(tt, np.ndarray):
+                # lazy implementation, but should not cause problems in
+                # 99.99 %  of the cases
+
+                # elements of t that are actually in the range of the
+                # audio file.
+                in_time = (tt >= 0) & (tt < self.duration)
+
+                # Check that the requested time is in the valid range
+                if not in_time.any():
+                    raise IOError(
+                        "Error in file %s, " % (self.filename)
+                        + "Accessing time t=%.02f-%.02f seconds, " % (tt[0], tt[-1])
+                        + "with clip duration=%f seconds, " % self.duration
+                    )
+
+                # The np.round in the next line is super-important.
+                # Removing it results in artifacts in the noise.
+                frames = np.round((self.fps * tt)).astype(int)[in_time]
+                fr_min, fr_max = frames.min(), frames.max()
+
+                # if min and max frames don't fit the buffer, it results in IndexError
+                # we avoid that by recursively calling this function on smaller length
+                # and concatenate the results:w
+                max_frame_threshold = fr_min + self.buffersize // 2
+                threshold_idx = np.searchsorted(
+                    frames, max_frame_threshold, side="right"
                 )
+                if threshold_idx != len(frames):
+                    in_time_head = in_time[0:threshold_idx]
+                    in_time_tail = in_time[threshold_idx:]
+                    return np.concatenate(
+                        [self.get_frame(in_time_head), self.get_frame(in_time_tail)]
+                    )
+
+                if (self.buffer is None) or not (
+                    0 <= (fr_min - self.buffer_startframe) < len(self.buffer)
+                ):
+                    # out of the buffer, or first read of the file by the thread
+                    self.buffer_around(fr_min)
+                elif not (0 <= (fr_max - self.buffer_startframe) < len(self.buffer)):
+                    self.buffer_around(fr_max)
+
+                try:
+                    result = np.zeros((len(tt), self.nchannels))
+                    indices = frames - self.buffer_startframe
+                    result[in_time] = self.buffer[indices]
+                    return result
+
+                except IndexError as error:
+                    warnings.warn(
+                        "Error in file %s, " % (self.filename)
+                        + "At time t=%.02f-%.02f seconds, " % (tt[0], tt[-1])
+                        + "indices wanted: %d-%d, " % (indices.min(), indices.max())
+                        + "but len(buffer)=%d\n" % (len(self.buffer))
+                        + str(error),
+                        UserWarning,
+                    )
+
+                    # repeat the last frame instead
+                    indices[indices >= len(self.buffer)] = len(self.buffer) - 1
+                    result[in_time] = self.buffer[indices]
+                    return result
 
-                # repeat the last frame instead
-                indices[indices >= len(self.buffer)] = len(self.buffer) - 1
-                result[in_time] = self.buffer[indices]
-                return result
-
-        else:
-            ind = int(self.fps * tt)
-            if ind < 0 or ind > self.n_frames:  # out of time: return 0
-                return np.zeros(self.nchannels)
+            else:
+                ind = int(self.fps * tt)
+                if ind < 0 or ind > self.n_frames:  # out of time: return 0
+                    return np.zeros(self.nchannels)
 
-            if not (0 <= (ind - self.buffer_startframe) < len(self.buffer)):
-                # out of the buffer: recenter the buffer
-                self.buffer_around(ind)
+                if (self.buffer is None) or not (
+                    0 <= (ind - self.buffer_startframe) < len(self.buffer)
+                ):
+                    # out of the buffer: recenter the buffer
+                    self.buffer_around(ind)
 
-            # read the frame in the buffer
-            return self.buffer[ind - self.buffer_startframe]
+                # read the frame in the buffer
+                return self.buffer[ind - self.buffer_startframe]
 
     def buffer_around(self, frame_number):
         """Fill the buffer with frames, centered on frame_number if possible."""
@@ -288,17 +309,3 @@ class FFMPEG_AudioReader:
             self.buffer = self.read_chunk(self.buffersize)
 
         self.buffer_startframe = new_bufferstart
-
-    def close(self):
-        """Closes the reader, terminating the subprocess if is still alive."""
-        if self.proc:
-            if self.proc.poll() is None:
-                self.proc.terminate()
-                self.proc.stdout.close()
-                self.proc.stderr.close()
-                self.proc.wait()
-            self.proc = None
-
-    def __del__(self):
-        # If the garbage collector comes, make sure the subprocess is terminated.
-        self.close()
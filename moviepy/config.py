@@ -1,23 +1,19 @@
-"""Third party programs configuration for MoviePy."""
+"""Third party programs configuration for MoviePy.
+
+The binaries of ffmpeg and ffplay are found the first time they are needed, by
+``ffmpeg_binary`` and ``ffplay_binary``, and not when MoviePy is imported. The
+``FFMPEG_BINARY``, ``FFPLAY_BINARY`` and ``DOTENV`` attributes of this module
+are computed when they are first accessed.
+"""
 
 import os
 import subprocess as sp
+from functools import lru_cache
 from pathlib import Path
 
 from moviepy.tools import cross_platform_popen_params
 
 
-try:
-    from dotenv import find_dotenv, load_dotenv
-
-    DOTENV = find_dotenv()
-    load_dotenv(DOTENV)
-except ImportError:
-    DOTENV = None
-
-FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg-imageio")
-FFPLAY_BINARY = os.getenv("FFPLAY_BINARY", "auto-detect")
-
 IS_POSIX_OS = os.name == "posix"
 
 
@@ -35,56 +31,98 @@ def try_cmd(cmd):
         return True, None
 
 
-if FFMPEG_BINARY == "ffmpeg-imageio":
-    from imageio.plugins.ffmpeg import get_exe
-
-    FFMPEG_BINARY = get_exe()
-
-elif FFMPEG_BINARY == "auto-detect":
-    if try_cmd(["ffmpeg"])[0]:
-        FFMPEG_BINARY = "ffmpeg"
-    elif not IS_POSIX_OS and try_cmd(["ffmpeg.exe"])[0]:
-        FFMPEG_BINARY = "ffmpeg.exe"
-    else:  # pragma: no cover
-        FFMPEG_BINARY = "unset"
-else:
-    success, err = try_cmd([FFMPEG_BINARY])
-    if not success:
-        raise IOError(
-            f"{err} - The path specified for the ffmpeg binary might be wrong"
-        )
-
-
-if FFPLAY_BINARY == "auto-detect":
-    if try_cmd(["ffplay"])[0]:
-        FFPLAY_BINARY = "ffplay"
-    elif not IS_POSIX_OS and try_cmd(["ffplay.exe"])[0]:
-        FFPLAY_BINARY = "ffplay.exe"
-    else:  # pragma: no cover
-        FFPLAY_BINARY = "unset"
-else:
-    success, err = try_cmd([FFPLAY_BINARY])
+@lru_cache(maxsize=None)
+def load_dotenv_file():
+    """Loads the environment variables of the ``.env`` file, the first time it
+    is called, and returns its path, or None if python-dotenv is not installed.
+    """
+    try:
+        from dotenv import find_dotenv, load_dotenv
+    except ImportError:
+        return None
+
+    dotenv = find_dotenv()
+    load_dotenv(dotenv)
+    return dotenv
+
+
+def find_binary(name, binary):
+    """Returns the binary of the program ``name`` (``"ffmpeg"`` or
+    ``"ffplay"``) to use for the setting ``binary``, which is either
+    ``"auto-detect"`` to look for the program in the PATH, or the path of the
+    binary, checked by running it.
+    """
+    if binary == "auto-detect":
+        if try_cmd([name])[0]:
+            return name
+        elif not IS_POSIX_OS and try_cmd([name + ".exe"])[0]:
+            return name + ".exe"
+        else:  # pragma: no cover
+            return "unset"
+
+    success, err = try_cmd([binary])
     if not success:
         raise IOError(
-            f"{err} - The path specified for the ffmpeg binary might be wrong"
+            f"{err} - The path specified for the {name} binary might be wrong"
         )
+    return binary
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_binary():
+    """Returns the ffmpeg binary used by MoviePy, found the first time it is
+    called from the ``FFMPEG_BINARY`` environment variable: ``"ffmpeg-imageio"``
+    (the default) for the binary of imageio-ffmpeg, ``"auto-detect"``, or the
+    path of a binary. Raises an IOError if the path is wrong.
+    """
+    load_dotenv_file()
+    binary = os.getenv("FFMPEG_BINARY", "ffmpeg-imageio")
+    if binary == "ffmpeg-imageio":
+        from imageio.plugins.ffmpeg import get_exe
+
+        return get_exe()
+    return find_binary("ffmpeg", binary)
+
+
+@lru_cache(maxsize=None)
+def ffplay_binary():
+    """Returns the ffplay binary used by MoviePy, found the first time it is
+    called from the ``FFPLAY_BINARY`` environment variable: ``"auto-detect"``
+    (the default) or the path of a binary. Raises an IOError if the path is
+    wrong.
+    """
+    load_dotenv_file()
+    return find_binary("ffplay", os.getenv("FFPLAY_BINARY", "auto-detect"))
+
+
+def __getattr__(name):
+    if name == "FFMPEG_BINARY":
+        return ffmpeg_binary()
+    if name == "FFPLAY_BINARY":
+        return ffplay_binary()
+    if name == "DOTENV":
+        return load_dotenv_file()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def check():
     """Check if moviepy has found the binaries for FFmpeg."""
-    if try_cmd([FFMPEG_BINARY])[0]:
-        print(f"MoviePy: ffmpeg successfully found in '{FFMPEG_BINARY}'.")
+    ffmpeg = ffmpeg_binary()
+    if try_cmd([ffmpeg])[0]:
+        print(f"MoviePy: ffmpeg successfully found in '{ffmpeg}'.")
     else:  # pragma: no cover
-        print(f"MoviePy: can't find or access ffmpeg in '{FFMPEG_BINARY}'.")
+        print(f"MoviePy: can't find or access ffmpeg in '{ffmpeg}'.")
 
-    if try_cmd([FFPLAY_BINARY])[0]:
-        print(f"MoviePy: ffplay successfully found in '{FFPLAY_BINARY}'.")
+    ffplay = ffplay_binary()
+    if try_cmd([ffplay])[0]:
+        print(f"MoviePy: ffplay successfully found in '{ffplay}'.")
     else:  # pragma: no cover
-        print(f"MoviePy: can't find or access ffplay in '{FFPLAY_BINARY}'.")
+        print(f"MoviePy: can't find or access ffplay in '{ffplay}'.")
 
-    if DOTENV:
-        print(f"\n.env file content at {DOTENV}:\n")
-        print(Path(DOTENV).read_text())
+    dotenv = load_dotenv_file()
+    if dotenv:
+        print(f"\n.env file content at {dotenv}:\n")
+        print(Path(dotenv).read_text())
 
 
 if __name__ == "__main__":  # pragma: no cover
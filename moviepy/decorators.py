@@ -71,8 +71,11 @@ def audio_video_effect(func, effect, clip, *args, **kwargs):
     videoclip with unmodified video and modified audio.
     """
     if hasattr(clip, "audio"):
-        if clip.audio is not None:
+        if (clip.audio is not None) and (args or kwargs):
             clip.audio = func(effect, clip.audio, *args, **kwargs)
+        elif clip.audio is not None:
+            # through ``with_effects``, to record the effect in the audio clip
+            clip.audio = clip.audio.with_effects([effect])
         return clip
     else:
         return func(effect, clip, *args, **kwargs)
@@ -0,0 +1,70 @@
+"""Lazy imports of the names of the packages of MoviePy, with the module
+``__getattr__`` and ``__dir__`` functions of :pep:`562`, so that importing a
+package doesn't import all its submodules.
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyPackage(types.ModuleType):
+    """The class of the packages with lazy imports, keeping the names imported
+    from a submodule with the same name as the submodule, like the effects,
+    when the submodule is imported (which sets the name in the package to the
+    submodule).
+    """
+
+    def __setattr__(self, name, value):
+        module_name, attribute = self.__dict__["LAZY_IMPORTS"].get(name, (None, None))
+        if (
+            (attribute is not None)
+            and isinstance(value, types.ModuleType)
+            and (value.__name__ == module_name)
+        ):
+            value = getattr(value, attribute)
+        super().__setattr__(name, value)
+
+
+def lazy_imports(package_name, imports):
+    """Returns the ``__getattr__`` and ``__dir__`` functions of the package
+    ``package_name``, importing its names the first time they are used.
+
+    Parameters
+    ----------
+
+    package_name : str
+      Name of the package, ``__name__`` in the package.
+
+    imports : dict
+      The module and attribute of each name, as tuples
+      ``(module_name, attribute)`` where ``attribute`` is None for names of
+      modules.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        __getattr__, __dir__ = lazy_imports(
+            __name__, {"Crop": ("moviepy.video.fx.Crop", "Crop")}
+        )
+    """
+    package = sys.modules[package_name]
+    package.__dict__["LAZY_IMPORTS"] = imports
+    package.__class__ = LazyPackage
+
+    def __getattr__(name):
+        if name not in imports:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        module_name, attribute = imports[name]
+        value = importlib.import_module(module_name)
+        if attribute is not None:
+            value = getattr(value, attribute)
+        setattr(package, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(package.__dict__) | set(imports))
+
+    return __getattr__, __dir__
@@ -5,6 +5,7 @@ import platform
 import subprocess as sp
 import warnings
 
+import numpy as np
 import proglog
 
 
@@ -312,3 +313,44 @@ def compute_position(
 
     # Return as int, rounding if necessary
     return (int(pos[0]), int(pos[1]))
+
+
+def is_constant_frame(frame) -> bool:
+    """Return True if ``frame`` repeats a single pixel over its whole surface
+    without storing it, like the frames of a ``ColorClip``.
+
+    Such frames are read-only ``np.broadcast_to`` views, so they take no memory
+    whatever their size and can be processed as a single pixel.
+    """
+    return (
+        isinstance(frame, np.ndarray)
+        and frame.ndim >= 2
+        and frame.strides[0] == 0
+        and frame.strides[1] == 0
+    )
+
+
+def pointwise(image_func):
+    """Mark ``image_func``, a frame transformation computing each pixel
+    independently of the others, as pointwise.
+
+    Returns a function behaving like ``image_func``, except that it computes
+    ``image_func`` on the first pixel only of constant frames (see
+    ``is_constant_frame``) and broadcasts the result again, so that such frames
+    are never materialized.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        clip.image_transform(pointwise(lambda frame: 255 - frame))
+    """
+
+    def pointwise_func(frame):
+        if not is_constant_frame(frame):
+            return image_func(frame)
+        pixel = np.asarray(image_func(frame[:1, :1]))
+        return np.broadcast_to(pixel, frame.shape[:2] + pixel.shape[2:])
+
+    return pointwise_func
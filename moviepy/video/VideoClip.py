@@ -34,12 +34,150 @@ from moviepy.decorators import (
     requires_fps,
     use_clip_fps_by_default,
 )
-from moviepy.tools import compute_position, extensions_dict, find_extension
+from moviepy.tools import (
+    compute_position,
+    extensions_dict,
+    find_extension,
+    is_constant_frame,
+    pointwise,
+)
 from moviepy.video.fx.Crop import Crop
 from moviepy.video.fx.Resize import Resize
 from moviepy.video.fx.Rotate import Rotate
-from moviepy.video.io.ffmpeg_writer import ffmpeg_write_video
+from moviepy.video.io.ffmpeg_writer import (
+    FFMPEG_VideoStreamWriter,
+    ffmpeg_write_video,
+    ffmpeg_write_videos,
+)
 from moviepy.video.io.gif_writers import write_gif_with_imageio
+from moviepy.video.tools.color_tables import fuse_color_tables, is_rgb_frame
+
+
+def video_codecs(ext, codec=None, audio_codec=None):
+    """Returns the video and audio codecs used to write a video file of
+    extension ``ext`` (without dot) with ``write_videofile``, which are
+    ``codec`` and ``audio_codec`` if they are defined.
+    """
+    if codec is None:
+        try:
+            codec = extensions_dict[ext]["codec"][0]
+        except KeyError:
+            raise ValueError(
+                "MoviePy couldn't find the codec associated "
+                "with the filename. Provide the 'codec' "
+                "parameter in write_videofile."
+            )
+
+    if audio_codec is None:
+        if ext in ["ogv", "webm"]:
+            audio_codec = "libvorbis"
+        else:
+            audio_codec = "libmp3lame"
+    elif audio_codec == "raw16":
+        audio_codec = "pcm_s16le"
+    elif audio_codec == "raw32":
+        audio_codec = "pcm_s32le"
+    return codec, audio_codec
+
+
+def frame_to_image(frame: np.ndarray) -> Image.Image:
+    """Convert a frame to a Pillow image, without reading the whole array for
+    RGB frames made of a single color (see ``moviepy.tools.is_constant_frame``).
+    """
+    if is_constant_frame(frame) and frame.ndim == 3 and frame.shape[2] == 3:
+        color = tuple(frame[0, 0].astype("uint8").tolist())
+        return Image.new("RGB", frame.shape[1::-1], color)
+    return Image.fromarray(frame.astype("uint8"))
+
+
+def blit_image(background: Image.Image, clip_img: Image.Image, pos) -> Image.Image:
+    """Returns the result of the Pillow image ``clip_img`` blitted at position
+    ``pos`` on the Pillow image ``background``, accounting for transparency.
+    ``background`` may be modified in place.
+    """
+    # If the clip has no alpha layer (check if mode end with A), it covers
+    # the background whether it is transparent or not, so we can just use
+    # pillow paste
+    if clip_img.mode[-1] != "A":
+        background.paste(clip_img, pos)
+        return background
+
+    # For images with transparency we must use pillow alpha composite
+    # instead of a simple paste, because pillow paste dont work nicely
+    # with alpha compositing
+    if background.mode[-1] != "A":
+        background = background.convert("RGBA")
+
+    if clip_img.mode[-1] != "A":
+        clip_img = clip_img.convert("RGBA")
+
+    # We need both image to do the same size for alpha compositing in pillow
+    # so we must start by making a fully transparent canvas of background's
+    # size and paste our clip img into it in position pos, only then can we
+    # composite this canvas on top of background
+    canvas = Image.new("RGBA", (background.width, background.height), (0, 0, 0, 0))
+    canvas.paste(clip_img, pos)
+    result = Image.alpha_composite(background, canvas)
+    return result
+
+
+def blit_mask(
+    background_mask: np.ndarray, clip_mask: np.ndarray, pos, bounds=None
+) -> np.ndarray:
+    """Returns the result of the mask ``clip_mask`` composited at position
+    ``pos`` on ``background_mask``, which is modified in place. If ``bounds``
+    is given, the mask is not drawn outside of this rectangle
+    ``(x1, y1, x2, y2)`` of the background mask.
+    """
+    # numpy shape is H*W not W*H
+    bg_h, bg_w = background_mask.shape
+    clip_h, clip_w = clip_mask.shape
+
+    # ALPHA COMPOSITING
+    # Determine the base_mask region to merge size
+    x_start = int(max(pos[0], 0))  # Dont go under 0 left
+    x_end = int(min(pos[0] + clip_w, bg_w))  # Dont go over base_mask width
+    y_start = int(max(pos[1], 0))  # Dont go under 0 top
+    y_end = int(min(pos[1] + clip_h, bg_h))  # Dont go over base_mask height
+    if bounds is not None:
+        # Dont go out of the bounds either
+        x_start, y_start = max(x_start, bounds[0]), max(y_start, bounds[1])
+        x_end, y_end = min(x_end, bounds[2]), min(y_end, bounds[3])
+    if (x_end <= x_start) or (y_end <= y_start):
+        # The clip mask is out of the background mask
+        return background_mask
+
+    # Determine the clip_mask region to overlapp
+    # Dont go under 0 for horizontal, if we have negative margin of X px start at X
+    # And dont go over clip width
+    clip_x_start = int(x_start - pos[0])
+    clip_x_end = int(clip_x_start + min((x_end - x_start), (clip_w - clip_x_start)))
+    # same for vertical
+    clip_y_start = int(y_start - pos[1])
+    clip_y_end = int(clip_y_start + min((y_end - y_start), (clip_h - clip_y_start)))
+
+    # Blend the overlapping regions
+    # The calculus is base_opacity + clip_opacity * (1 - base_opacity)
+    # this ensure that masks are drawn in the right order and
+    # the contribution of each mask is proportional to their transparency
+    #
+    # Note :
+    # Thinking in transparency is hard, as we tend to think
+    # that 50% opaque + 40% opaque = 90% opacity, when it really its 70%
+    # It's a lot easier to think in terms of "passing light"
+    # Consider I emit 100 photons, and my first layer is 50% opaque, meaning it
+    # will "stop" 50% of the photons, I'll have 50 photons left
+    # now my second layer is blocking 40% of thoses 50 photons left
+    # blocking 50 * 0.4 = 20 photons, and leaving me with only 30 photons
+    # So, by adding two layer of 50% and 40% opacity my finaly opacity is only
+    # of (100-30)*100 = 70% opacity !
+    background_mask[y_start:y_end, x_start:x_end] = background_mask[
+        y_start:y_end, x_start:x_end
+    ] + clip_mask[clip_y_start:clip_y_end, clip_x_start:clip_x_end] * (
+        1 - background_mask[y_start:y_end, x_start:x_end]
+    )
+
+    return background_mask
 
 
 class VideoClip(Clip):
@@ -92,6 +230,10 @@ class VideoClip(Clip):
       of the clip when it is composed with other clips.
       See ``VideoClip.set_pos`` for more details
 
+    constant_pos
+      The position given to ``with_position``, if it is not a function of
+      time, else None.
+
     relative_pos
       See variable ``pos``.
 
@@ -100,6 +242,27 @@ class VideoClip(Clip):
       a CompositeVideoClip. The highest number is rendered on top.
       Default is 0.
 
+    source
+      ``(filename, start_time)`` if the clip plays the video file ``filename``
+      unmodified from ``start_time``, else None. Used by smart rendering.
+
+    sections
+      For the clips made by ``concatenate_videoclips`` with the method
+      ``"chain"``, the clips they play one after another, else None.
+
+    color_tables
+      For the clips made by color effects (see ``color_transform``), the clip
+      they transform, the list of the color tables of the effects, the list
+      of the effects as pairs ``(func, batch_func)`` and the
+      ``frame_function`` applying them, else None. Ignored once
+      ``frame_function`` is replaced.
+
+    composition_bounds
+      For the copies of the clips of a nested composition blitted directly in
+      a ``CompositeVideoClip``, a function ``t->(x1, y1, x2, y2)`` giving the
+      rectangle of the nested composition, outside of which the clip is not
+      drawn, else None.
+
     """
 
     def __init__(
@@ -109,8 +272,12 @@ class VideoClip(Clip):
         self.mask = None
         self.audio = None
         self.pos = lambda t: (0, 0)
+        self.constant_pos = (0, 0)
         self.relative_pos = False
         self.layer_index = 0
+        self.sections = None
+        self.color_tables = None
+        self.composition_bounds = None
         if frame_function:
             self.frame_function = frame_function
             self.size = self.get_frame(0).shape[:2][::-1]
@@ -226,6 +393,17 @@ class VideoClip(Clip):
         ffmpeg_params=None,
         logger="bar",
         pixel_format=None,
+        workers=None,
+        segments=None,
+        pipe_audio=False,
+        smart_render=False,
+        ffmpeg_filters=False,
+        render_cache=None,
+        convert_to_yuv=False,
+        conversion_threads=None,
+        batch_size=None,
+        optimize=True,
+        render_farm=None,
     ):
         """Write the clip to a videofile.
 
@@ -322,6 +500,101 @@ class VideoClip(Clip):
         pixel_format
           Pixel format for the output video file.
 
+        workers
+          Number of processes rendering the frames of the clip in parallel,
+          which can speed up the writing of the video on multicore computers
+          for clips with heavy effects or compositions. Each process opens its
+          own readers of the files the clip is made from. Requires forking
+          processes, so it is not available on Windows and macOS, where the
+          frames are rendered by the current process with a warning. Default
+          to None (the frames are rendered by the current process).
+
+        segments
+          Number of time segments of the clip rendered and encoded in parallel,
+          each by its own process and ffmpeg encoder, which are then joined
+          without re-encoding. The segments start on keyframes, every 250
+          frames unless another interval is set with ``-g`` in
+          ``ffmpeg_params``, so short clips use fewer segments. Like
+          ``workers``, requires forking processes. Default to None.
+
+        pipe_audio
+          If True, the sound of the clip is computed while the frames are
+          written, and piped to the ffmpeg process encoding the video, instead
+          of being written to a temporary audio file before the video. Not
+          available on Windows nor with ``segments``, ``smart_render``,
+          ``render_cache`` or ``render_farm``, in which cases the temporary audio
+          file is still used.
+
+        smart_render
+          If True, the frames of the parts of video files played unmodified by
+          the clip, like the subclips of ``VideoFileClip`` joined with
+          ``concatenate_videoclips``, are copied from the files without being
+          decoded and re-encoded, from the first to the last keyframe of each
+          part. Only the other frames are rendered and encoded. This requires
+          the video streams of the files to have the codec, pixel format, size
+          and fps of the output, else the whole clip is rendered. Default to
+          False.
+
+        ffmpeg_filters
+          If True, and if the clip is only made of media files and color clips
+          with operations which ffmpeg can do (``subclipped``, the effects
+          ``Resize``, ``Crop``, ``FadeIn``, ``FadeOut``, ``MultiplyVolume``,
+          ``AudioFadeIn`` and ``AudioFadeOut``, concatenations, and
+          compositions of clips at constant positions without masks), the whole
+          video is rendered by a single ffmpeg command with a
+          ``-filter_complex`` graph, without computing the frames in Python.
+          Else the logger tells which clip prevents it, and the frames are
+          rendered as usual. Default to False.
+
+        render_cache
+          Directory where the video is stored in segments of a keyframes
+          interval (250 frames unless set with ``-g`` in ``ffmpeg_params``),
+          named after fingerprints of the files, images, effects, positions and
+          times of the parts of the clip they show, and joined without
+          re-encoding. When a video is written again with the same directory,
+          after editing its clip, only the segments whose fingerprint changed
+          are rendered. Clips whose frames are computed by functions of time
+          (``VideoClip(frame_function)``, ``transform``...) can't be
+          fingerprinted and are rendered as usual, like the clips with a mask
+          written with a codec which can store transparency. The directory is
+          never emptied. Default to None (no cache).
+
+        convert_to_yuv
+          If True, the frames are converted to ``yuv420p`` with numpy before
+          being piped to ffmpeg, which halves the data piped and spares ffmpeg
+          the conversion, for videos encoded in ``yuv420p`` (the default of
+          most codecs). The width and height of the clip must be even. Ignored
+          for videos written with a mask.
+
+        conversion_threads
+          Number of threads converting the frames with ``convert_to_yuv``,
+          which can be raised for large frames. Default to None (no threads).
+
+        batch_size
+          If defined, the frames are computed ``batch_size`` at a time with
+          ``get_frames``, which cuts the Python overhead of each frame for
+          clips whose effects can transform stacks of frames, like
+          ``FadeIn``, ``MultiplyColor`` or ``InvertColors``, mostly at low
+          resolutions. Default to None (frames computed one at a time).
+
+        optimize
+          If True, the clip is rewritten with ``optimize`` before being
+          rendered, to compute the same frames with fewer steps (fewer
+          successive ``subclipped`` and ``MultiplySpeed``, no identity
+          effects...), and the logger tells the changes made. Default to True.
+
+        render_farm
+          List of the addresses ``(host, port)`` of render farm workers (see
+          ``RenderWorker``), on hosts with access to the media files of the
+          clip at the same paths, to render and encode the segments of the
+          video. They are sent the description of the clip (see
+          ``describe_clip``), and the segments they send back are joined
+          without re-encoding. The number of segments is ``segments``, or 4
+          per worker. The segments of failed workers are sent to the others,
+          and the logger tells the throughput of each worker. Clips which
+          can't be described, like clips whose frames are computed by
+          functions of time, are rendered locally. Default to None.
+
         Examples
         --------
 
@@ -337,31 +610,32 @@ class VideoClip(Clip):
         ext = ext[1:].lower()
         logger = proglog.default_bar_logger(logger)
 
-        if codec is None:
-            try:
-                codec = extensions_dict[ext]["codec"][0]
-            except KeyError:
-                raise ValueError(
-                    "MoviePy couldn't find the codec associated "
-                    "with the filename. Provide the 'codec' "
-                    "parameter in write_videofile."
-                )
+        clip = self
+        if optimize:
+            from moviepy.video.tools.optimize import optimize as optimize_clip
 
-        if audio_codec is None:
-            if ext in ["ogv", "webm"]:
-                audio_codec = "libvorbis"
-            else:
-                audio_codec = "libmp3lame"
-        elif audio_codec == "raw16":
-            audio_codec = "pcm_s16le"
-        elif audio_codec == "raw32":
-            audio_codec = "pcm_s32le"
+            clip, changes = optimize_clip(self)
+            for change in changes:
+                logger(message="MoviePy - Optimized the clip: %s" % change)
+
+        codec, audio_codec = video_codecs(ext, codec, audio_codec)
 
         audiofile = audio if isinstance(audio, str) else None
         make_audio = (
-            (audiofile is None) and (audio is True) and (self.audio is not None)
+            (audiofile is None) and (audio is True) and (clip.audio is not None)
         )
 
+        audio_clip = None
+        if make_audio and pipe_audio and (os.name != "nt"):
+            if not (
+                (segments and (segments > 1))
+                or smart_render
+                or render_cache
+                or render_farm
+            ):
+                # The sound is computed and piped to ffmpeg with the frames
+                audio_clip, make_audio = clip.audio, False
+
         if make_audio and temp_audiofile:
             # The audio will be the clip's audio
             audiofile = temp_audiofile
@@ -372,11 +646,35 @@ class VideoClip(Clip):
                 name + Clip._TEMP_FILES_PREFIX + "wvf_snd.%s" % audio_ext,
             )
 
-        # enough cpu for multiprocessing ? USELESS RIGHT NOW, WILL COME AGAIN
-        # enough_cpu = (multiprocessing.cpu_count() > 1)
         logger(message="MoviePy - Building video %s." % filename)
+        if ffmpeg_filters:
+            from moviepy.video.io.ffmpeg_filter_graph import ffmpeg_write_filter_graph
+
+            try:
+                ffmpeg_write_filter_graph(
+                    clip,
+                    filename,
+                    fps,
+                    codec,
+                    bitrate=bitrate,
+                    preset=preset,
+                    audio=audio,
+                    audio_fps=audio_fps,
+                    audio_codec=audio_codec,
+                    audio_bitrate=audio_bitrate,
+                    threads=threads,
+                    ffmpeg_params=ffmpeg_params,
+                    pixel_format=pixel_format,
+                    logger=logger,
+                )
+            except ValueError as error:
+                logger(message="MoviePy - Rendering the frames in Python: %s" % error)
+            else:
+                logger(message="MoviePy - video ready %s" % filename)
+                return
+
         if make_audio:
-            self.audio.write_audiofile(
+            clip.audio.write_audiofile(
                 audiofile,
                 audio_fps,
                 audio_nbytes,
@@ -391,7 +689,7 @@ class VideoClip(Clip):
             audio_codec = "copy"
 
         ffmpeg_write_video(
-            self,
+            clip,
             filename,
             fps,
             codec,
@@ -404,6 +702,19 @@ class VideoClip(Clip):
             ffmpeg_params=ffmpeg_params,
             logger=logger,
             pixel_format=pixel_format,
+            workers=workers,
+            segments=segments,
+            audio_clip=audio_clip,
+            audio_fps=audio_fps,
+            audio_nbytes=audio_nbytes,
+            audio_bufsize=audio_bufsize,
+            audio_bitrate=audio_bitrate,
+            smart_render=smart_render,
+            render_cache=render_cache,
+            convert_to_yuv=convert_to_yuv,
+            conversion_threads=conversion_threads,
+            batch_size=batch_size,
+            render_farm=render_farm,
         )
 
         if remove_temp and make_audio:
@@ -411,6 +722,335 @@ class VideoClip(Clip):
                 os.remove(audiofile)
         logger(message="MoviePy - video ready %s" % filename)
 
+    @requires_duration
+    @use_clip_fps_by_default
+    @convert_masks_to_RGB
+    @convert_path_to_string(["filename", "temp_audiofile_path"])
+    async def write_videofile_progress(
+        self,
+        filename,
+        fps=None,
+        codec=None,
+        bitrate=None,
+        audio=True,
+        audio_fps=44100,
+        preset="medium",
+        audio_nbytes=4,
+        audio_codec=None,
+        audio_bitrate=None,
+        audio_bufsize=2000,
+        temp_audiofile_path="",
+        threads=None,
+        ffmpeg_params=None,
+        pixel_format=None,
+        convert_to_yuv=False,
+        optimize=True,
+    ):
+        """Writes the clip to a video file in asyncio coroutines, and yields the
+        progress as tuples ``(frames_written, n_frames)``, with ``async for``.
+
+        The sound is written to a temporary audio file first, then the frames
+        are computed one after the other in threads of the event loop, and
+        both are sent to ffmpeg over asyncio pipes (see
+        ``FFMPEG_AsyncAudioWriter`` and ``FFMPEG_AsyncVideoWriter``).
+        The next frame is computed once ffmpeg has read the previous one, so a
+        slow encoder slows down the computing of the frames, and the event
+        loop is never blocked.
+
+        Cancelling the task iterating over the progress, or closing the
+        iterator (for instance with ``contextlib.aclosing``, when breaking out
+        of the loop), terminates ffmpeg, also while the sound is written,
+        leaving the video unfinished. Only the chunk of sound or frame being
+        computed in a thread is finished first.
+
+        The parameters are the ones of ``write_videofile``.
+
+        Examples
+        --------
+
+        .. code:: python
+
+            async for frames_written, n_frames in clip.write_videofile_progress(
+                "video.mp4"
+            ):
+                await websocket.send_json({"progress": frames_written / n_frames})
+        """
+        from moviepy.video.io.ffmpeg_async import (
+            ffmpeg_audiowrite_async,
+            ffmpeg_write_video_async,
+        )
+
+        name, ext = os.path.splitext(os.path.basename(filename))
+        codec, audio_codec = video_codecs(ext[1:].lower(), codec, audio_codec)
+
+        clip = self
+        if optimize:
+            from moviepy.video.tools.optimize import optimize as optimize_clip
+
+            clip, _ = optimize_clip(self)
+
+        audiofile = audio if isinstance(audio, str) else None
+        make_audio = (audiofile is None) and audio and (clip.audio is not None)
+        if make_audio:
+            audiofile = os.path.join(
+                temp_audiofile_path,
+                name
+                + Clip._TEMP_FILES_PREFIX
+                + "wvf_snd.%s" % find_extension(audio_codec),
+            )
+        try:
+            if make_audio:
+                await ffmpeg_audiowrite_async(
+                    clip.audio,
+                    audiofile,
+                    audio_fps,
+                    audio_nbytes,
+                    audio_bufsize,
+                    audio_codec,
+                    bitrate=audio_bitrate,
+                )
+                audio_codec = "copy"
+
+            writing = ffmpeg_write_video_async(
+                clip,
+                filename,
+                fps,
+                codec,
+                bitrate=bitrate,
+                preset=preset,
+                audiofile=audiofile,
+                audio_codec=audio_codec,
+                threads=threads,
+                ffmpeg_params=ffmpeg_params,
+                pixel_format=pixel_format,
+                convert_to_yuv=convert_to_yuv,
+            )
+            try:
+                async for progress in writing:
+                    yield progress
+            finally:
+                # terminates ffmpeg now if this iterator is closed
+                await writing.aclose()
+        finally:
+            if make_audio and os.path.exists(audiofile):
+                os.remove(audiofile)
+
+    async def write_videofile_async(self, filename, *args, **kwargs):
+        """Writes the clip to a video file in asyncio coroutines, with
+        ``await clip.write_videofile_async(filename)``. See
+        ``write_videofile_progress`` for the details and parameters.
+        """
+        async for _ in self.write_videofile_progress(filename, *args, **kwargs):
+            pass
+
+    @requires_duration
+    @use_clip_fps_by_default
+    @convert_masks_to_RGB
+    def write_videofiles(
+        self,
+        outputs,
+        fps=None,
+        audio=True,
+        audio_fps=44100,
+        audio_nbytes=4,
+        audio_bufsize=2000,
+        temp_audiofile_path="",
+        remove_temp=True,
+        logger="bar",
+    ):
+        """Write the clip to several video files at once, for instance at
+        several resolutions, computing each frame and the sound only once.
+
+        The frames are resized for each smaller output from the next bigger one,
+        and encoded by one ffmpeg process per output, in parallel. The sound is
+        written once to a temporary WAV file, which each output encodes.
+
+        Parameters
+        ----------
+
+        outputs
+          List of dictionaries describing the video files, with the key
+          ``"filename"``, and optionally ``"size"`` (width, height) or
+          ``"height"`` (the width is then computed to keep the aspect ratio of
+          the clip, rounded to an even number), and the parameters ``"codec"``,
+          ``"bitrate"``, ``"preset"``, ``"audio_codec"``, ``"audio_bitrate"``,
+          ``"threads"``, ``"ffmpeg_params"`` and ``"pixel_format"`` of
+          ``write_videofile``. The files have the size of the clip by default.
+
+        audio
+          Either ``True``, ``False``, or the name of an audio file used as the
+          soundtrack of all the files.
+
+        Other parameters are the ones of ``write_videofile``.
+
+        Examples
+        --------
+
+        .. code:: python
+
+            clip.write_videofiles(
+                [
+                    {"filename": "video_1080p.mp4", "height": 1080},
+                    {"filename": "video_720p.mp4", "height": 720},
+                    {"filename": "video_480p.mp4", "height": 480, "bitrate": "1M"},
+                ]
+            )
+        """
+        logger = proglog.default_bar_logger(logger)
+
+        writers_outputs = []
+        for output in outputs:
+            output = dict(output)
+            filename = os.fspath(output["filename"])
+            ext = os.path.splitext(filename)[1][1:].lower()
+            output["filename"] = filename
+
+            if "height" in output:
+                height = output.pop("height")
+                width = 2 * round(self.w * height / self.h / 2)
+                output["size"] = (width, height)
+            output.setdefault("size", self.size)
+
+            output["codec"], output["audio_codec"] = video_codecs(
+                ext, output.get("codec"), output.get("audio_codec")
+            )
+
+            audio_bitrate = output.pop("audio_bitrate", None)
+            if audio_bitrate is not None:
+                output["ffmpeg_params"] = list(output.get("ffmpeg_params") or []) + [
+                    "-b:a",
+                    audio_bitrate,
+                ]
+            writers_outputs.append(output)
+
+        audiofile = audio if isinstance(audio, str) else None
+        make_audio = (audiofile is None) and audio and (self.audio is not None)
+        if make_audio:
+            # The sound is computed once, and stored without loss
+            name = os.path.splitext(os.path.basename(writers_outputs[0]["filename"]))[0]
+            audiofile = os.path.join(
+                temp_audiofile_path, name + Clip._TEMP_FILES_PREFIX + "wvfs_snd.wav"
+            )
+            self.audio.write_audiofile(
+                audiofile,
+                audio_fps,
+                audio_nbytes,
+                audio_bufsize,
+                "pcm_s%dle" % (8 * audio_nbytes),
+                logger=logger,
+            )
+
+        logger(message="MoviePy - Building %d videos." % len(writers_outputs))
+        try:
+            ffmpeg_write_videos(
+                self, writers_outputs, fps, audiofile=audiofile, logger=logger
+            )
+        finally:
+            if remove_temp and make_audio and os.path.exists(audiofile):
+                os.remove(audiofile)
+        logger(message="MoviePy - videos ready")
+
+    @requires_duration
+    @use_clip_fps_by_default
+    @convert_masks_to_RGB
+    def write_videostream(
+        self,
+        output,
+        fps=None,
+        format="mp4",
+        codec="libx264",
+        bitrate=None,
+        preset="veryfast",
+        audio=True,
+        audio_fps=44100,
+        audio_codec="aac",
+        audio_bitrate=None,
+        fragment_duration=1,
+        threads=None,
+        ffmpeg_params=None,
+        queue_size=None,
+        logger="bar",
+    ):
+        """Stream the clip while it is rendered to a file-like object, a socket
+        or the standard output, as a fragmented MP4 or a MPEG-TS stream which
+        can be played before its end.
+
+        The bytes are sent as soon as ffmpeg muxes them, a fragment at least
+        every ``fragment_duration`` seconds of video, with the sound of the
+        clip interleaved (see ``FFMPEG_VideoStreamWriter``).
+
+        Parameters
+        ----------
+
+        output
+          A file-like object opened in binary mode, a connected socket, or
+          ``"-"`` for the standard output.
+
+        format
+          ``"mp4"`` for fragmented MP4 (default), or ``"mpegts"``.
+
+        audio
+          Either ``True``, ``False``, or the name of an audio file streamed as
+          the soundtrack of the video. With ``True``, the sound of the clip is
+          computed while the frames are streamed, which is not available on
+          Windows.
+
+        fragment_duration
+          Duration in seconds of the fragments of the stream, and interval
+          between its keyframes. Default to 1.
+
+        queue_size
+          Number of frames which can be queued for ffmpeg while the next ones
+          are rendered (see ``write_videofile``). Each queued frame adds to the
+          latency of the stream.
+
+        Other parameters are the ones of ``write_videofile``.
+
+        Examples
+        --------
+
+        .. code:: python
+
+            with socket.create_connection(("localhost", 8000)) as connection:
+                clip.write_videostream(connection, format="mpegts")
+        """
+        logger = proglog.default_bar_logger(logger)
+        audiofile = audio if isinstance(audio, str) else None
+        audio_clip = None
+        if (audiofile is None) and audio and (self.audio is not None):
+            if os.name == "nt":
+                raise ValueError(
+                    "MoviePy error: the sound of a clip can't be streamed on "
+                    "Windows, give an audio file with the 'audio' argument."
+                )
+            audio_clip = self.audio
+
+        logger(message="MoviePy - Streaming video.")
+        with FFMPEG_VideoStreamWriter(
+            output,
+            self.size,
+            fps,
+            format=format,
+            fragment_duration=fragment_duration,
+            codec=codec,
+            preset=preset,
+            bitrate=bitrate,
+            audiofile=audiofile,
+            audio_codec=audio_codec,
+            threads=threads,
+            ffmpeg_params=ffmpeg_params,
+            queue_size=queue_size,
+            audio_clip=audio_clip,
+            audio_fps=audio_fps,
+            audio_bitrate=audio_bitrate,
+        ) as writer:
+            for frame in self.iter_frames(logger=logger, fps=fps, dtype="uint8"):
+                writer.write_frame(frame)
+        logger(
+            message="MoviePy - Stream done, %d bytes sent"
+            % writer.metrics["bytes_sent"]
+        )
+
     @requires_duration
     @use_clip_fps_by_default
     @convert_masks_to_RGB
@@ -637,6 +1277,15 @@ class VideoClip(Clip):
             clip=self, fps=fps, audio_flag=audio_flag, video_flag=video_flag
         )
 
+    def display_in_notebook(self, *args, **kwargs):
+        """Displays the clip in a Jupyter Notebook. Imports IPython the first
+        time it is used. See ``moviepy.video.io.display_in_notebook`` for the
+        parameters.
+        """
+        from moviepy.video.io.display_in_notebook import display_in_notebook
+
+        return display_in_notebook(self, *args, **kwargs)
+
     # -----------------------------------------------------------------
     # F I L T E R I N G
 
@@ -672,12 +1321,109 @@ class VideoClip(Clip):
 
     # IMAGE FILTERS
 
-    def image_transform(self, image_func, apply_to=None):
+    def image_transform(
+        self, image_func, apply_to=None, batched=False, color_table=None
+    ):
         """Modifies the images of a clip by replacing the frame `get_frame(t)` by
         another frame,  `image_func(get_frame(t))`.
+
+        Set ``batched`` to True if ``image_func`` can also transform stacks of
+        frames (arrays of shape (N, H, W, ...)), like pointwise functions
+        indexing the channels with ``[..., i]``, so that ``get_frames``
+        transforms the frames at several times at once.
+
+        ``color_table`` is the ``ColorTable`` of ``image_func`` if it
+        transforms RGB frames with 8 bits per channel pointwise, so that it is
+        fused with the color effects applied before and after it (see
+        ``color_transform``).
         """
         apply_to = apply_to or []
-        return self.transform(lambda get_frame, t: image_func(get_frame(t)), apply_to)
+
+        def func(get_frame, t):
+            return image_func(get_frame(t))
+
+        def batch_func(get_frames, ts):
+            return image_func(get_frames(ts))
+
+        if color_table is not None and not apply_to:
+            return self.color_transform(
+                color_table, func, batch_func=batch_func if batched else None
+            )
+        return self.with_frame_step(
+            ("image", image_func), apply_to, batch_func=batch_func if batched else None
+        )
+
+    def color_transform(self, color_table, func, batch_func=None):
+        """Returns the clip transformed by a color effect, whose frames are
+        computed with a single lookup table for consecutive color effects.
+
+        The frames of the new clip which are RGB frames with 8 bits per channel
+        are the frames of the first clip of the chain of color effects,
+        transformed by the fusion of the color tables of the effects (see
+        ``ColorTable``), instead of each effect in turn. The other frames, like
+        the frames of masks, are computed by the ``func`` of each effect in
+        turn, from the frame of the first clip.
+
+        Parameters
+        ----------
+
+        color_table : ColorTable or function
+          The color table of the effect, or a function returning its color
+          table at time ``t``, or None if it leaves the frame unchanged.
+
+        func : function
+          The effect as a function (get_frame, t -> frame), see ``transform``,
+          using only the frame at time ``t``.
+
+        batch_func : function, optional
+          The effect as a function (get_frames, ts -> frames), see
+          ``transform``.
+        """
+        new_clip = self.transform(func, batch_func=batch_func)
+        clip, color_tables, effects = self, [], []
+        if (self.color_tables is not None) and (
+            self.color_tables[3] is self.frame_function
+        ):
+            clip, color_tables, effects, _ = self.color_tables
+        color_tables = color_tables + [color_table]
+        effects = effects + [(func, batch_func)]
+
+        def transform_colors(frames, t):
+            tables = [table(t) if callable(table) else table for table in color_tables]
+            for table in fuse_color_tables(tables):
+                frames = table.apply(frames)
+            return frames
+
+        def apply_effects(frame, t):
+            for effect_func, _ in effects:
+                frame = effect_func(lambda t, frame=frame: frame, t)
+            return frame
+
+        def frame_function(t):
+            frame = clip.get_frame(t)
+            if not is_rgb_frame(frame):
+                return apply_effects(frame, t)
+            if is_constant_frame(frame):
+                pixel = transform_colors(frame[:1, :1], t)
+                return np.broadcast_to(pixel, frame.shape)
+            return transform_colors(frame, t)
+
+        def frames_function(ts):
+            frames = clip.get_frames(ts)
+            if not is_rgb_frame(frames):
+                if any(effect_batch_func is None for _, effect_batch_func in effects):
+                    return np.stack([apply_effects(*args) for args in zip(frames, ts)])
+                for _, effect_batch_func in effects:
+                    frames = effect_batch_func(lambda ts, frames=frames: frames, ts)
+                return frames
+            if any(callable(table) for table in color_tables):
+                return np.stack([transform_colors(*args) for args in zip(frames, ts)])
+            return transform_colors(frames, None)
+
+        new_clip.frame_function = frame_function
+        new_clip.frames_function = (frames_function, frame_function)
+        new_clip.color_tables = (clip, color_tables, effects, frame_function)
+        return new_clip
 
     # --------------------------------------------------------------
     # C O M P O S I T I N G
@@ -717,7 +1463,7 @@ class VideoClip(Clip):
             post_array = np.hstack((post_array, x_1))
         return post_array
 
-    def compose_on(self, background: Image.Image, t) -> Image.Image:
+    def compose_on(self, background: Image.Image, t, bounds=None) -> Image.Image:
         """Returns the result of the clip's frame at time `t` on top
         on the given `picture`, the position of the clip being given
         by the clip's ``pos`` attribute. Meant for compositing.
@@ -736,16 +1482,42 @@ class VideoClip(Clip):
         t
           The time of clip to apply on top of clip
 
+        bounds
+          Optional rectangle ``(x1, y1, x2, y2)`` of the background outside of
+          which the clip must not be drawn.
+
         Return
         """
+        layer = self.layer_image(t, background.size, bounds)
+        if layer is None:
+            return background
+        return blit_image(background, *layer)
+
+    def layer_image(self, t, background_size, bounds=None):
+        """Returns the Pillow image of the clip at time `t`, with its mask as
+        alpha layer if the clip has transparency, and its position on a
+        background of size ``background_size``, as a tuple ``(image, pos)``.
+
+        If ``bounds`` is given, the image is cropped to the part of the clip
+        within these bounds, and ``None`` is returned if there is none.
+        """
         ct = t - self.start  # clip time
 
         # GET IMAGE AND MASK IF ANY
-        clip_frame = self.get_frame(ct).astype("uint8")
-        clip_img = Image.fromarray(clip_frame)
-
-        if self.mask is not None:
-            clip_mask = (self.mask.get_frame(ct) * 255).astype("uint8")
+        clip_frame = self.get_frame(ct)
+        clip_img = frame_to_image(clip_frame)
+
+        clip_mask = None if self.mask is None else self.mask.get_frame(ct)
+        if is_constant_frame(clip_mask) and clip_mask.shape == clip_frame.shape[:2]:
+            # Constant masks are applied as a single alpha value, and fully
+            # opaque ones are not applied at all
+            alpha = int(clip_mask[0, 0] * 255)
+            if alpha != 255:
+                clip_img = clip_img.convert("RGBA")
+                clip_img.putalpha(alpha)
+
+        elif clip_mask is not None:
+            clip_mask = (clip_mask * 255).astype("uint8")
             clip_mask_img = Image.fromarray(clip_mask).convert("L")
 
             # Resize clip_mask_img to match clip_img, always use top left corner
@@ -767,33 +1539,28 @@ class VideoClip(Clip):
 
         # SET POSITION
         pos = self.pos(ct)
-        pos = compute_position(clip_img.size, background.size, pos, self.relative_pos)
-
-        # If neither background nor clip have alpha layer (check if mode end
-        # with A), we can juste use pillow paste
-        if clip_img.mode[-1] != "A" and background.mode[-1] != "A":
-            background.paste(clip_img, pos)
-            return background
-
-        # For images with transparency we must use pillow alpha composite
-        # instead of a simple paste, because pillow paste dont work nicely
-        # with alpha compositing
-        if background.mode[-1] != "A":
-            background = background.convert("RGBA")
-
-        if clip_img.mode[-1] != "A":
-            clip_img = clip_img.convert("RGBA")
+        pos = compute_position(clip_img.size, background_size, pos, self.relative_pos)
+
+        if bounds is not None:
+            # Crop the clip to its part within the bounds
+            x1, y1, x2, y2 = bounds
+            box = (
+                max(x1 - pos[0], 0),
+                max(y1 - pos[1], 0),
+                min(x2 - pos[0], clip_img.width),
+                min(y2 - pos[1], clip_img.height),
+            )
+            if (box[2] <= box[0]) or (box[3] <= box[1]):
+                return None
+            if box != (0, 0, clip_img.width, clip_img.height):
+                clip_img = clip_img.crop(box)
+                pos = (pos[0] + box[0], pos[1] + box[1])
 
-        # We need both image to do the same size for alpha compositing in pillow
-        # so we must start by making a fully transparent canvas of background's
-        # size and paste our clip img into it in position pos, only then can we
-        # composite this canvas on top of background
-        canvas = Image.new("RGBA", (background.width, background.height), (0, 0, 0, 0))
-        canvas.paste(clip_img, pos)
-        result = Image.alpha_composite(background, canvas)
-        return result
+        return clip_img, pos
 
-    def compose_mask(self, background_mask: np.ndarray, t: float) -> np.ndarray:
+    def compose_mask(
+        self, background_mask: np.ndarray, t: float, bounds=None
+    ) -> np.ndarray:
         """Returns the result of the clip's mask at time `t` composited
         on the given `background_mask`, the position of the clip being given
         by the clip's ``pos`` attribute. Meant for compositing.
@@ -807,56 +1574,34 @@ class VideoClip(Clip):
 
         t:
           The time position in the clip at which to extract the mask.
+
+        bounds:
+          Optional rectangle ``(x1, y1, x2, y2)`` of the background mask outside
+          of which the clip mask must not be drawn.
+        """
+        clip_mask, pos = self.layer_mask(t, background_mask.shape[::-1])
+        return blit_mask(background_mask, clip_mask, pos, bounds)
+
+    def layer_mask(self, t: float, background_size):
+        """Returns the frame of the clip, which must be a mask, at time `t` and
+        its position on a background of size ``background_size``, as a tuple
+        ``(mask, pos)``. Meant for compositing.
         """
         ct = t - self.start  # clip time
-        clip_mask = self.get_frame(ct).astype("float")
+        clip_mask = self.get_frame(ct)
 
-        # numpy shape is H*W not W*H
-        bg_h, bg_w = background_mask.shape
-        clip_h, clip_w = clip_mask.shape
+        if is_constant_frame(clip_mask):
+            # Keep constant masks as a broadcast value rather than an array
+            clip_mask = np.broadcast_to(float(clip_mask[0, 0]), clip_mask.shape)
+        else:
+            clip_mask = clip_mask.astype("float")
 
         # SET POSITION
         pos = self.pos(ct)
-        pos = compute_position((clip_w, clip_h), (bg_w, bg_h), pos, self.relative_pos)
-
-        # ALPHA COMPOSITING
-        # Determine the base_mask region to merge size
-        x_start = int(max(pos[0], 0))  # Dont go under 0 left
-        x_end = int(min(pos[0] + clip_w, bg_w))  # Dont go over base_mask width
-        y_start = int(max(pos[1], 0))  # Dont go under 0 top
-        y_end = int(min(pos[1] + clip_h, bg_h))  # Dont go over base_mask height
-
-        # Determine the clip_mask region to overlapp
-        # Dont go under 0 for horizontal, if we have negative margin of X px start at X
-        # And dont go over clip width
-        clip_x_start = int(max(0, -pos[0]))
-        clip_x_end = int(clip_x_start + min((x_end - x_start), (clip_w - clip_x_start)))
-        # same for vertical
-        clip_y_start = int(max(0, -pos[1]))
-        clip_y_end = int(clip_y_start + min((y_end - y_start), (clip_h - clip_y_start)))
-
-        # Blend the overlapping regions
-        # The calculus is base_opacity + clip_opacity * (1 - base_opacity)
-        # this ensure that masks are drawn in the right order and
-        # the contribution of each mask is proportional to their transparency
-        #
-        # Note :
-        # Thinking in transparency is hard, as we tend to think
-        # that 50% opaque + 40% opaque = 90% opacity, when it really its 70%
-        # It's a lot easier to think in terms of "passing light"
-        # Consider I emit 100 photons, and my first layer is 50% opaque, meaning it
-        # will "stop" 50% of the photons, I'll have 50 photons left
-        # now my second layer is blocking 40% of thoses 50 photons left
-        # blocking 50 * 0.4 = 20 photons, and leaving me with only 30 photons
-        # So, by adding two layer of 50% and 40% opacity my finaly opacity is only
-        # of (100-30)*100 = 70% opacity !
-        background_mask[y_start:y_end, x_start:x_end] = background_mask[
-            y_start:y_end, x_start:x_end
-        ] + clip_mask[clip_y_start:clip_y_end, clip_x_start:clip_x_end] * (
-            1 - background_mask[y_start:y_end, x_start:x_end]
+        pos = compute_position(
+            clip_mask.shape[::-1], background_size, pos, self.relative_pos
         )
-
-        return background_mask
+        return clip_mask, pos
 
     def with_background_color(self, size=None, color=(0, 0, 0), pos=None, opacity=None):
         """Place the clip on a colored background.
@@ -921,6 +1666,8 @@ class VideoClip(Clip):
         attribute set to `mf`.
         """
         self.frame_function = frame_function
+        self.source = self.sections = self.operation = self.frames_function = None
+        self.color_tables = self.reader_options = None
         self.size = self.get_frame(0).shape[:2][::-1]
 
     @outplace
@@ -955,7 +1702,7 @@ class VideoClip(Clip):
             else:
 
                 def frame_function(t):
-                    return np.ones(self.get_frame(t).shape[:2], dtype=float)
+                    return np.broadcast_to(1.0, self.get_frame(t).shape[:2])
 
                 mask = VideoClip(is_mask=True, frame_function=frame_function)
         self.mask = mask
@@ -973,7 +1720,7 @@ class VideoClip(Clip):
         Returns a semi-transparent copy of the clip where the mask is
         multiplied by ``op`` (any float, normally between 0 and 1).
         """
-        self.mask = self.mask.image_transform(lambda pic: opacity * pic)
+        self.mask = self.mask.image_transform(pointwise(lambda pic: opacity * pic))
 
     @apply_to_mask
     @outplace
@@ -1006,8 +1753,10 @@ class VideoClip(Clip):
         self.relative_pos = relative
         if hasattr(pos, "__call__"):
             self.pos = pos
+            self.constant_pos = None
         else:
             self.pos = lambda t: pos
+            self.constant_pos = pos
 
     @apply_to_mask
     @outplace
@@ -1342,44 +2091,60 @@ class ImageClip(VideoClip):
         # if the image was just a 2D mask, it should arrive here
         # unchanged
         self.frame_function = lambda t: img
+        self.frames_function = (
+            lambda ts: np.broadcast_to(img, (len(ts),) + img.shape),
+            self.frame_function,
+        )
         self.size = img.shape[:2][::-1]
         self.img = img
 
-    def transform(self, func, apply_to=None, keep_duration=True):
+    def with_frame_step(self, step, apply_to=None, keep_duration=True, batch_func=None):
         """General transformation filter.
 
-        Equivalent to VideoClip.transform. The result is no more an
-        ImageClip, it has the class VideoClip (since it may be animated)
+        Equivalent to VideoClip.with_frame_step, used by VideoClip.transform.
+        The result is no more an ImageClip, it has the class VideoClip (since
+        it may be animated)
         """
         if apply_to is None:
             apply_to = []
         # When we use transform on an image clip it may become animated.
         # Therefore the result is not an ImageClip, just a VideoClip.
-        new_clip = VideoClip.transform(
-            self, func, apply_to=apply_to, keep_duration=keep_duration
+        new_clip = VideoClip.with_frame_step(
+            self,
+            step,
+            apply_to=apply_to,
+            keep_duration=keep_duration,
+            batch_func=batch_func,
         )
         new_clip.__class__ = VideoClip
         return new_clip
 
     @outplace
-    def image_transform(self, image_func, apply_to=None):
+    def image_transform(
+        self, image_func, apply_to=None, batched=False, color_table=None
+    ):
         """Image-transformation filter.
 
         Does the same as VideoClip.image_transform, but for ImageClip the
         transformed clip is computed once and for all at the beginning,
-        and not for each 'frame'.
+        and not for each 'frame', so ``color_table`` is not used.
         """
         if apply_to is None:
             apply_to = []
         arr = image_func(self.get_frame(0))
         self.size = arr.shape[:2][::-1]
         self.frame_function = lambda t: arr
+        self.frames_function = (
+            lambda ts: np.broadcast_to(arr, (len(ts),) + arr.shape),
+            self.frame_function,
+        )
         self.img = arr
+        self.source = self.operation = self.color_tables = None
 
         for attr in apply_to:
             a = getattr(self, attr, None)
             if a is not None:
-                new_a = a.image_transform(image_func)
+                new_a = a.image_transform(image_func, batched=batched)
                 setattr(self, attr, new_a)
 
     @outplace
@@ -1418,6 +2183,13 @@ class ColorClip(ImageClip):
     is_mask
       Set to true if the clip will be used as a mask.
 
+    Notes
+    -----
+
+    The color is not repeated in memory for each pixel: the frame of the clip is
+    a read-only ``np.broadcast_to`` view of the color, which compositing and
+    pointwise effects process as a single pixel (see
+    ``moviepy.tools.is_constant_frame``).
     """
 
     def __init__(self, size, color=None, is_mask=False, duration=None):
@@ -1440,10 +2212,19 @@ class ColorClip(ImageClip):
                 )
             shape = (h, w, len(color))
 
+        opacity = None
+        if len(shape) == 3 and shape[2] == 4:
+            # Make the transparency a constant mask rather than an array
+            opacity = color[3] / 255
+            color, shape = color[:3], (h, w, 3)
+
         super().__init__(
-            np.tile(color, w * h).reshape(shape), is_mask=is_mask, duration=duration
+            np.broadcast_to(np.array(color), shape), is_mask=is_mask, duration=duration
         )
 
+        if opacity is not None:
+            self.mask = ColorClip(size, opacity, is_mask=True)
+
 
 class TextClip(ImageClip):
     """Class for autogenerated text clips.
@@ -1735,7 +2516,7 @@ class TextClip(ImageClip):
         # always have a useless margin (the diff between ascender and top) on any
         # text. That mean our Y is actually not from 0 for top, but need to be
         # increment by ascent, since we have to reference from baseline.
-        (ascent, _) = pil_font.getmetrics()
+        ascent, _ = pil_font.getmetrics()
         y += ascent
 
         # Add margins and stroke size to start point
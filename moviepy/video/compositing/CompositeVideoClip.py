@@ -1,12 +1,51 @@
 """Main video composition interface of MoviePy."""
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 
 import numpy as np
 from PIL import Image
 
 from moviepy.audio.AudioClip import CompositeAudioClip
-from moviepy.video.VideoClip import ColorClip, VideoClip
+from moviepy.tools import compute_position, is_constant_frame
+from moviepy.video.VideoClip import (
+    ColorClip,
+    VideoClip,
+    blit_image,
+    blit_mask,
+    frame_to_image,
+)
+
+
+THREAD_POOLS = {}
+THREAD_POOLS_LOCK = threading.Lock()
+
+
+def get_thread_pool(threads):
+    """Returns the thread pool of ``threads`` workers shared by all the
+    compositions blending their frames with this number of threads.
+    """
+    with THREAD_POOLS_LOCK:
+        if threads not in THREAD_POOLS:
+            THREAD_POOLS[threads] = ThreadPoolExecutor(
+                max_workers=threads, thread_name_prefix="moviepy_compositing"
+            )
+        return THREAD_POOLS[threads]
+
+
+def reset_thread_pools():
+    """Forgets the thread pools, whose threads are not inherited by forked
+    processes.
+    """
+    global THREAD_POOLS_LOCK
+    THREAD_POOLS.clear()
+    THREAD_POOLS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_thread_pools)
 
 
 class CompositeVideoClip(VideoClip):
@@ -49,12 +88,39 @@ class CompositeVideoClip(VideoClip):
       have the same size as the final clip. If it has no transparency, the final
       clip will have no mask.
 
+    threads
+      Number of threads used to blend the clips. If greater than 1, the frame
+      is split into as many horizontal stripes, which are blended in parallel
+      with the frames of the clips, fetched once, as they are made of Pillow
+      and numpy operations which release the GIL. The result is the same as
+      without threads. Default to None (no threads).
+
     The clip with the highest FPS will be the FPS of the composite clip.
 
+    Attributes
+    ----------
+
+    clips
+      The clips given to the composition, except the background clip with
+      ``use_bgclip``, sorted by layer. The compositions among them are
+      flattened when blitted (see ``flatten_clips``).
+
+    input_clips
+      The list of clips given to the composition.
+
+    transparent
+      Whether the regions without clips are transparent.
+
     """
 
     def __init__(
-        self, clips, size=None, bg_color=None, use_bgclip=False, is_mask=False
+        self,
+        clips,
+        size=None,
+        bg_color=None,
+        use_bgclip=False,
+        is_mask=False,
+        threads=None,
     ):
         if size is None:
             size = clips[0].size
@@ -80,8 +146,10 @@ class CompositeVideoClip(VideoClip):
 
         self.size = size
         self.is_mask = is_mask
-        self.clips = clips
+        self.clips = self.input_clips = clips
         self.bg_color = bg_color
+        self.threads = threads
+        self.transparent = transparent
 
         # Use first clip as background if necessary, else use color
         # either set by user or previously generated
@@ -109,43 +177,182 @@ class CompositeVideoClip(VideoClip):
         if audioclips:
             self.audio = CompositeAudioClip(audioclips)
 
+        # blit the clips of nested compositions directly in this one
+        self._flat_clips = self.flatten_clips(self.clips)
+
         # compute mask if necessary
         if transparent:
-            maskclips = [
-                (clip.mask if (clip.mask is not None) else clip.with_mask().mask)
-                .with_position(clip.pos)
-                .with_end(clip.end)
-                .with_start(clip.start, change_end=False)
-                .with_layer_index(clip.layer_index)
-                for clip in self.clips
-            ]
+            maskclips = []
+            for clip in self._flat_clips:
+                maskclip = (
+                    (clip.mask if (clip.mask is not None) else clip.with_mask().mask)
+                    .with_position(clip.pos)
+                    .with_end(clip.end)
+                    .with_start(clip.start, change_end=False)
+                    .with_layer_index(clip.layer_index)
+                )
+                maskclip.composition_bounds = clip.composition_bounds
+                maskclips.append(maskclip)
 
             if use_bgclip and self.bg.mask:
                 maskclips = [self.bg.mask] + maskclips
 
             self.mask = CompositeVideoClip(
-                maskclips, self.size, is_mask=True, bg_color=0.0
+                maskclips, self.size, is_mask=True, bg_color=0.0, threads=threads
             )
 
+    def can_be_flattened(self, clip):
+        """Returns whether ``clip`` is a composition whose clips can be blitted
+        directly in this composition, giving the same result as blitting the
+        whole frame of ``clip``.
+
+        That is the case for unmodified compositions (only their position,
+        start, end and layer may have been changed) whose clips all have a
+        constant size, and whose mask, if any, is the one computed from their
+        clips. Compositions with a modified timeline, frames or mask (for
+        instance with ``subclipped``, ``with_effects`` or ``with_opacity``)
+        are blitted as a whole.
+        """
+        if not (
+            isinstance(clip, CompositeVideoClip)
+            and type(clip).frame_function is CompositeVideoClip.frame_function
+            and ("frame_function" not in clip.__dict__)
+            and clip.created_bg
+            and (clip.bg is not None)
+            and (clip.is_mask == self.is_mask)
+            and all(layer.has_constant_size for layer in clip.clips)
+        ):
+            return False
+
+        if clip.is_mask or (clip.bg.mask is None):
+            # opaque (or mask) composition
+            return clip.mask is None
+
+        return (
+            isinstance(clip.mask, CompositeVideoClip)
+            and ("frame_function" not in clip.mask.__dict__)
+            and len(clip.mask.clips) == len(clip._flat_clips)
+        )
+
+    def flatten_clips(self, clips):
+        """Returns the list of clips to blit in this composition, where the
+        compositions which can be flattened (see ``can_be_flattened``) are
+        replaced by copies of their own clips, with the timings, positions and
+        layer of the composition applied.
+
+        As a nested composition only shows the parts of its clips within its
+        frame, the rectangle of the composition is recorded in the
+        ``composition_bounds`` attribute of each of these copies (see
+        ``clip_bounds``), and the clips are cropped to it when blitted.
+        """
+        flat_clips = []
+        for clip in clips:
+            if not self.can_be_flattened(clip):
+                flat_clips.append(clip)
+                continue
+
+            # opaque compositions first blit their background color
+            has_opaque_bg = not (clip.is_mask or clip.bg.mask)
+            layers = ([clip.bg] if has_opaque_bg else []) + clip._flat_clips
+
+            for layer in layers:
+                flat_clip = self.flattened_layer(clip, layer)
+                if flat_clip is not None:
+                    flat_clips.append(flat_clip)
+        return flat_clips
+
+    def flattened_layer(self, composition, layer):
+        """Returns a copy of ``layer``, a clip blitted in ``composition``, which
+        can be blitted in this composition to give the same result. Returns
+        ``None`` if the layer is never visible.
+        """
+        start = composition.start + layer.start
+        end = composition.end
+        if layer.end is not None:
+            end = (
+                composition.start + layer.end
+                if end is None
+                else min(end, composition.start + layer.end)
+            )
+        if (end is not None) and (end <= start):
+            return None
+
+        w, h = composition.size
+        inner_bounds = layer.composition_bounds
+        outer_bounds = composition.composition_bounds
+
+        def composition_position(t):
+            # ``t`` is the time in the layer, ``t + layer.start`` the time in the
+            # composition
+            return compute_position(
+                composition.size,
+                self.size,
+                composition.pos(t + layer.start),
+                composition.relative_pos,
+            )
+
+        def position(t):
+            x, y = composition_position(t)
+            layer_x, layer_y = compute_position(
+                layer.size, composition.size, layer.pos(t), layer.relative_pos
+            )
+            return (x + layer_x, y + layer_y)
+
+        def bounds(t):
+            x, y = composition_position(t)
+            x1, y1, x2, y2 = 0, 0, w, h
+            if inner_bounds is not None:
+                ix1, iy1, ix2, iy2 = inner_bounds(t)
+                x1, y1, x2, y2 = max(x1, ix1), max(y1, iy1), min(x2, ix2), min(y2, iy2)
+            x1, y1, x2, y2 = x + x1, y + y1, x + x2, y + y2
+            if outer_bounds is not None:
+                # the composition was itself flattened in a composition
+                ox1, oy1, ox2, oy2 = outer_bounds(t + layer.start)
+                x1, y1, x2, y2 = max(x1, ox1), max(y1, oy1), min(x2, ox2), min(y2, oy2)
+            return (x1, y1, x2, y2)
+
+        flat_clip = layer.copy()
+        flat_clip.start, flat_clip.end = start, end
+        flat_clip.duration = None if end is None else end - start
+        flat_clip.pos = position
+        flat_clip.constant_pos = None
+        if (composition.constant_pos is not None) and (layer.constant_pos is not None):
+            flat_clip.constant_pos = position(0)
+        flat_clip.relative_pos = False
+        flat_clip.layer_index = composition.layer_index
+        flat_clip.composition_bounds = bounds
+        return flat_clip
+
     def frame_function(self, t):
         """The clips playing at time `t` are blitted over one another."""
         # For the mask we recalculate the final transparency we'll need
         # to apply on the result image
         if self.is_mask:
             mask = np.zeros((self.size[1], self.size[0]), dtype=float)
+            if self.threads and self.threads > 1:
+                return self.blend_mask_stripes(mask, t)
+
             for clip in self.playing_clips(t):
-                mask = clip.compose_mask(mask, t)
+                mask = clip.compose_mask(mask, t, bounds=self.clip_bounds(clip, t))
 
             return mask
 
         # Try doing clip merging with pillow
         bg_t = t - self.bg.start
-        bg_frame = self.bg.get_frame(bg_t).astype("uint8")
-        bg_img = Image.fromarray(bg_frame)
+        bg_frame = self.bg.get_frame(bg_t)
+        bg_img = frame_to_image(bg_frame)
 
+        bg_mask = None
         if self.bg.mask:
             bgm_t = t - self.bg.mask.start
-            bg_mask = (self.bg.mask.get_frame(bgm_t) * 255).astype("uint8")
+            bg_mask = self.bg.mask.get_frame(bgm_t)
+
+        if is_constant_frame(bg_mask) and bg_mask.shape == bg_frame.shape[:2]:
+            bg_img = bg_img.convert("RGBA")
+            bg_img.putalpha(int(bg_mask[0, 0] * 255))
+
+        elif bg_mask is not None:
+            bg_mask = (bg_mask * 255).astype("uint8")
             bg_mask_img = Image.fromarray(bg_mask).convert("L")
 
             # Resize bg_mask_img to match bg_img, always use top left corner
@@ -163,10 +370,15 @@ class CompositeVideoClip(VideoClip):
             bg_img = bg_img.convert("RGBA")
             bg_img.putalpha(bg_mask_img)
 
+        if self.threads and self.threads > 1:
+            return self.blend_image_stripes(bg_img, t)
+
         # For each clip apply on top of current img
         current_img = bg_img
         for clip in self.playing_clips(t):
-            current_img = clip.compose_on(current_img, t)
+            current_img = clip.compose_on(
+                current_img, t, bounds=self.clip_bounds(clip, t)
+            )
 
         # Turn Pillow image into a numpy array
         frame = np.array(current_img)
@@ -178,11 +390,68 @@ class CompositeVideoClip(VideoClip):
 
         return frame
 
+    def stripes(self, height):
+        """Returns the rows ``(y1, y2)`` of the horizontal stripes of a frame of
+        the given height blended in parallel, one per thread.
+        """
+        limits = np.linspace(0, height, min(self.threads, height) + 1).astype(int)
+        return list(zip(limits[:-1], limits[1:]))
+
+    def blend_image_stripes(self, bg_img, t):
+        """Returns the frame at time ``t``, made of the clips playing blitted on
+        ``bg_img``, the image of the background, one stripe per thread.
+        """
+        layers = []
+        for clip in self.playing_clips(t):
+            layer = clip.layer_image(t, bg_img.size, self.clip_bounds(clip, t))
+            if layer is not None:
+                layers.append(layer)
+
+        def blend_stripe(rows):
+            y1, y2 = rows
+            stripe = bg_img.crop((0, y1, bg_img.width, y2))
+            for clip_img, (x, y) in layers:
+                if (y < y2) and (y + clip_img.height > y1):
+                    stripe = blit_image(stripe, clip_img, (x, y - y1))
+            return np.array(stripe)[:, :, :3]
+
+        pool = get_thread_pool(self.threads)
+        return np.vstack(list(pool.map(blend_stripe, self.stripes(bg_img.height))))
+
+    def blend_mask_stripes(self, mask, t):
+        """Returns ``mask`` with the masks of the clips playing at time ``t``
+        composited on it, one stripe per thread.
+        """
+        layers = [
+            (clip.layer_mask(t, self.size), self.clip_bounds(clip, t))
+            for clip in self.playing_clips(t)
+        ]
+
+        def blend_stripe(rows):
+            y1, y2 = rows
+            stripe = mask[y1:y2]
+            for (clip_mask, (x, y)), bounds in layers:
+                if bounds is not None:
+                    bounds = (bounds[0], bounds[1] - y1, bounds[2], bounds[3] - y1)
+                blit_mask(stripe, clip_mask, (x, y - y1), bounds)
+
+        pool = get_thread_pool(self.threads)
+        list(pool.map(blend_stripe, self.stripes(mask.shape[0])))
+        return mask
+
+    def clip_bounds(self, clip, t):
+        """Returns the rectangle ``(x1, y1, x2, y2)`` outside of which ``clip``,
+        one of the clips of the composition, must not be drawn at time ``t``,
+        or ``None`` if it can be drawn anywhere.
+        """
+        bounds = clip.composition_bounds
+        return None if bounds is None else bounds(t - clip.start)
+
     def playing_clips(self, t=0):
         """Returns a list of the clips in the composite clips that are
         actually playing at the given time `t`.
         """
-        return [clip for clip in self.clips if clip.is_playing(t)]
+        return [clip for clip in self._flat_clips if clip.is_playing(t)]
 
     def close(self):
         """Closes the instance, releasing all the resources."""
@@ -196,6 +465,124 @@ class CompositeVideoClip(VideoClip):
             self.audio = None
 
 
+class ClipsArray(CompositeVideoClip):
+    """A CompositeVideoClip of clips displayed side by side, without overlaps,
+    as made by ``clips_array``. The frames are made by copying the frame of
+    each clip directly in its region of a copy of the background, filled once,
+    instead of blitting the clips over one another.
+
+    Parameters
+    ----------
+
+    clips
+      A list of videoclips of constant size, whose (constant) position is the
+      position of their top left corner in the final clip.
+
+    size
+      The size (width, height) of the final clip.
+
+    rects
+      For each clip, the rectangle ``(x1, y1, x2, y2)`` of the final clip where
+      it is displayed, which must be included in the clip and in the final clip.
+      The rectangles must not overlap.
+
+    bg_color
+      Color of the regions of the final clip where no clip is displayed. Set to
+      None for these regions to be transparent.
+
+    is_mask
+      Whether the clip is a mask.
+    """
+
+    def __init__(self, clips, size, rects, bg_color=None, is_mask=False):
+        fpss = [clip.fps for clip in clips if getattr(clip, "fps", None)]
+        self.fps = max(fpss) if fpss else None
+
+        VideoClip.__init__(self)
+
+        transparent = bg_color is None
+        if transparent:
+            bg_color = 0.0 if is_mask else (0, 0, 0)
+
+        self.size = size
+        self.is_mask = is_mask
+        self.clips = self._flat_clips = clips
+        self.bg_color = bg_color
+        self.bg = ColorClip(size, color=bg_color, is_mask=is_mask)
+        self.created_bg = True
+        self.threads = None
+        self.transparent = transparent
+
+        # background on which the clips are copied, with the padding regions
+        self.background = np.array(self.bg.get_frame(0))
+        if not is_mask:
+            self.background = self.background[:, :, :3].astype("uint8")
+
+        # regions of the final clip and of the clip frames to copy, by clip
+        self.cells = []
+        for clip, (x1, y1, x2, y2) in zip(clips, rects):
+            x, y = clip.pos(0)
+            self.cells.append(
+                (
+                    clip,
+                    (slice(y1, y2), slice(x1, x2)),
+                    (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x)),
+                )
+            )
+
+        ends = [clip.end for clip in clips]
+        if None not in ends:
+            duration = max(ends)
+            self.duration = duration
+            self.end = duration
+
+        audioclips = [v.audio for v in clips if v.audio is not None]
+        if audioclips:
+            self.audio = CompositeAudioClip(audioclips)
+
+        if transparent and not is_mask:
+            maskclips = [
+                (clip.mask if (clip.mask is not None) else clip.with_mask().mask)
+                .with_position(clip.pos)
+                .with_end(clip.end)
+                .with_start(clip.start, change_end=False)
+                for clip in clips
+            ]
+            self.mask = ClipsArray(maskclips, size, rects, bg_color=0.0, is_mask=True)
+
+    def frame_function(self, t):
+        """The frames of the clips playing at time `t` are copied in their
+        region of the background.
+        """
+        frame = self.background.copy()
+        for clip, region, clip_region in self.cells:
+            if not clip.is_playing(t):
+                continue
+
+            ct = t - clip.start
+            clip_frame = clip.get_frame(ct)[clip_region]
+
+            # masks are only applied on opaque backgrounds, as the mask of the
+            # array takes care of the transparency of transparent ones
+            clip_mask = None
+            if not (self.is_mask or self.transparent or clip.mask is None):
+                clip_mask = clip.mask.get_frame(ct)[clip_region]
+                if is_constant_frame(clip_mask) and clip_mask[0, 0] == 1:
+                    clip_mask = None
+
+            if clip_mask is None:
+                frame[region] = clip_frame
+            else:
+                # blended like Pillow blits the clips in CompositeVideoClip,
+                # with the mask as 8 bits alpha layer, and rounded
+                alpha = (clip_mask * 255).astype("uint8")[:, :, np.newaxis] / 255
+                frame[region] = np.round(
+                    alpha * clip_frame + (1 - alpha) * frame[region]
+                ).astype("uint8")
+
+        return frame
+
+
 def clips_array(array, rows_widths=None, cols_heights=None, bg_color=None):
     """Given a matrix whose rows are clips, creates a CompositeVideoClip where
     all clips are placed side by side horizontally for each clip in each row
@@ -249,6 +636,43 @@ def clips_array(array, rows_widths=None, cols_heights=None, bg_color=None):
     # compute start positions of X for rows and Y for columns
     xs = np.cumsum([0] + list(cols_heights))
     ys = np.cumsum([0] + list(rows_widths))
+    size = (xs[-1], ys[-1])
+
+    # If the clips don't overlap, their frames can be copied directly in their
+    # cell: smaller clips are centered in their cell and cropped to it (and
+    # cover it with their padding), others are only cropped to the final clip
+    clips, rects, covered_rects = [], [], []
+    for i, (y, rw) in enumerate(zip(ys[:-1], rows_widths)):
+        for j, (x, ch) in enumerate(zip(xs[:-1], cols_heights)):
+            clip = array[i, j]
+            w, h = clip.size
+            centered = (w < ch) or (h < rw)
+            if centered:
+                dx, dy = compute_position(clip.size, (ch, rw), "center")
+                x1, y1, x2, y2 = x, y, x + ch, y + rw
+            else:
+                dx, dy = 0, 0
+                x1, y1, x2, y2 = 0, 0, size[0], size[1]
+            rect = (
+                max(x1, x + dx),
+                max(y1, y + dy),
+                min(x2, x + dx + w),
+                min(y2, y + dy + h),
+            )
+            clips.append(clip.with_position((x + dx, y + dy)))
+            rects.append(rect)
+            covered_rects.append((x1, y1, x2, y2) if centered else rect)
+
+    if all(
+        clip.has_constant_size
+        and ((clip.mask is None) or (clip.mask.size == clip.size))
+        for clip in clips
+    ) and not any(
+        (r1[0] < r2[2]) and (r2[0] < r1[2]) and (r1[1] < r2[3]) and (r2[1] < r1[3])
+        for k, r1 in enumerate(covered_rects)
+        for r2 in covered_rects[k + 1 :]
+    ):
+        return ClipsArray(clips, size, rects, bg_color=bg_color)
 
     for j, (x, ch) in enumerate(zip(xs[:-1], cols_heights)):
         for i, (y, rw) in enumerate(zip(ys[:-1], rows_widths)):
@@ -262,7 +686,7 @@ def clips_array(array, rows_widths=None, cols_heights=None, bg_color=None):
 
             array[i, j] = clip.with_position((x, y))
 
-    return CompositeVideoClip(array.flatten(), size=(xs[-1], ys[-1]), bg_color=bg_color)
+    return CompositeVideoClip(array.flatten(), size=size, bg_color=bg_color)
 
 
 def concatenate_videoclips(
@@ -342,6 +766,7 @@ def concatenate_videoclips(
             return mask
 
         result = VideoClip(is_mask=is_mask, frame_function=frame_function)
+        result.sections = clips
         if any([clip.mask is not None for clip in clips]):
             masks = [get_mask(clip) for clip in clips]
             result.mask = concatenate_videoclips(masks, method="chain", is_mask=True)
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 import numpy as np
 
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -32,7 +34,14 @@ class BlackAndWhite(Effect):
         )
 
         def filter(im):
-            im = R * im[:, :, 0] + G * im[:, :, 1] + B * im[:, :, 2]
-            return np.dstack(3 * [im]).astype("uint8")
+            im = R * im[..., 0] + G * im[..., 1] + B * im[..., 2]
+            return np.stack(3 * [im], axis=-1).astype("uint8")
 
-        return clip.image_transform(filter)
+        color_table = None
+        if min(R, G, B) >= 0 and 255 * (R + G + B) < 256:
+            # the mixed values stay in [0, 255], like the ones of ``filter``
+            color_table = ColorTable(np.arange(256), matrix=3 * [[R, G, B]])
+
+        return clip.image_transform(
+            pointwise(filter), batched=True, color_table=color_table
+        )
@@ -4,6 +4,8 @@ import numpy as np
 
 from moviepy.Clip import Clip
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -31,6 +33,26 @@ class FadeIn(Effect):
                 return get_frame(t)
             else:
                 fading = 1.0 * t / self.duration
-                return fading * get_frame(t) + (1 - fading) * self.initial_color
-
-        return clip.transform(filter)
+                return pointwise(
+                    lambda frame: fading * frame + (1 - fading) * self.initial_color
+                )(get_frame(t))
+
+        def batch_filter(get_frames, ts):
+            frames = get_frames(ts)
+            if ts.min() >= self.duration:
+                return frames
+            fading = np.minimum(1.0, ts / self.duration)
+            fading = fading.reshape((-1,) + (1,) * (frames.ndim - 1))
+            return fading * frames + (1 - fading) * self.initial_color
+
+        def color_table(t):
+            if t >= self.duration:
+                return None
+            fading = 1.0 * t / self.duration
+            return ColorTable.from_function(
+                lambda frame: fading * frame + (1 - fading) * self.initial_color
+            )
+
+        if clip.is_mask:
+            return clip.transform(filter, batch_func=batch_filter)
+        return clip.color_transform(color_table, filter, batch_func=batch_filter)
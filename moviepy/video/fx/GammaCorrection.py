@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from moviepy.Clip import Clip
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -17,4 +19,8 @@ class GammaCorrection(Effect):
             corrected = 255 * (1.0 * im / 255) ** self.gamma
             return corrected.astype("uint8")
 
-        return clip.image_transform(filter)
+        return clip.image_transform(
+            pointwise(filter),
+            batched=True,
+            color_table=ColorTable.from_function(filter),
+        )
@@ -1,7 +1,11 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from moviepy.Clip import Clip
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -15,4 +19,8 @@ class InvertColors(Effect):
     def apply(self, clip: Clip) -> Clip:
         """Apply the effect to the clip."""
         maxi = 1.0 if clip.is_mask else 255
-        return clip.image_transform(lambda f: maxi - f)
+        return clip.image_transform(
+            pointwise(lambda f: maxi - f),
+            batched=True,
+            color_table=None if clip.is_mask else ColorTable(np.arange(255, -1, -1)),
+        )
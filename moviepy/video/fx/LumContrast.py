@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from moviepy.Clip import Clip
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -24,4 +26,8 @@ class LumContrast(Effect):
             corrected[corrected > 255] = 255
             return corrected.astype("uint8")
 
-        return clip.image_transform(image_filter)
+        return clip.image_transform(
+            pointwise(image_filter),
+            batched=True,
+            color_table=ColorTable.from_function(image_filter),
+        )
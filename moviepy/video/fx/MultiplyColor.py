@@ -4,6 +4,8 @@ import numpy as np
 
 from moviepy.Clip import Clip
 from moviepy.Effect import Effect
+from moviepy.tools import pointwise
+from moviepy.video.tools.color_tables import ColorTable
 
 
 @dataclass
@@ -18,6 +20,12 @@ class MultiplyColor(Effect):
 
     def apply(self, clip: Clip) -> Clip:
         """Apply the effect to the clip."""
+
+        def filter(frame):
+            return np.minimum(255, (self.factor * frame)).astype("uint8")
+
         return clip.image_transform(
-            lambda frame: np.minimum(255, (self.factor * frame)).astype("uint8")
+            pointwise(filter),
+            batched=True,
+            color_table=ColorTable.from_function(filter),
         )
@@ -70,6 +70,16 @@ class VideoFileClip(VideoClip):
     fps:
       Frames per second in the original file.
 
+    reader_options:
+      The other parameters the file was opened with, to open it again (see
+      ``moviepy.video.io.clip_graph``). None for the copies of the clip whose
+      frames are modified.
+
+    reader_clips:
+      The mask and sound opened with the file, as a dictionary
+      ``{"mask": mask, "audio": audio}``, made again when the file is opened
+      again, unlike the ones which replaced them.
+
 
     Read docs for Clip() and VideoClip() for other, more generic, attributes.
 
@@ -82,6 +92,10 @@ class VideoFileClip(VideoClip):
 
     If copies are made, and close() is called on one, it may cause methods on
     the other copies to fail.
+
+    The frames can be read from several threads at once, like the threads of a
+    ``ThreadPoolExecutor``, each thread reading the file with its own ffmpeg
+    process (see ``FFMPEG_VideoReader``).
     """
 
     @convert_path_to_string("filename")
@@ -124,6 +138,19 @@ class VideoFileClip(VideoClip):
         self.rotation = self.reader.rotation
 
         self.filename = filename
+        self.reader_options = dict(
+            decode_file=decode_file,
+            has_mask=has_mask,
+            audio=audio,
+            audio_buffersize=audio_buffersize,
+            target_resolution=target_resolution,
+            resize_algorithm=resize_algorithm,
+            audio_fps=audio_fps,
+            audio_nbytes=audio_nbytes,
+            fps_source=fps_source,
+            pixel_format=pixel_format,
+            is_mask=is_mask,
+        )
 
         if has_mask:
             self.frame_function = lambda t: self.reader.get_frame(t)[:, :, :3]
@@ -139,6 +166,14 @@ class VideoFileClip(VideoClip):
         else:
             self.frame_function = lambda t: self.reader.get_frame(t)
 
+        if (
+            not (has_mask or is_mask)
+            and (self.rotation == 0)
+            and (list(self.size) == list(self.reader.infos["video_size"]))
+        ):
+            # The frames are those of the video stream, which can be copied
+            self.source = (filename, 0)
+
         # Make a reader for the audio, if any.
         if audio and self.reader.infos["audio_found"]:
             self.audio = AudioFileClip(
@@ -147,6 +182,7 @@ class VideoFileClip(VideoClip):
                 fps=audio_fps,
                 nbytes=audio_nbytes,
             )
+        self.reader_clips = dict(mask=self.mask, audio=self.audio)
 
     def __deepcopy__(self, memo):
         """Implements ``copy.deepcopy(clip)`` behaviour as ``copy.copy(clip)``.
@@ -0,0 +1,420 @@
+"""Declarative descriptions of the graphs of clips, made of plain values, which
+can be pickled and sent to other processes or hosts to build the clips again
+there, like to render parts of a video in worker processes.
+"""
+
+import dataclasses
+import importlib
+import os
+from numbers import Number
+
+import numpy as np
+
+from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.Clip import Clip
+from moviepy.Effect import Effect
+from moviepy.tools import is_constant_frame
+from moviepy.video.compositing.CompositeVideoClip import (
+    ClipsArray,
+    CompositeVideoClip,
+    concatenate_videoclips,
+)
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.VideoClip import ColorClip, ImageClip
+
+
+def describe_clip(clip):
+    """Returns a declarative description of the graph of clips which made
+    ``clip``, from which ``build_clip`` makes the same clip again.
+
+    The description is a dictionary ``{"nodes": nodes, "root": index}`` where
+    ``nodes`` is a list of dictionaries describing the clips of the graph, each
+    one after the clips it is made from, referenced by their index in the list,
+    and ``root`` is the index of the node of ``clip``. The nodes describe:
+
+    - Video and audio files by their path and the parameters they were opened
+      with (see ``VideoFileClip.reader_options``), and the mask and sound which
+      replaced the ones opened with the file, if any.
+    - Images and color clips by their image or color.
+    - ``subclipped`` clips and clips made with effects by their clip, and the
+      times or the class and fields of the effect (see ``Clip.operation``).
+    - Compositions and concatenations by their clips and parameters.
+
+    with the start, end, duration, fps, position and layer of the clips, and
+    their mask and sound when they are not made with the clip. The values are
+    numbers, strings, lists, tuples, dictionaries and numpy arrays (the images).
+
+    Raises a ValueError if a clip of the graph can't be described, like clips
+    whose frames or positions are computed by Python functions of time, or
+    effects with functions as parameters.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        description = describe_clip(clip)
+        # in another process, after pickling and unpickling the description
+        clip = build_clip(description)
+    """
+    describer = ClipDescriber()
+    return {"nodes": describer.nodes, "root": describer.describe(clip)}
+
+
+def build_clip(description):
+    """Returns the clip described by ``description``, a description returned by
+    ``describe_clip``. The media files are opened again.
+    """
+    clips = []
+    for node in description["nodes"]:
+        clips.append(build_node(node, clips))
+    return clips[description["root"]]
+
+
+class ClipDescriber:
+    """Describes the clips of a graph as a list of nodes, see
+    ``describe_clip``. Each clip is described once, so that the clips used
+    several times are shared by the built graph.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        # indices of the nodes by id of their clip, with their clip so that its
+        # id is not reused
+        self.indices = {}
+
+    def describe(self, clip):
+        """Returns the index of the node of ``clip``, after the nodes of the
+        clips it is made from.
+        """
+        if id(clip) in self.indices:
+            return self.indices[id(clip)][1]
+
+        node, made_attributes = self.frames_node(clip)
+        node["attributes"] = self.attributes(clip)
+        for attribute in ("mask", "audio"):
+            value = getattr(clip, attribute, None)
+            if attribute in made_attributes:
+                continue
+            if value is None:
+                node[attribute] = None
+                continue
+            n_nodes, indices = len(self.nodes), dict(self.indices)
+            try:
+                node[attribute] = self.describe(value)
+            except ValueError:
+                # left as made with the clip
+                del self.nodes[n_nodes:]
+                self.indices = indices
+
+        self.nodes.append(node)
+        self.indices[id(clip)] = (clip, len(self.nodes) - 1)
+        return len(self.nodes) - 1
+
+    def frames_node(self, clip):
+        """Returns the node describing how the frames of ``clip`` are made,
+        and the names of the attributes (mask, sound) made with them, which
+        don't need to be described.
+        """
+        if clip.operation is not None:
+            kind, parent, *args = clip.operation
+            if kind == "subclipped":
+                node = {
+                    "type": "subclipped",
+                    "clip": self.describe(parent),
+                    "start_time": args[0],
+                    "end_time": args[1],
+                }
+                return node, ()
+            effect = args[0]
+            params = {
+                field.name: self.value(getattr(effect, field.name))
+                for field in dataclasses.fields(effect)
+            }
+            node = {
+                "type": "effect",
+                "clip": self.describe(parent),
+                "effect": (type(effect).__module__, type(effect).__qualname__),
+                "params": params,
+            }
+            return node, ()
+
+        if clip.reader_options is not None:
+            node = {
+                "type": type(clip).__name__,
+                "filename": os.path.abspath(clip.filename),
+                "options": dict(clip.reader_options),
+            }
+            # the mask and sound opened with the file are made again with it,
+            # the ones which replaced them must be described
+            for attribute, reader_clip in getattr(clip, "reader_clips", {}).items():
+                value = getattr(clip, attribute)
+                if value is not reader_clip:
+                    node[attribute] = None if value is None else self.describe(value)
+            return node, ("mask", "audio")
+
+        if isinstance(clip, ImageClip) and (clip.frame_function(0) is clip.img):
+            if is_constant_frame(clip.img) and clip.img.size:
+                color = clip.img[0, 0]
+                node = {
+                    "type": "ColorClip",
+                    "size": tuple(clip.size),
+                    "color": color.tolist(),
+                }
+            else:
+                node = {"type": "ImageClip", "img": np.array(clip.img)}
+            node["is_mask"] = clip.is_mask
+            return node, ()
+
+        if getattr(clip, "sections", None) is not None:
+            durations = np.cumsum([0] + [section.duration for section in clip.sections])
+            if not np.allclose(durations, clip.timings):
+                raise ValueError("The sections of the concatenation overlap.")
+            node = {
+                "type": "concatenation",
+                "clips": [self.describe(section) for section in clip.sections],
+                "is_mask": clip.is_mask,
+            }
+            return node, ("mask", "audio")
+
+        if "frame_function" not in clip.__dict__:
+            if type(clip) is CompositeVideoClip:
+                node = {
+                    "type": "CompositeVideoClip",
+                    "clips": [self.describe(layer) for layer in clip.input_clips],
+                    "size": tuple(clip.size),
+                    "bg_color": None if clip.transparent else clip.bg_color,
+                    "use_bgclip": not clip.created_bg,
+                    "is_mask": clip.is_mask,
+                    "threads": clip.threads,
+                }
+                return node, ("mask", "audio")
+            if type(clip) is ClipsArray:
+                node = {
+                    "type": "ClipsArray",
+                    "clips": [self.describe(layer) for layer, _, _ in clip.cells],
+                    "size": tuple(clip.size),
+                    "rects": [
+                        (columns.start, rows.start, columns.stop, rows.stop)
+                        for _, (rows, columns), _ in clip.cells
+                    ],
+                    "bg_color": None if clip.transparent else clip.bg_color,
+                    "is_mask": clip.is_mask,
+                }
+                return node, ("mask", "audio")
+            if type(clip) is CompositeAudioClip:
+                node = {
+                    "type": "CompositeAudioClip",
+                    "clips": [self.describe(layer) for layer in clip.clips],
+                }
+                return node, ()
+
+        raise ValueError(
+            "The frames of the %s can't be described, they are computed by a "
+            "Python function." % type(clip).__name__
+        )
+
+    def attributes(self, clip):
+        """Returns the timings, fps, position and layer of ``clip``."""
+        attributes = {
+            "start": clip.start,
+            "end": clip.end,
+            "duration": clip.duration,
+            "fps": getattr(clip, "fps", None),
+        }
+        if hasattr(clip, "pos"):
+            if clip.constant_pos is None:
+                raise ValueError(
+                    "The position of the %s is a function of time."
+                    % type(clip).__name__
+                )
+            attributes["position"] = (clip.constant_pos, clip.relative_pos)
+            attributes["layer_index"] = clip.layer_index
+        return attributes
+
+    def value(self, value):
+        """Returns the description of the value of a field of an effect."""
+        if isinstance(value, Clip):
+            return {"clip": self.describe(value)}
+        if isinstance(value, (tuple, list)):
+            return type(value)(self.value(item) for item in value)
+        if (value is None) or isinstance(value, (Number, str, np.ndarray)):
+            return value
+        raise ValueError(
+            "The effect parameter %r can't be described, only numbers, strings, "
+            "arrays, clips, lists and tuples can." % (value,)
+        )
+
+
+def build_value(value, clips):
+    """Returns the value of a field of an effect, described by
+    ``ClipDescriber.value``.
+    """
+    if isinstance(value, dict):
+        return clips[value["clip"]]
+    if isinstance(value, (tuple, list)):
+        return type(value)(build_value(item, clips) for item in value)
+    return value
+
+
+# Packages of the effects which can be imported to build a clip, the other
+# effects must have been imported before
+EFFECT_PACKAGES = ("moviepy.video.fx.", "moviepy.audio.fx.")
+
+
+def find_effect_class(module_name, name):
+    """Returns the effect class ``name`` of the module ``module_name``,
+    described by ``ClipDescriber.frames_node``.
+
+    As the descriptions may come from other hosts, only the modules of the
+    effects of MoviePy (see ``EFFECT_PACKAGES``) are imported. The other
+    effects are found among the subclasses of ``Effect`` already imported.
+    Raises a ValueError if the effect can't be found.
+    """
+    subclasses = list(Effect.__subclasses__())
+    while subclasses:
+        effect_class = subclasses.pop()
+        if (effect_class.__module__, effect_class.__qualname__) == (module_name, name):
+            return effect_class
+        subclasses.extend(effect_class.__subclasses__())
+
+    if not module_name.startswith(EFFECT_PACKAGES):
+        raise ValueError(
+            "The effect %s.%s can't be found, only the effects of MoviePy and the "
+            "effects already imported can be built." % (module_name, name)
+        )
+    effect_class = getattr(importlib.import_module(module_name), name, None)
+    if not (isinstance(effect_class, type) and issubclass(effect_class, Effect)):
+        raise ValueError("%s.%s is not an effect." % (module_name, name))
+    return effect_class
+
+
+def build_node(node, clips):
+    """Returns the clip described by ``node``, where ``clips`` are the clips of
+    the previous nodes.
+    """
+    kind = node["type"]
+    if kind == "subclipped":
+        clip = clips[node["clip"]].subclipped(node["start_time"], node["end_time"])
+    elif kind == "effect":
+        effect_class = find_effect_class(*node["effect"])
+        params = {
+            key: build_value(value, clips) for key, value in node["params"].items()
+        }
+        clip = clips[node["clip"]].with_effects([effect_class(**params)])
+    elif kind == "VideoFileClip":
+        clip = VideoFileClip(node["filename"], **node["options"])
+    elif kind == "AudioFileClip":
+        clip = AudioFileClip(node["filename"], **node["options"])
+    elif kind == "ColorClip":
+        color = node["color"]
+        clip = ColorClip(
+            node["size"],
+            color if node["is_mask"] else tuple(color),
+            is_mask=node["is_mask"],
+        )
+    elif kind == "ImageClip":
+        clip = ImageClip(node["img"], is_mask=node["is_mask"])
+    elif kind == "concatenation":
+        clip = concatenate_videoclips(
+            [clips[index] for index in node["clips"]], is_mask=node["is_mask"]
+        )
+    elif kind == "CompositeVideoClip":
+        clip = CompositeVideoClip(
+            [clips[index] for index in node["clips"]],
+            size=node["size"],
+            bg_color=node["bg_color"],
+            use_bgclip=node["use_bgclip"],
+            is_mask=node["is_mask"],
+            threads=node["threads"],
+        )
+    elif kind == "ClipsArray":
+        clip = ClipsArray(
+            [clips[index] for index in node["clips"]],
+            node["size"],
+            node["rects"],
+            bg_color=node["bg_color"],
+            is_mask=node["is_mask"],
+        )
+    elif kind == "CompositeAudioClip":
+        clip = CompositeAudioClip([clips[index] for index in node["clips"]])
+    else:
+        raise ValueError("Unknown type of clip %r." % kind)
+
+    attributes = node["attributes"]
+    if "position" in attributes:
+        position, relative = attributes["position"]
+        clip = clip.with_position(position, relative=relative)
+        clip.layer_index = attributes["layer_index"]
+    else:
+        clip = clip.copy()
+    clip.start, clip.end = attributes["start"], attributes["end"]
+    clip.duration = attributes["duration"]
+    if attributes["fps"] is not None:
+        clip.fps = attributes["fps"]
+    for attribute in ("mask", "audio"):
+        if attribute in node:
+            index = node[attribute]
+            setattr(clip, attribute, None if index is None else clips[index])
+    return clip
+
+
+class ClipGraph:
+    """A clip which can be pickled, like to be sent to a worker process, as the
+    description of its graph (see ``describe_clip``). The clip is built again
+    from the description the first time it is used in the receiving process,
+    opening its media files there.
+
+    Parameters
+    ----------
+
+    clip
+      The clip. Raises a ValueError if it can't be described.
+
+    Attributes
+    ----------
+
+    description
+      The description of the graph of the clip.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        def render(graph, filename):
+            graph.clip.write_videofile(filename)
+
+        with ProcessPoolExecutor() as executor:
+            executor.submit(render, ClipGraph(clip), "video.mp4").result()
+    """
+
+    def __init__(self, clip):
+        self.description = describe_clip(clip)
+        self.built_clip = clip
+
+    @classmethod
+    def from_description(cls, description):
+        """Returns the graph of the clip described by ``description``, built
+        when it is first used.
+        """
+        graph = cls.__new__(cls)
+        graph.__setstate__({"description": description})
+        return graph
+
+    @property
+    def clip(self):
+        """The clip, built from the description the first time it is used."""
+        if self.built_clip is None:
+            self.built_clip = build_clip(self.description)
+        return self.built_clip
+
+    def __getstate__(self):
+        return {"description": self.description}
+
+    def __setstate__(self, state):
+        self.description = state["description"]
+        self.built_clip = None
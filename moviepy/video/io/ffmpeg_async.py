@@ -0,0 +1,452 @@
+"""Readers and writers of video and audio files for asyncio applications, talking
+to ffmpeg over asyncio subprocess pipes, so that the event loop is never blocked on a
+pipe, slow consumers or encoders slow down the producers of the frames, and
+cancelled tasks terminate ffmpeg.
+"""
+
+import asyncio
+import functools
+import subprocess as sp
+import time
+
+import numpy as np
+
+from moviepy.audio.io.ffmpeg_audiowriter import FFMPEG_AudioWriter
+from moviepy.Clip import render_pass_executor
+from moviepy.decorators import requires_duration
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from moviepy.video.io.ffmpeg_writer import (
+    FFMPEG_VideoWriter,
+    ffmpeg_supports_alpha,
+)
+
+
+class FFMPEG_AsyncVideoReader(FFMPEG_VideoReader):
+    """A ``FFMPEG_VideoReader`` reading the frames of a video file one after
+    the other from an asyncio subprocess, with ``await reader.read_frame()``
+    or ``async for frame in reader``.
+
+    The file is probed when the reader is made, which starts a short blocking
+    ffmpeg process, so use ``await FFMPEG_AsyncVideoReader.open(...)`` to
+    probe it in a thread of the event loop instead. ffmpeg is started with
+    ``start`` or when entering ``async with reader``, and terminated with
+    ``aclose`` or when leaving it, also when the task reading the frames is
+    cancelled.
+
+    Parameters
+    ----------
+
+    filename : str
+      Name of the video file.
+
+    start_time : float, optional
+      Time in seconds of the first frame read.
+
+    Other parameters are the ones of ``FFMPEG_VideoReader``.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        async with await FFMPEG_AsyncVideoReader.open("video.mp4") as reader:
+            async for frame in reader:
+                await send(frame)
+    """
+
+    def __init__(self, filename, start_time=0, **reader_params):
+        self.start_time = start_time
+        # a single position, read by the coroutines of the event loop
+        super().__init__(filename, max_cursors=1, **reader_params)
+
+    @classmethod
+    async def open(cls, filename, start_time=0, **reader_params):
+        """Returns a reader of ``filename``, probed in a thread of the event
+        loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(cls, filename, start_time, **reader_params)
+        )
+
+    def initialize(self, start_time=0):
+        """Sets the position of the reader, ffmpeg is started by ``start``."""
+        self.pos = self.get_frame_number(self.start_time)
+
+    async def start(self):
+        """Starts ffmpeg, if it is not started."""
+        if self.proc is None:
+            self.proc = await asyncio.create_subprocess_exec(
+                *self.ffmpeg_command(),
+                stdin=sp.DEVNULL,
+                stdout=sp.PIPE,
+                stderr=sp.DEVNULL,
+            )
+
+    async def read_frame(self):
+        """Returns the next frame of the file, or None after the last one."""
+        await self.start()
+        w, h = self.size
+        try:
+            data = await self.proc.stdout.readexactly(self.depth * w * h)
+        except asyncio.IncompleteReadError:
+            return None
+        self.pos += 1
+        return np.frombuffer(data, dtype="uint8").reshape((h, w, self.depth))
+
+    def get_frame(self, t):
+        """Not supported, the frames are read in order with ``read_frame``."""
+        raise NotImplementedError(
+            "The frames of a FFMPEG_AsyncVideoReader are read in order with "
+            "read_frame, use a FFMPEG_VideoReader to get the frame at a time."
+        )
+
+    async def aclose(self):
+        """Stops ffmpeg, if it is still running."""
+        if self.proc is not None:
+            proc, self.proc = self.proc, None
+            if proc.returncode is None:
+                # ffmpeg may be blocked on a full pipe, it can't exit by itself
+                proc.kill()
+            await proc.wait()
+
+    def close(self, delete_lastread=True):
+        """Kills ffmpeg without waiting for it, if it is still running. Prefer
+        ``aclose`` in coroutines.
+        """
+        if (getattr(self, "proc", None) is not None) and (self.proc.returncode is None):
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+        self.proc = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.read_frame()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+class FFMPEG_AsyncVideoWriter(FFMPEG_VideoWriter):
+    """A ``FFMPEG_VideoWriter`` sending the frames to an asyncio subprocess,
+    with ``await writer.write_frame(frame)``, which waits for ffmpeg to read
+    the frame when its pipe is full, so that the frames are not produced
+    faster than they are encoded.
+
+    ffmpeg is started when entering ``async with writer``, or with ``start``.
+    When leaving it normally, or with ``close``, ffmpeg finishes the video and
+    an IOError is raised if it failed. When leaving it with an error, or when
+    the task writing the frames is cancelled, ffmpeg is terminated with
+    ``terminate``.
+
+    The parameters are the ones of ``FFMPEG_VideoWriter``, without
+    ``audio_clip``, ``queue_size`` and ``logfile``.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        async with FFMPEG_AsyncVideoWriter("video.mp4", (640, 360), 24) as writer:
+            async for frame in frames:
+                await writer.write_frame(frame)
+    """
+
+    def __init__(self, filename, size, fps, **writer_params):
+        for name in ("audio_clip", "queue_size", "logfile"):
+            if writer_params.get(name) is not None:
+                raise ValueError(
+                    "MoviePy error: the parameter %s of FFMPEG_VideoWriter can't "
+                    "be used with FFMPEG_AsyncVideoWriter." % name
+                )
+        self.cmd = None
+        super().__init__(filename, size, fps, **writer_params)
+
+    def start_process(self, cmd, popen_params):
+        """Keeps the ffmpeg command, ffmpeg is started by ``start``."""
+        self.cmd = cmd
+        return None
+
+    async def start(self):
+        """Starts ffmpeg, if it is not started."""
+        if self.proc is None:
+            self.proc = await asyncio.create_subprocess_exec(
+                *self.cmd, stdin=sp.PIPE, stdout=sp.DEVNULL, stderr=sp.PIPE
+            )
+
+    async def write_frame(self, img_array):
+        """Sends one frame to ffmpeg, once ffmpeg can read it."""
+        await self.start()
+        start = time.perf_counter()
+        if self.converter is not None:
+            img_array = self.converter.convert(img_array)
+        try:
+            self.proc.stdin.write(np.ascontiguousarray(img_array).tobytes())
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as err:
+            ffmpeg_error = (await self.proc.stderr.read()).decode()
+            await self.proc.wait()
+            self.proc = None
+            raise self.write_error(err, ffmpeg_error)
+        self.metrics["frames"] += 1
+        self.metrics["write_time"] += time.perf_counter() - start
+
+    async def close(self):
+        """Waits for ffmpeg to finish the video, and raises an IOError if it
+        failed.
+        """
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.stdin.close()
+        try:
+            await proc.stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        ffmpeg_error = (await proc.stderr.read()).decode()
+        if await proc.wait() != 0:
+            raise IOError(
+                "MoviePy error: FFMPEG encountered the following error while "
+                "writing file %s:\n\n %s" % (self.filename, ffmpeg_error)
+            )
+
+    async def terminate(self):
+        """Terminates ffmpeg without finishing the video."""
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.stdin.close()
+        if proc.returncode is None:
+            proc.terminate()
+        await proc.wait()
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with a FFMPEG_AsyncVideoWriter.")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.terminate()
+
+
+class FFMPEG_AsyncAudioWriter(FFMPEG_AudioWriter):
+    """A ``FFMPEG_AudioWriter`` sending the chunks of sound to an asyncio
+    subprocess, with ``await writer.write_frames(chunk)``, which waits for
+    ffmpeg to read the chunk when its pipe is full.
+
+    ffmpeg is started when entering ``async with writer``, or with ``start``.
+    When leaving it normally, or with ``close``, ffmpeg finishes the file and
+    an IOError is raised if it failed. When leaving it with an error, or when
+    the task writing the chunks is cancelled, ffmpeg is terminated with
+    ``terminate``.
+
+    The parameters are the ones of ``FFMPEG_AudioWriter``, without
+    ``logfile``.
+    """
+
+    def __init__(self, filename, fps_input, **writer_params):
+        if writer_params.get("logfile") is not None:
+            raise ValueError(
+                "MoviePy error: the parameter logfile of FFMPEG_AudioWriter can't "
+                "be used with FFMPEG_AsyncAudioWriter."
+            )
+        self.cmd = None
+        super().__init__(filename, fps_input, **writer_params)
+
+    def start_process(self, cmd, popen_params):
+        """Keeps the ffmpeg command, ffmpeg is started by ``start``."""
+        self.cmd = cmd
+        return None
+
+    async def start(self):
+        """Starts ffmpeg, if it is not started."""
+        if self.proc is None:
+            self.proc = await asyncio.create_subprocess_exec(
+                *self.cmd, stdin=sp.PIPE, stdout=sp.DEVNULL, stderr=sp.PIPE
+            )
+
+    async def write_frames(self, frames_array):
+        """Sends a chunk of sound to ffmpeg, once ffmpeg can read it."""
+        await self.start()
+        try:
+            self.proc.stdin.write(frames_array.tobytes())
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as err:
+            ffmpeg_error = (await self.proc.stderr.read()).decode()
+            await self.proc.wait()
+            self.proc = None
+            raise IOError(
+                f"{err}\n\nMoviePy error: FFMPEG encountered the following error "
+                f"while writing file {self.filename}:\n\n {ffmpeg_error}"
+            )
+
+    async def close(self):
+        """Waits for ffmpeg to finish the file, and raises an IOError if it
+        failed.
+        """
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.stdin.close()
+        try:
+            await proc.stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        ffmpeg_error = (await proc.stderr.read()).decode()
+        if await proc.wait() != 0:
+            raise IOError(
+                "MoviePy error: FFMPEG encountered the following error while "
+                "writing file %s:\n\n %s" % (self.filename, ffmpeg_error)
+            )
+
+    async def terminate(self):
+        """Terminates ffmpeg without finishing the file."""
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.stdin.close()
+        if proc.returncode is None:
+            proc.terminate()
+        await proc.wait()
+
+    def __del__(self):
+        # the process can't be waited for outside of the event loop
+        if getattr(self, "proc", None) is not None and self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with a FFMPEG_AsyncAudioWriter.")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.terminate()
+
+
+@requires_duration
+async def ffmpeg_audiowrite_async(
+    clip,
+    filename,
+    fps,
+    nbytes,
+    buffersize,
+    codec="libvorbis",
+    bitrate=None,
+    ffmpeg_params=None,
+):
+    """Writes the audio clip to a file with a ``FFMPEG_AsyncAudioWriter``. The
+    chunks of sound are computed one after the other in threads of the event
+    loop, and the next chunk is computed once ffmpeg has read the previous
+    one.
+
+    Cancelling the task terminates ffmpeg and leaves the file unfinished.
+
+    See ``ffmpeg_audiowrite`` for the parameters.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = clip.iter_chunks(
+        chunksize=buffersize, quantize=True, nbytes=nbytes, fps=fps
+    )
+    async with FFMPEG_AsyncAudioWriter(
+        filename,
+        fps,
+        nbytes=nbytes,
+        nchannels=clip.nchannels,
+        codec=codec,
+        bitrate=bitrate,
+        ffmpeg_params=ffmpeg_params,
+    ) as writer:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            await writer.write_frames(chunk)
+
+
+def compute_frame(clip, t, dtype=None, with_mask=False):
+    """Returns the frame of ``clip`` at time ``t``, with the mask of the clip
+    as alpha channel if ``with_mask``.
+    """
+    frame = clip.get_frame(t)
+    if (dtype is not None) and (frame.dtype != dtype):
+        frame = frame.astype(dtype)
+    if with_mask:
+        mask = (255 * clip.mask.get_frame(t)).astype("uint8")
+        frame = np.dstack([frame, mask])
+    return frame
+
+
+async def ffmpeg_write_video_async(
+    clip,
+    filename,
+    fps,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audiofile=None,
+    audio_codec=None,
+    threads=None,
+    ffmpeg_params=None,
+    pixel_format=None,
+    convert_to_yuv=False,
+):
+    """Writes the clip to a video file with a ``FFMPEG_AsyncVideoWriter``, and
+    yields the progress as tuples ``(frames_written, n_frames)`` after each
+    frame. The frames are computed one after the other in a thread of their
+    own, in a single render pass (see ``render_pass_executor``), and the next
+    frame is computed once ffmpeg has read the previous one.
+
+    Cancelling the task iterating over the progress, or closing the
+    generator, terminates ffmpeg and leaves the video unfinished.
+
+    See ``ffmpeg_write_video`` for the parameters.
+    """
+    loop = asyncio.get_running_loop()
+    n_frames = int(clip.duration * fps)
+    with_mask = (clip.mask is not None) and ffmpeg_supports_alpha(codec, pixel_format)
+
+    async with FFMPEG_AsyncVideoWriter(
+        filename,
+        clip.size,
+        fps,
+        codec=codec,
+        preset=preset,
+        bitrate=bitrate,
+        with_mask=with_mask,
+        audiofile=audiofile,
+        audio_codec=audio_codec,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params,
+        pixel_format=pixel_format,
+        convert_to_yuv=convert_to_yuv and not with_mask,
+    ) as writer:
+        with render_pass_executor() as executor:
+            for frame_index in range(n_frames):
+                frame = await loop.run_in_executor(
+                    executor, compute_frame, clip, frame_index / fps, "uint8", with_mask
+                )
+                await writer.write_frame(frame)
+                yield frame_index + 1, n_frames
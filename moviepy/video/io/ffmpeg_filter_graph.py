@@ -0,0 +1,414 @@
+"""Rendering of clips made only of operations which ffmpeg filters can do, like
+cuts, resizings, crops, fades, overlays and concatenations of media files, with
+a single ffmpeg command instead of computing their frames in Python.
+"""
+
+import numpy as np
+import proglog
+
+from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.audio.fx.AudioFadeIn import AudioFadeIn
+from moviepy.audio.fx.AudioFadeOut import AudioFadeOut
+from moviepy.audio.fx.MultiplyVolume import MultiplyVolume
+from moviepy.config import ffmpeg_binary
+from moviepy.tools import (
+    compute_position,
+    ffmpeg_escape_filename,
+    is_constant_frame,
+    subprocess_call,
+)
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.fx.Crop import Crop
+from moviepy.video.fx.FadeIn import FadeIn
+from moviepy.video.fx.FadeOut import FadeOut
+from moviepy.video.fx.Resize import Resize
+from moviepy.video.VideoClip import ImageClip
+
+
+def ffmpeg_color(color):
+    """Returns the ffmpeg notation ``0xRRGGBB`` of an RGB(A) color."""
+    return "0x%02X%02X%02X" % tuple(int(round(value)) for value in color[:3])
+
+
+class FFMPEG_FilterGraph:
+    """Translates clips into the inputs and the ``-filter_complex`` graph of an
+    ffmpeg command, where each stream is the translation of a clip of the
+    graph of clips which made it (see ``Clip.source``, ``Clip.operation`` and
+    ``VideoClip.sections``).
+
+    The methods ``video`` and ``audio`` raise a ``ValueError`` telling which
+    clip can't be translated, and why, if a clip isn't a media file, a
+    ``ColorClip``, or made from such clips with operations having an ffmpeg
+    equivalent: ``subclipped``, the effects ``Resize``, ``Crop``, ``FadeIn``,
+    ``FadeOut``, ``MultiplyVolume``, ``AudioFadeIn`` and ``AudioFadeOut``,
+    ``concatenate_videoclips`` (with the ``"chain"`` method),
+    ``CompositeVideoClip`` with clips at constant positions and without masks,
+    and ``CompositeAudioClip``.
+
+    Parameters
+    ----------
+
+    fps
+      Frame rate of the video streams.
+
+    audio_fps
+      Sample rate of the audio streams.
+    """
+
+    def __init__(self, fps, audio_fps=44100):
+        self.fps = fps
+        self.audio_fps = audio_fps
+        self.inputs = []
+        self.filters = []
+        self.n_labels = 0
+
+    def input(self, filename, start_time, duration):
+        """Adds the part of a media file from ``start_time`` lasting
+        ``duration`` seconds to the inputs, and returns its index.
+        """
+        self.inputs.append(
+            [
+                "-ss",
+                "%.6f" % start_time,
+                "-t",
+                "%.6f" % duration,
+                "-i",
+                ffmpeg_escape_filename(filename),
+            ]
+        )
+        return len(self.inputs) - 1
+
+    def chain(self, labels, filters):
+        """Adds a chain of ``filters`` applied to the streams ``labels`` to the
+        graph, and returns the label of its output stream.
+        """
+        self.n_labels += 1
+        label = "[s%d]" % self.n_labels
+        self.filters.append("".join(labels) + ",".join(filters) + label)
+        return label
+
+    @staticmethod
+    def fail(clip, reason):
+        """Raises the error telling why ``clip`` can't be translated."""
+        name = type(clip).__name__
+        if getattr(clip, "source", None) is not None:
+            name += " of %s" % clip.source[0]
+        raise ValueError("%s can't be rendered by ffmpeg: %s." % (name, reason))
+
+    def check_duration(self, clip, duration):
+        """Fails if ``clip`` must be played longer than its duration."""
+        if (clip.duration is not None) and (duration > clip.duration + 1e-6):
+            self.fail(clip, "it is played after its end")
+
+    def video(self, clip, duration):
+        """Returns the label of the stream of the frames of ``clip`` during its
+        first ``duration`` seconds.
+        """
+        self.check_duration(clip, duration)
+        if clip.is_mask:
+            self.fail(clip, "it is a mask")
+
+        if clip.source is not None:
+            filename, start_time = clip.source
+            index = self.input(filename, start_time, duration)
+            return self.chain(
+                ["[%d:v:0]" % index],
+                ["setpts=PTS-STARTPTS", "fps=%s" % self.fps, "setsar=1"],
+            )
+
+        if clip.operation is not None:
+            return self.video_operation(clip, duration)
+
+        if clip.sections is not None:
+            return self.video_sections(clip, duration)
+
+        if isinstance(clip, CompositeVideoClip):
+            return self.video_composition(clip, duration)
+
+        if isinstance(clip, ImageClip) and ("frame_function" in clip.__dict__):
+            if clip.frame_function(0) is not clip.img:
+                self.fail(clip, "its frames were modified")
+            if not is_constant_frame(clip.img):
+                self.fail(clip, "its image isn't a single color")
+            return self.color(clip.img[0, 0], clip.size, duration)
+
+        self.fail(clip, "its frames are computed in Python")
+
+    def color(self, color, size, duration):
+        """Returns the label of a stream of frames of the given color."""
+        return self.chain(
+            [],
+            [
+                "color=c=%s:s=%dx%d:r=%s:d=%.6f"
+                % (ffmpeg_color(color), size[0], size[1], self.fps, duration)
+            ],
+        )
+
+    def video_operation(self, clip, duration):
+        """Translates a clip made from another clip with ``subclipped`` or an
+        effect.
+        """
+        kind, parent, *args = clip.operation
+        if kind == "subclipped":
+            start_time = args[0]
+            label = self.video(parent, start_time + duration)
+            return self.chain(
+                [label],
+                [
+                    "trim=start=%.6f:duration=%.6f" % (start_time, duration),
+                    "setpts=PTS-STARTPTS",
+                ],
+            )
+
+        effect = args[0]
+        if isinstance(effect, Resize):
+            if any(
+                callable(value)
+                for value in (effect.new_size, effect.width, effect.height)
+            ):
+                self.fail(clip, "its size changes with time")
+            filters = ["scale=%d:%d:flags=lanczos" % tuple(clip.size), "setsar=1"]
+        elif isinstance(effect, Crop):
+            filters = [
+                "crop=%d:%d:%d:%d"
+                % (clip.size[0], clip.size[1], int(effect.x1), int(effect.y1))
+            ]
+        elif isinstance(effect, FadeIn):
+            # faded in RGB, like in Python, not in YUV
+            filters = [
+                "format=rgb24",
+                "fade=t=in:st=0:d=%.6f:color=%s"
+                % (effect.duration, ffmpeg_color(effect.initial_color)),
+            ]
+        elif isinstance(effect, FadeOut):
+            filters = [
+                "format=rgb24",
+                "fade=t=out:st=%.6f:d=%.6f:color=%s"
+                % (
+                    parent.duration - effect.duration,
+                    effect.duration,
+                    ffmpeg_color(effect.final_color),
+                ),
+            ]
+        else:
+            self.fail(
+                clip, "the effect %s has no ffmpeg filter" % type(effect).__name__
+            )
+        return self.chain([self.video(parent, duration)], filters)
+
+    def video_sections(self, clip, duration):
+        """Translates a concatenation of clips played one after the other."""
+        timings = clip.timings
+        if not np.allclose(np.diff(timings), [s.duration for s in clip.sections]):
+            self.fail(clip, "its clips overlap or are separated by gaps")
+
+        labels = []
+        for section, start in zip(clip.sections, timings):
+            if start >= duration:
+                break
+            if tuple(section.size) != tuple(clip.size):
+                self.fail(clip, "its clips don't all have the same size")
+            labels.append(self.video(section, min(section.duration, duration - start)))
+        return self.chain(labels, ["concat=n=%d:v=1:a=0" % len(labels)])
+
+    def video_composition(self, clip, duration):
+        """Translates a ``CompositeVideoClip``, whose clips are overlaid on its
+        background.
+        """
+        if not (
+            type(clip).frame_function is CompositeVideoClip.frame_function
+            and ("frame_function" not in clip.__dict__)
+        ):
+            self.fail(clip, "its frames are computed in Python")
+
+        if clip.created_bg:
+            label = self.color(clip.bg_color, clip.size, duration)
+        elif clip.bg.start or (tuple(clip.bg.size) != tuple(clip.size)):
+            self.fail(clip, "its background clip doesn't cover it")
+        else:
+            label = self.video(clip.bg, duration)
+
+        for layer in clip._flat_clips:
+            end = duration if layer.end is None else min(layer.end, duration)
+            if end <= layer.start:
+                continue
+            if layer.mask is not None:
+                self.fail(layer, "it has a mask")
+            if (layer.constant_pos is None) or (layer.composition_bounds is not None):
+                self.fail(layer, "its position changes with time")
+
+            x, y = compute_position(
+                layer.size, clip.size, layer.constant_pos, layer.relative_pos
+            )
+            layer_label = self.video(layer, end - layer.start)
+            if layer.start:
+                layer_label = self.chain(
+                    [layer_label], ["setpts=PTS-STARTPTS+%.6f/TB" % layer.start]
+                )
+            label = self.chain(
+                [label, layer_label], ["overlay=x=%d:y=%d:eof_action=pass" % (x, y)]
+            )
+        return label
+
+    def audio(self, clip, duration):
+        """Returns the label of the stream of the sound of ``clip`` during its
+        first ``duration`` seconds.
+        """
+        self.check_duration(clip, duration)
+
+        if clip.source is not None:
+            filename, start_time = clip.source
+            index = self.input(filename, start_time, duration)
+            return self.chain(
+                ["[%d:a:0]" % index],
+                ["asetpts=PTS-STARTPTS", "aresample=%d" % self.audio_fps],
+            )
+
+        if clip.operation is not None:
+            return self.audio_operation(clip, duration)
+
+        if isinstance(clip, CompositeAudioClip):
+            return self.audio_composition(clip, duration)
+
+        self.fail(clip, "its sound is computed in Python")
+
+    def audio_operation(self, clip, duration):
+        """Translates a sound made from another with ``subclipped`` or an
+        effect.
+        """
+        kind, parent, *args = clip.operation
+        if kind == "subclipped":
+            start_time = args[0]
+            label = self.audio(parent, start_time + duration)
+            return self.chain(
+                [label],
+                [
+                    "atrim=start=%.6f:duration=%.6f" % (start_time, duration),
+                    "asetpts=PTS-STARTPTS",
+                ],
+            )
+
+        effect = args[0]
+        if isinstance(effect, MultiplyVolume):
+            if (effect.start_time is not None) or (effect.end_time is not None):
+                self.fail(clip, "the volume is only multiplied during a time range")
+            filters = ["volume=%s" % effect.factor]
+        elif isinstance(effect, AudioFadeIn):
+            filters = ["afade=t=in:st=0:d=%.6f" % effect.duration]
+        elif isinstance(effect, AudioFadeOut):
+            filters = [
+                "afade=t=out:st=%.6f:d=%.6f"
+                % (parent.duration - effect.duration, effect.duration)
+            ]
+        else:
+            self.fail(
+                clip, "the effect %s has no ffmpeg filter" % type(effect).__name__
+            )
+        return self.chain([self.audio(parent, duration)], filters)
+
+    def audio_composition(self, clip, duration):
+        """Translates a ``CompositeAudioClip``, whose sounds are mixed."""
+        if "frame_function" in clip.__dict__:
+            self.fail(clip, "its sound is computed in Python")
+
+        labels = []
+        for child in clip.clips:
+            end = duration if child.end is None else min(child.end, duration)
+            if end <= child.start:
+                continue
+            label = self.audio(child, end - child.start)
+            if child.start:
+                label = self.chain(
+                    [label], ["adelay=delays=%d:all=1" % round(1000 * child.start)]
+                )
+            labels.append(label)
+
+        filters = [
+            "apad=whole_dur=%.6f" % duration,
+            "atrim=duration=%.6f" % duration,
+        ]
+        if not labels:
+            labels = [self.chain([], ["anullsrc=r=%d:cl=stereo" % self.audio_fps])]
+        elif len(labels) > 1:
+            filters.insert(
+                0, "amix=inputs=%d:duration=longest:normalize=0" % len(labels)
+            )
+        return self.chain(labels, filters)
+
+
+def ffmpeg_write_filter_graph(
+    clip,
+    filename,
+    fps,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audio=True,
+    audio_fps=44100,
+    audio_codec=None,
+    audio_bitrate=None,
+    threads=None,
+    ffmpeg_params=None,
+    pixel_format=None,
+    logger="bar",
+):
+    """Writes the clip to a video file with a single ffmpeg command, where its
+    frames and sound are computed by the filters of a ``-filter_complex``
+    graph translating the clip (see ``FFMPEG_FilterGraph``).
+
+    Raises a ``ValueError`` telling which part of the clip can't be computed by
+    ffmpeg filters, before writing anything, if the clip can't be translated.
+
+    Parameters
+    ----------
+
+    audio
+      Either ``True`` to use the sound of the clip, if any, ``False`` for no
+      sound, or the name of an audio file.
+
+    Other parameters are the ones of ``VideoClip.write_videofile``.
+    """
+    logger = proglog.default_bar_logger(logger)
+    graph = FFMPEG_FilterGraph(fps, audio_fps)
+    video_label = graph.video(clip, clip.duration)
+
+    audio_label, nchannels = None, None
+    if isinstance(audio, str):
+        audio_label = "%d:a:0" % len(graph.inputs)
+        graph.inputs.append(["-i", ffmpeg_escape_filename(audio)])
+    elif audio and (clip.audio is not None):
+        audio_label = graph.audio(clip.audio, clip.audio.duration)
+        nchannels = clip.audio.nchannels
+
+    cmd = [ffmpeg_binary(), "-y", "-loglevel", "error"]
+    for input_args in graph.inputs:
+        cmd.extend(input_args)
+    cmd.extend(["-filter_complex", ";".join(graph.filters), "-map", video_label])
+
+    if audio_label is not None:
+        cmd.extend(["-map", audio_label])
+        if audio_codec is not None:
+            cmd.extend(["-acodec", audio_codec])
+        cmd.extend(["-strict", "-2", "-ar", "%d" % audio_fps])
+        if nchannels is not None:
+            cmd.extend(["-ac", "%d" % nchannels])
+        if audio_bitrate is not None:
+            cmd.extend(["-b:a", audio_bitrate])
+
+    cmd.extend(["-vcodec", codec, "-preset", preset])
+    if ffmpeg_params is not None:
+        cmd.extend(ffmpeg_params)
+    if bitrate is not None:
+        cmd.extend(["-b", bitrate])
+    if threads is not None:
+        cmd.extend(["-threads", str(threads)])
+
+    if pixel_format is not None:
+        cmd.extend(["-pix_fmt", pixel_format])
+    elif (codec == "libx264") and (clip.w % 2 == 0) and (clip.h % 2 == 0):
+        cmd.extend(["-pix_fmt", "yuv420p"])
+
+    cmd.extend(["-t", "%.6f" % clip.duration, ffmpeg_escape_filename(filename)])
+
+    logger(message="MoviePy - Rendering the clip with ffmpeg filters.")
+    subprocess_call(cmd, logger=logger)
@@ -3,11 +3,14 @@
 import os
 import re
 import subprocess as sp
+import threading
+import time
 import warnings
+from contextlib import contextmanager
 
 import numpy as np
 
-from moviepy.config import FFMPEG_BINARY  # ffmpeg, ffmpeg.exe, etc...
+from moviepy.config import ffmpeg_binary
 from moviepy.tools import (
     convert_to_seconds,
     cross_platform_popen_params,
@@ -15,8 +18,175 @@ from moviepy.tools import (
 )
 
 
-class FFMPEG_VideoReader:
-    """Class for video byte-level reading with ffmpeg."""
+class ReaderCursor:
+    """A position of a reader in its file, with the ffmpeg process piping the
+    file from there, used by one thread at a time. The keyword arguments are
+    the attributes of the position in the file, like ``pos``, set by the
+    reader.
+
+    Attributes
+    ----------
+
+    lock
+      Lock held by the thread using the cursor.
+
+    thread
+      The thread using the cursor, None if no thread has used it yet.
+
+    last_used
+      Time at which the cursor was last used, to take over the least recently
+      used cursor.
+
+    proc
+      The ffmpeg process piping the file from the position, or None.
+    """
+
+    def __init__(self, **attributes):
+        self.lock = threading.RLock()
+        self.thread = None
+        self.last_used = 0
+        self.proc = None
+        self.__dict__.update(attributes)
+
+
+def cursor_attribute(name):
+    """Returns a property of a reader for the attribute ``name`` of the cursor
+    of the current thread.
+    """
+    return property(
+        lambda reader: getattr(reader.cursor, name),
+        lambda reader, value: setattr(reader.cursor, name, value),
+        lambda reader: delattr(reader.cursor, name),
+        doc="``%s`` of the cursor of the current thread." % name,
+    )
+
+
+class ThreadSafeReader:
+    """Base class of the readers of files which can be used from several
+    threads. Each thread reads the file with its own cursor (see
+    ``ReaderCursor``), and the probe of the file is shared.
+
+    At most ``max_cursors`` cursors are opened, one per thread if None. A
+    thread without cursor takes over the cursor of a finished thread, or when
+    all the cursors are opened, the idle cursor least recently used, waiting
+    for one if they are all in use.
+
+    ``proc`` and the attributes made with ``cursor_attribute`` are the ones of
+    the cursor of the current thread. The cursor is locked while the public
+    methods reading the file use it, with ``using_cursor``.
+    """
+
+    proc = cursor_attribute("proc")
+
+    def init_cursors(self, max_cursors=None, **defaults):
+        """Makes the reader with no cursor. ``defaults`` are the attributes of
+        the new cursors.
+        """
+        self.max_cursors = max_cursors
+        self.cursor_defaults = defaults
+        self.cursors = []
+        self.cursors_released = threading.Condition()
+        self.local = threading.local()
+        self.cursors_pid = os.getpid()
+
+    @property
+    def cursor(self):
+        """The cursor of the current thread."""
+        if self.cursors_pid != os.getpid():
+            # A reader inherited by a forked process (see the ``workers`` option
+            # of ``VideoClip.write_videofile``) can't share the pipes of its
+            # parent, so it opens its own cursors
+            self.init_cursors(self.max_cursors, **self.cursor_defaults)
+        cursor = getattr(self.local, "cursor", None)
+        if (cursor is None) or (cursor.thread is not threading.current_thread()):
+            cursor = self.take_cursor()
+        return cursor
+
+    def take_cursor(self):
+        """Gives a cursor to the current thread, and returns it."""
+        thread = threading.current_thread()
+        with self.cursors_released:
+            while True:
+                cursor = self.idle_cursor(finished_threads=True)
+                if (cursor is None) and (
+                    (self.max_cursors is None) or (len(self.cursors) < self.max_cursors)
+                ):
+                    cursor = ReaderCursor(**self.cursor_defaults)
+                    cursor.thread = thread
+                    self.cursors.append(cursor)
+                    break
+                if cursor is None:
+                    cursor = self.idle_cursor()
+                if cursor is not None:
+                    # changed while locked, so not while its thread uses it
+                    cursor.thread = thread
+                    cursor.lock.release()
+                    break
+                self.cursors_released.wait()
+        self.local.cursor = cursor
+        return cursor
+
+    def idle_cursor(self, finished_threads=False):
+        """Returns the idle cursor least recently used, locked, or None. Only the
+        cursors of finished threads if ``finished_threads``.
+        """
+        for cursor in sorted(self.cursors, key=lambda cursor: cursor.last_used):
+            if finished_threads and cursor.thread.is_alive():
+                continue
+            if cursor.lock.acquire(blocking=False):
+                return cursor
+        return None
+
+    @contextmanager
+    def using_cursor(self):
+        """Locks the cursor of the current thread while it is used."""
+        while True:
+            cursor = self.cursor
+            cursor.lock.acquire()
+            if cursor.thread is threading.current_thread():
+                break
+            # taken over by another thread in the meantime
+            cursor.lock.release()
+        try:
+            yield cursor
+        finally:
+            cursor.last_used = time.monotonic()
+            cursor.lock.release()
+            with self.cursors_released:
+                self.cursors_released.notify_all()
+
+    def close(self, *args, **kwargs):
+        """Closes the reader, closing all its cursors."""
+        if getattr(self, "cursors_pid", None) != os.getpid():
+            return
+        for cursor in self.cursors:
+            with cursor.lock:
+                self.close_cursor(cursor, *args, **kwargs)
+
+    def close_cursor(self, cursor):
+        """Closes ``cursor``, terminating its process if it is still open."""
+        if cursor.proc:
+            if cursor.proc.poll() is None:
+                cursor.proc.terminate()
+                cursor.proc.stdout.close()
+                cursor.proc.stderr.close()
+                cursor.proc.wait()
+            cursor.proc = None
+
+    def __del__(self):
+        self.close()
+
+
+class FFMPEG_VideoReader(ThreadSafeReader):
+    """Class for video byte-level reading with ffmpeg.
+
+    ``get_frame`` can be called from several threads, each thread reading the
+    file with its own ffmpeg process and position (see ``ThreadSafeReader``),
+    at most ``max_cursors`` processes if it is not None.
+    """
+
+    pos = cursor_attribute("pos")
+    last_read = cursor_attribute("last_read")
 
     def __init__(
         self,
@@ -29,9 +199,10 @@ class FFMPEG_VideoReader:
         target_resolution=None,
         resize_algo="bicubic",
         fps_source="fps",
+        max_cursors=None,
     ):
+        self.init_cursors(max_cursors)
         self.filename = filename
-        self.proc = None
         infos = ffmpeg_parse_infos(
             filename,
             check_duration=check_duration,
@@ -87,13 +258,28 @@ class FFMPEG_VideoReader:
         Sets self.pos to the appropriate value (1 if start_time == 0 because
         it pre-reads the first frame).
         """
-        self.close(delete_lastread=False)  # if any
+        self.close_cursor(self.cursor, delete_lastread=False)  # if any
 
         # self.pos represents the (0-indexed) index of the frame that is next in line
         # to be read by self.read_frame().
         # Eg when self.pos is 1, the 2nd frame will be read next.
         self.pos = self.get_frame_number(start_time)
 
+        popen_params = cross_platform_popen_params(
+            {
+                "bufsize": self.bufsize,
+                "stdout": sp.PIPE,
+                "stderr": sp.PIPE,
+                "stdin": sp.DEVNULL,
+            }
+        )
+        self.proc = sp.Popen(self.ffmpeg_command(), **popen_params)
+        self.last_read = self.read_frame()
+
+    def ffmpeg_command(self):
+        """Returns the ffmpeg command piping the frames of the file from the
+        frame of index ``self.pos``.
+        """
         # Getting around a difference between ffmpeg and moviepy seeking:
         # "moviepy seek" means "get the frame displayed at time t"
         #   Hence given a 29.97 FPS video, seeking to .01s means "get frame 0".
@@ -136,7 +322,7 @@ class FFMPEG_VideoReader:
                 i_arg = ["-c:v", "libvpx"] + i_arg
 
         cmd = (
-            [FFMPEG_BINARY]
+            [ffmpeg_binary()]
             + i_arg
             + [
                 "-loglevel",
@@ -155,16 +341,7 @@ class FFMPEG_VideoReader:
             ]
         )
 
-        popen_params = cross_platform_popen_params(
-            {
-                "bufsize": self.bufsize,
-                "stdout": sp.PIPE,
-                "stderr": sp.PIPE,
-                "stdin": sp.DEVNULL,
-            }
-        )
-        self.proc = sp.Popen(cmd, **popen_params)
-        self.last_read = self.read_frame()
+        return cmd
 
     def skip_frames(self, n=1):
         """Reads and throws away n frames"""
@@ -239,27 +416,28 @@ class FFMPEG_VideoReader:
         This function tries to avoid fetching arbitrary frames
         whenever possible, by moving between adjacent frames.
         """
-        # + 1 so that it represents the frame position that it will be
-        # after the frame is read. This makes the later comparisons easier.
-        pos = self.get_frame_number(t) + 1
-
-        # Initialize proc if it is not open
-        if not self.proc:
-            print("Proc not detected")
-            self.initialize(t)
-            return self.last_read
-
-        if pos == self.pos:
-            return self.last_read
-        elif (pos < self.pos) or (pos > self.pos + 100):
-            # We can't just skip forward to `pos` or it would take too long
-            self.initialize(t)
-            return self.last_read
-        else:
-            # If pos == self.pos + 1, this line has no effect
-            self.skip_frames(pos - self.pos - 1)
-            result = self.read_frame()
-            return result
+        with self.using_cursor():
+            # + 1 so that it represents the frame position that it will be
+            # after the frame is read. This makes the later comparisons easier.
+            pos = self.get_frame_number(t) + 1
+
+            # Initialize proc if it is not open, like for the first frame read
+            # by a thread
+            if not self.proc:
+                self.initialize(t)
+                return self.last_read
+
+            if pos == self.pos:
+                return self.last_read
+            elif (pos < self.pos) or (pos > self.pos + 100):
+                # We can't just skip forward to `pos` or it would take too long
+                self.initialize(t)
+                return self.last_read
+            else:
+                # If pos == self.pos + 1, this line has no effect
+                self.skip_frames(pos - self.pos - 1)
+                result = self.read_frame()
+                return result
 
     @property
     def lastread(self):
@@ -274,20 +452,11 @@ class FFMPEG_VideoReader:
         # are getting the nth frame by writing get_frame(n/fps).
         return int(self.fps * t + 0.00001)
 
-    def close(self, delete_lastread=True):
-        """Closes the reader terminating the process, if is still open."""
-        if self.proc:
-            if self.proc.poll() is None:
-                self.proc.terminate()
-                self.proc.stdout.close()
-                self.proc.stderr.close()
-                self.proc.wait()
-            self.proc = None
-        if delete_lastread and hasattr(self, "last_read"):
-            del self.last_read
-
-    def __del__(self):
-        self.close()
+    def close_cursor(self, cursor, delete_lastread=True):
+        """Closes ``cursor``, terminating its process if it is still open."""
+        super().close_cursor(cursor)
+        if delete_lastread and hasattr(cursor, "last_read"):
+            del cursor.last_read
 
 
 def ffmpeg_read_image(filename, with_mask=True, pixel_format=None):
@@ -627,6 +796,9 @@ class FFmpegInfosParser:
                 self.result["video_fps"] = stream_data["fps"]
                 self.result["video_codec_name"] = stream_data.get("codec_name", None)
                 self.result["video_profile"] = stream_data.get("profile", None)
+                self.result["video_pixel_format"] = stream_data.get(
+                    "pixel_format", None
+                )
 
         # some video duration utilities
         if self.result["video_found"] and self.check_duration:
@@ -748,10 +920,15 @@ class FFmpegInfosParser:
             line.lstrip(),
         )
         if main_info_match is not None:
-            (codec_name, profile) = main_info_match.groups()
+            codec_name, profile = main_info_match.groups()
             stream_data["codec_name"] = codec_name
             stream_data["profile"] = profile
 
+        # The pixel format follows the codec, like in "h264 (High), yuv420p(tv)"
+        match_pixel_format = re.search(r"Video:[^,]*,\s*(\w+)", line)
+        if match_pixel_format is not None:
+            stream_data["pixel_format"] = match_pixel_format.group(1)
+
         return stream_data
 
     def parse_fps(self, line):
@@ -844,6 +1021,7 @@ def ffmpeg_parse_infos(
     - ``"audio_metadata"``
     - ``"video_codec_name"``
     - ``"video_profile"``
+    - ``"video_pixel_format"``
 
     Note that "video_duration" is slightly smaller than "duration" to avoid
     fetching the incomplete frames at the end, which raises an error.
@@ -870,7 +1048,7 @@ def ffmpeg_parse_infos(
       https://github.com/Zulko/moviepy/pull/1222).
     """
     # Open the file in a pipe, read output
-    cmd = [FFMPEG_BINARY, "-hide_banner", "-i", ffmpeg_escape_filename(filename)]
+    cmd = [ffmpeg_binary(), "-hide_banner", "-i", ffmpeg_escape_filename(filename)]
     if decode_file:
         cmd.extend(["-f", "null", "-"])
 
@@ -884,7 +1062,7 @@ def ffmpeg_parse_infos(
     )
 
     proc = sp.Popen(cmd, **popen_params)
-    (output, error) = proc.communicate()
+    output, error = proc.communicate()
     infos = error.decode("utf8", errors="ignore")
 
     proc.terminate()
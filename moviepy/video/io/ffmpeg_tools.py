@@ -1,10 +1,12 @@
 """Miscellaneous bindings to ffmpeg."""
 
+import math
 import os
 import re
 import subprocess
+from fractions import Fraction
 
-from moviepy.config import FFMPEG_BINARY, FFPLAY_BINARY
+from moviepy.config import ffmpeg_binary, ffplay_binary
 from moviepy.decorators import convert_parameter_to_seconds, convert_path_to_string
 from moviepy.tools import ffmpeg_escape_filename, subprocess_call
 
@@ -38,7 +40,7 @@ def ffmpeg_extract_subclip(
         outputfile = "%sSUB%d_%d%s" % (name, t1, t2, ext)
 
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-y",
         "-ss",
         "%0.2f" % start_time,
@@ -88,7 +90,7 @@ def ffmpeg_merge_video_audio(
       Audio codec used by FFmpeg in the merge.
     """
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-y",
         "-i",
         ffmpeg_escape_filename(audiofile),
@@ -104,6 +106,187 @@ def ffmpeg_merge_video_audio(
     subprocess_call(cmd, logger=logger)
 
 
+@convert_path_to_string(("outputfile", "audiofile"))
+def ffmpeg_concat_video_files(
+    inputfiles, outputfile, audiofile=None, audio_codec="copy", logger="bar"
+):
+    """Joins video files one after another without re-encoding them, using the
+    concat demuxer of FFmpeg. The files must have been encoded with the same
+    codec and parameters.
+
+    Parameters
+    ----------
+
+    inputfiles : list
+      Paths to the video files to join, in order.
+
+    outputfile : str
+      Path to the output file.
+
+    audiofile : str, optional
+      Path to an audio file used as the soundtrack of the output file. The
+      audio of the input files is ignored.
+
+    audio_codec : str, optional
+      Audio codec used by FFmpeg for the soundtrack.
+    """
+    listfile = outputfile + ".concat.txt"
+    with open(listfile, "w") as f:
+        for inputfile in inputfiles:
+            path = os.path.abspath(os.fspath(inputfile)).replace("'", "'\\''")
+            f.write("file '%s'\n" % path)
+
+    cmd = [ffmpeg_binary(), "-y", "-f", "concat", "-safe", "0", "-i", listfile]
+    if audiofile is not None:
+        cmd.extend(["-i", ffmpeg_escape_filename(audiofile)])
+        cmd.extend(["-map", "0:v", "-map", "1:a", "-acodec", audio_codec])
+    cmd.extend(["-vcodec", "copy", ffmpeg_escape_filename(outputfile)])
+
+    try:
+        subprocess_call(cmd, logger=logger)
+    finally:
+        os.remove(listfile)
+
+
+@convert_path_to_string("inputfile")
+def ffmpeg_keyframes_times(inputfile):
+    """Returns the times, in seconds, of the keyframes of the video stream of a
+    file. The video can be cut without re-encoding it only at these times.
+
+    Parameters
+    ----------
+
+    inputfile : str
+      Path to the video file.
+    """
+    cmd = [
+        ffmpeg_binary(),
+        "-hide_banner",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        ffmpeg_escape_filename(inputfile),
+        "-map",
+        "0:v:0",
+        "-vf",
+        "showinfo",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    # Exact times, from the timestamps of the frames and the time base
+    num, den = re.search(r"time_base: (\d+)/(\d+)", result.stderr).groups()
+    return [
+        float(Fraction(int(pts) * int(num), int(den)))
+        for pts in re.findall(r" pts: *(-?\d+)", result.stderr)
+    ]
+
+
+@convert_path_to_string("inputfile")
+def ffmpeg_video_headers(inputfile):
+    """Returns the parameters of the video stream of a file which are not
+    stored in each frame, as a dictionary with the ``"pixel_format"`` with its
+    color properties, like ``"yuv420p(tv, bt709, progressive)"``, the
+    ``"sample_aspect_ratio"`` if set, and the ``"headers"`` stored by the
+    container (like the sequence and picture parameter sets of H.264, with the
+    profile and level), as decoded by the ``trace_headers`` bitstream filter of
+    ffmpeg, or None if ffmpeg can't decode them for the codec of the stream.
+    Two streams can be joined without re-encoding them only if they have the
+    same parameters.
+
+    Parameters
+    ----------
+
+    inputfile : str
+      Path to the video file.
+    """
+    cmd = [
+        ffmpeg_binary(),
+        "-hide_banner",
+        "-i",
+        ffmpeg_escape_filename(inputfile),
+        "-map",
+        "0:v:0",
+        "-c",
+        "copy",
+        "-bsf:v",
+        "trace_headers",
+        "-frames:v",
+        "1",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    stream = re.search(r"Stream #.*: Video: [^,]*, (\w+(?:\([^)]*\))?)", result.stderr)
+    sample_aspect_ratio = re.search(r"\[SAR (\d+:\d+)", result.stderr)
+
+    headers = None
+    if result.returncode == 0:
+        # the lines of the "Extradata" section, before the first packet
+        lines = [
+            line.split("] ", 1)[1]
+            for line in result.stderr.splitlines()
+            if line.startswith("[trace_headers")
+        ]
+        headers = []
+        if lines and (lines[0] == "Extradata"):
+            for line in lines[1:]:
+                if line.startswith("Packet:"):
+                    break
+                headers.append(line)
+
+    return {
+        "pixel_format": stream.group(1) if stream else None,
+        "sample_aspect_ratio": (
+            sample_aspect_ratio.group(1) if sample_aspect_ratio else None
+        ),
+        "headers": headers,
+    }
+
+
+@convert_path_to_string(("inputfile", "outputfile"))
+def ffmpeg_copy_video_frames(inputfile, outputfile, start_time, n_frames, logger="bar"):
+    """Makes a new video file with ``n_frames`` frames of the video stream of a
+    file, copied without re-encoding them. Unlike ``ffmpeg_extract_subclip``
+    the cut is frame-accurate, provided that ``start_time`` is the time of a
+    keyframe (see ``ffmpeg_keyframes_times``).
+
+    Parameters
+    ----------
+
+    inputfile : str
+      Path to the file from which the frames are copied.
+
+    outputfile : str
+      Path to the output file.
+
+    start_time : float
+      Time of the first frame copied, in seconds.
+
+    n_frames : int
+      Number of frames copied.
+    """
+    cmd = [
+        ffmpeg_binary(),
+        "-y",
+        "-ss",
+        # Rounded up to the microsecond, to seek to the keyframe and not before
+        "%.6f" % (math.ceil(start_time * 1e6) / 1e6),
+        "-i",
+        ffmpeg_escape_filename(inputfile),
+        "-map",
+        "0:v:0",
+        "-vcodec",
+        "copy",
+        "-frames:v",
+        "%d" % n_frames,
+        ffmpeg_escape_filename(outputfile),
+    ]
+    subprocess_call(cmd, logger=logger)
+
+
 @convert_path_to_string(("inputfile", "outputfile"))
 def ffmpeg_extract_audio(inputfile, outputfile, bitrate=3000, fps=44100, logger="bar"):
     """Extract the sound from a video file and save it in ``outputfile``.
@@ -124,7 +307,7 @@ def ffmpeg_extract_audio(inputfile, outputfile, bitrate=3000, fps=44100, logger=
       Frame rate for the new audio file.
     """
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-y",
         "-i",
         ffmpeg_escape_filename(inputfile),
@@ -154,7 +337,7 @@ def ffmpeg_resize(inputfile, outputfile, size, logger="bar"):
       New size in format ``[width, height]`` for the output file.
     """
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-i",
         ffmpeg_escape_filename(inputfile),
         "-vf",
@@ -197,7 +380,7 @@ def ffmpeg_stabilize_video(
 
     outputfile = os.path.join(output_dir, outputfile)
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-i",
         ffmpeg_escape_filename(inputfile),
         "-vf",
@@ -238,7 +421,7 @@ def ffmpeg_version():
         If the FFmpeg command fails to execute properly.
     """
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-version",
         "-v",
         "quiet",
@@ -279,7 +462,7 @@ def ffplay_version():
         If the FFplay command fails to execute properly.
     """
     cmd = [
-        FFPLAY_BINARY,
+        ffplay_binary(),
         "-version",
     ]
 
@@ -3,13 +3,192 @@ On the long term this will implement several methods to make videos
 out of VideoClips
 """
 
+import multiprocessing
+import os
+import queue
+import socket
 import subprocess as sp
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import deque
+from contextlib import ExitStack
+from multiprocessing import shared_memory
 
 import numpy as np
+from PIL import Image
 from proglog import proglog
 
-from moviepy.config import FFMPEG_BINARY
+from moviepy.Clip import render_pass, start_render_pass
+from moviepy.config import ffmpeg_binary
 from moviepy.tools import cross_platform_popen_params, ffmpeg_escape_filename
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.ffmpeg_tools import (
+    ffmpeg_concat_video_files,
+    ffmpeg_copy_video_frames,
+    ffmpeg_keyframes_times,
+    ffmpeg_video_headers,
+)
+
+
+# Codecs able to store an alpha channel in the output stream. For any other
+# codec ffmpeg silently drops the alpha channel of RGBA input.
+ALPHA_CODECS = {
+    "apng",
+    "ffv1",
+    "ffvhuff",
+    "gif",
+    "hap",
+    "libvpx",
+    "libvpx-vp9",
+    "libwebp",
+    "libwebp_anim",
+    "png",
+    "prores_ks",
+    "qtrle",
+    "rawvideo",
+    "tiff",
+    "utvideo",
+}
+
+
+def ffmpeg_supports_alpha(codec, pixel_format=None):
+    """Returns whether a video encoded with ``codec`` can keep transparency.
+
+    Parameters
+    ----------
+
+    codec : str
+      FFMPEG video codec, like ``"libx264"`` or ``"libvpx"``.
+
+    pixel_format : str, optional
+      Pixel format requested for the output. If provided and it has no alpha
+      component (like ``"yuv420p"``), the transparency is lost whatever the
+      codec.
+    """
+    if codec not in ALPHA_CODECS:
+        return False
+    if pixel_format is None:
+        return True
+    return pixel_format.startswith(("yuva", "gbrap", "ya", "pal")) or any(
+        name in pixel_format for name in ("rgba", "bgra", "argb", "abgr")
+    )
+
+
+class YUV420pConverter:
+    """Converts RGB frames of a given size to planar ``yuv420p`` images, the
+    pixel format encoded by most codecs, with the fixed-point BT.601 (limited
+    range) formulas ffmpeg uses by default. The chroma of each block of 2x2
+    pixels is computed from the average of their colors.
+
+    A ``yuv420p`` image is half the size of the RGB frame, so sending it to
+    ffmpeg halves the data piped, and ffmpeg doesn't have to convert it.
+
+    Parameters
+    ----------
+
+    size : tuple or list
+      Size of the frames (width, height), which must be even.
+
+    threads : int, optional
+      Number of threads converting horizontal stripes of the frames in
+      parallel. Default to None (no threads).
+
+    Attributes
+    ----------
+
+    image : np.ndarray
+      The array of bytes of the last converted image: the Y plane, then the U
+      and V planes. It is overwritten by the next conversion.
+    """
+
+    def __init__(self, size, threads=None):
+        width, height = size
+        if (width % 2) or (height % 2):
+            raise ValueError(
+                "MoviePy error: frames of size %dx%d can't be converted to "
+                "yuv420p, their width and height must be even." % (width, height)
+            )
+        self.size = (width, height)
+        self.threads = threads
+        self.image = np.empty(width * height * 3 // 2, dtype="uint8")
+        n_pixels = width * height
+        self.y_plane = self.image[:n_pixels].reshape(height, width)
+        self.u_plane = self.image[n_pixels : 5 * n_pixels // 4].reshape(
+            height // 2, width // 2
+        )
+        self.v_plane = self.image[5 * n_pixels // 4 :].reshape(height // 2, width // 2)
+
+        # even rows limiting the stripes, each with its own work arrays
+        n_stripes = max(1, min(threads or 1, height // 2))
+        limits = 2 * np.linspace(0, height // 2, n_stripes + 1).astype(int)
+        self.stripes = [
+            (
+                y1,
+                y2,
+                np.empty((2, y2 - y1, width), dtype="int32"),
+                np.empty((5, (y2 - y1) // 2, width // 2), dtype="int32"),
+            )
+            for y1, y2 in zip(limits[:-1], limits[1:])
+        ]
+
+    def convert_stripe(self, frame, stripe):
+        """Converts the rows of ``frame`` of a stripe in the planes of
+        ``image``.
+        """
+        y1, y2, (luma, product), (r_sum, g_sum, b_sum, chroma, chroma_product) = stripe
+        r, g, b = (frame[y1:y2, :, i] for i in range(3))
+
+        # Y = ((66 R + 129 G + 25 B + 128) >> 8) + 16
+        np.multiply(r, 66, out=luma, dtype="int32")
+        for channel, coefficient in ((g, 129), (b, 25)):
+            np.multiply(channel, coefficient, out=product, dtype="int32")
+            luma += product
+        luma += 4224  # 128 + (16 << 8)
+        luma >>= 8
+        self.y_plane[y1:y2] = luma
+
+        # sums of the colors of the blocks of 2x2 pixels
+        for channel, total in ((r, r_sum), (g, g_sum), (b, b_sum)):
+            np.add(channel[0::2, 0::2], channel[1::2, 0::2], out=total, dtype="int32")
+            total += channel[0::2, 1::2]
+            total += channel[1::2, 1::2]
+
+        # U = ((-38 R - 74 G + 112 B + 128) >> 8) + 128
+        # V = ((112 R - 94 G - 18 B + 128) >> 8) + 128
+        # computed from the sums of 4 pixels, hence the shift of 10 bits
+        rows = slice(y1 // 2, y2 // 2)
+        for plane, coefficients in (
+            (self.u_plane, (-38, -74, 112)),
+            (self.v_plane, (112, -94, -18)),
+        ):
+            np.multiply(r_sum, coefficients[0], out=chroma)
+            for total, coefficient in (
+                (g_sum, coefficients[1]),
+                (b_sum, coefficients[2]),
+            ):
+                np.multiply(total, coefficient, out=chroma_product)
+                chroma += chroma_product
+            chroma += 131584  # (128 << 10) + 512
+            chroma >>= 10
+            plane[rows] = chroma
+
+    def convert(self, frame):
+        """Converts a RGB frame (an array of shape (height, width, 3)) and
+        returns ``image``.
+        """
+        if len(self.stripes) > 1:
+            from moviepy.video.compositing.CompositeVideoClip import get_thread_pool
+
+            pool = get_thread_pool(self.threads)
+            frames = [frame] * len(self.stripes)
+            list(pool.map(self.convert_stripe, frames, self.stripes))
+        else:
+            for stripe in self.stripes:
+                self.convert_stripe(frame, stripe)
+        return self.image
 
 
 class FFMPEG_VideoWriter:
@@ -45,7 +224,27 @@ class FFMPEG_VideoWriter:
       The name of an audio file that will be incorporated to the video.
 
     audio_codec : str, optional
-      FFMPEG audio codec. If None, ``"copy"`` codec is used.
+      FFMPEG audio codec. If None, ``"copy"`` codec is used for ``audiofile``,
+      and the default codec of the format for ``audio_clip``.
+
+    audio_clip : AudioClip, optional
+      An audio clip that will be incorporated to the video, instead of an
+      audio file. Its sound is computed by a thread while the frames are
+      written, and piped to ffmpeg as raw PCM data through an extra file
+      descriptor, so no intermediate audio file is written. Not available on
+      Windows.
+
+    audio_fps : int, optional
+      Frame rate used to compute the sound of ``audio_clip``.
+
+    audio_nbytes : int, optional
+      Number of bytes per sample of the sound of ``audio_clip``.
+
+    audio_bufsize : int, optional
+      Number of audio frames computed at once for ``audio_clip``.
+
+    audio_bitrate : str, optional
+      Audio bitrate for ``audio_clip``, given as a string like ``"50k"``.
 
     preset : str, optional
       Sets the time that FFMPEG will take to compress the video. The slower,
@@ -75,8 +274,40 @@ class FFMPEG_VideoWriter:
 
     ffmpeg_params : list, optional
       Additional parameters passed to ffmpeg command.
+
+    queue_size : int, optional
+      If defined, the frames are sent to ffmpeg by a thread, from a queue of at
+      most ``queue_size`` frames, so that the next frames can be computed while
+      ffmpeg encodes the previous ones. The frames are copied when they are
+      queued, so the arrays given to ``write_frame`` can be reused.
+
+    convert_to_yuv : bool, optional
+      If True, the RGB frames are converted to ``yuv420p`` images (see
+      ``YUV420pConverter``) before being sent to ffmpeg, which halves the data
+      piped and spares ffmpeg the conversion. Only for opaque frames of even
+      width and height, encoded in a ``yuv420p`` output.
+
+    conversion_threads : int, optional
+      Number of threads converting the frames with ``convert_to_yuv``.
+
+    Attributes
+    ----------
+
+    metrics : dict
+      Statistics on the writing of the frames, to know whether the computing of
+      the frames or their encoding is the bottleneck: ``"frames"`` (number of
+      frames written), ``"write_time"`` (seconds spent sending frames to
+      ffmpeg, including their conversion with ``convert_to_yuv``), and with a
+      queue ``"queue_wait"`` (seconds ``write_frame`` was blocked on a full
+      queue, waiting for ffmpeg), ``"writer_idle"`` (seconds the writer thread
+      waited for frames to send), ``"mean_queue_depth"`` and
+      ``"max_queue_depth"`` (number of frames in the queue when a frame is
+      queued).
     """
 
+    # Output of the ffmpeg process, which writes the video in a file
+    stdout = sp.DEVNULL
+
     def __init__(
         self,
         filename,
@@ -92,6 +323,14 @@ class FFMPEG_VideoWriter:
         threads=None,
         ffmpeg_params=None,
         pixel_format=None,
+        queue_size=None,
+        audio_clip=None,
+        audio_fps=44100,
+        audio_nbytes=2,
+        audio_bufsize=2000,
+        audio_bitrate=None,
+        convert_to_yuv=False,
+        conversion_threads=None,
     ):
         if logfile is None:
             logfile = sp.PIPE
@@ -101,11 +340,20 @@ class FFMPEG_VideoWriter:
         self.audio_codec = audio_codec
         self.ext = self.filename.split(".")[-1]
 
-        pixel_format = "rgba" if with_mask else "rgb24"
+        self.converter = None
+        if convert_to_yuv:
+            if with_mask:
+                raise ValueError(
+                    "MoviePy error: frames with a mask can't be converted to yuv420p."
+                )
+            self.converter = YUV420pConverter(size, threads=conversion_threads)
+            pixel_format = "yuv420p"
+        else:
+            pixel_format = "rgba" if with_mask else "rgb24"
 
         # order is important
         cmd = [
-            FFMPEG_BINARY,
+            ffmpeg_binary(),
             "-y",
             "-loglevel",
             "error" if logfile == sp.PIPE else "info",
@@ -127,6 +375,25 @@ class FFMPEG_VideoWriter:
             if audio_codec is None:
                 audio_codec = "copy"
             cmd.extend(["-i", audiofile, "-acodec", audio_codec])
+        elif audio_clip is not None:
+            audio_pipe, self.audio_pipe = os.pipe()
+            cmd.extend(
+                [
+                    "-f",
+                    "s%dle" % (8 * audio_nbytes),
+                    "-ar",
+                    "%d" % audio_fps,
+                    "-ac",
+                    "%d" % audio_clip.nchannels,
+                    "-i",
+                    "pipe:%d" % audio_pipe,
+                ]
+            )
+            if audio_codec is not None:
+                cmd.extend(["-acodec", audio_codec])
+            cmd.extend(["-strict", "-2"])  # needed to support codec 'aac'
+            if audio_bitrate is not None:
+                cmd.extend(["-b:a", audio_bitrate])
 
         if codec == "h264_nvenc":
             cmd.extend(["-c:v", codec])
@@ -148,6 +415,8 @@ class FFMPEG_VideoWriter:
         if codec == "libvpx" and with_mask:
             cmd.extend(["-pix_fmt", "yuva420p"])
             cmd.extend(["-auto-alt-ref", "0"])
+        elif convert_to_yuv:
+            cmd.extend(["-pix_fmt", "yuv420p"])
         elif (
             (codec == "libx264" or codec == "h264_nvenc")
             and (size[0] % 2 == 0)
@@ -158,15 +427,111 @@ class FFMPEG_VideoWriter:
         cmd.extend([ffmpeg_escape_filename(filename)])
 
         popen_params = cross_platform_popen_params(
-            {"stdout": sp.DEVNULL, "stderr": logfile, "stdin": sp.PIPE}
+            {"stdout": self.stdout, "stderr": logfile, "stdin": sp.PIPE}
         )
+        if audio_clip is not None:
+            popen_params["pass_fds"] = (audio_pipe,)
 
-        self.proc = sp.Popen(cmd, **popen_params)
+        try:
+            self.proc = self.start_process(cmd, popen_params)
+        finally:
+            if audio_clip is not None:
+                os.close(audio_pipe)
+
+        self.metrics = {"frames": 0, "write_time": 0.0}
+        self.error = self.audio_error = None
+
+        self.audio_thread = None
+        if audio_clip is not None:
+            self.audio_thread = threading.Thread(
+                target=self.send_audio,
+                args=(audio_clip, audio_fps, audio_nbytes, audio_bufsize),
+                daemon=True,
+            )
+            self.audio_thread.start()
+
+        self.queue = None
+        if queue_size:
+            self.metrics.update(
+                queue_wait=0.0, writer_idle=0.0, mean_queue_depth=0.0, max_queue_depth=0
+            )
+            self.queue = queue.Queue(maxsize=queue_size)
+            self.queued_frames = 0
+            self.thread = threading.Thread(target=self.send_queued_frames, daemon=True)
+            self.thread.start()
+
+    def start_process(self, cmd, popen_params):
+        """Starts and returns the ffmpeg process of the writer."""
+        return sp.Popen(cmd, **popen_params)
 
     def write_frame(self, img_array):
-        """Writes one frame in the file."""
+        """Writes one frame in the file, or queues a copy of it if the writer
+        has a queue.
+        """
+        if self.queue is None:
+            self.send_frame(img_array)
+            return
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+        depth = self.queue.qsize()
+        self.queued_frames += 1
+        self.metrics["mean_queue_depth"] += (
+            depth - self.metrics["mean_queue_depth"]
+        ) / self.queued_frames
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], depth)
+
+        # the frame function may reuse its array for the next frames
+        img_array = np.array(img_array, order="C")
+        start = time.perf_counter()
+        self.queue.put(img_array)
+        self.metrics["queue_wait"] += time.perf_counter() - start
+
+    def send_queued_frames(self):
+        """Sends the frames of the queue to ffmpeg until ``None`` is queued.
+        Runs in the thread of the writer.
+        """
+        while True:
+            start = time.perf_counter()
+            img_array = self.queue.get()
+            self.metrics["writer_idle"] += time.perf_counter() - start
+            if img_array is None:
+                return
+            try:
+                self.send_frame(img_array)
+            except IOError as error:
+                self.error = error
+                # Discard the next frames until the writer is closed
+                while self.queue.get() is not None:
+                    pass
+                return
+
+    def send_audio(self, audio_clip, fps, nbytes, bufsize):
+        """Sends the sound of the audio clip to ffmpeg, chunk by chunk. Runs in
+        the audio thread of the writer.
+        """
+        try:
+            with open(self.audio_pipe, "wb") as pipe:
+                for chunk in audio_clip.iter_chunks(
+                    chunksize=bufsize, quantize=True, nbytes=nbytes, fps=fps
+                ):
+                    pipe.write(memoryview(np.ascontiguousarray(chunk)))
+        except Exception as error:
+            self.audio_error = error
+
+    def send_frame(self, img_array):
+        """Sends one frame to ffmpeg, without copying it if it is contiguous, or
+        converted to yuv420p with ``convert_to_yuv``.
+        """
+        start = time.perf_counter()
+        if self.converter is not None:
+            img_array = self.converter.convert(img_array)
         try:
-            self.proc.stdin.write(img_array.tobytes())
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(img_array)))
+            self.metrics["frames"] += 1
+            self.metrics["write_time"] += time.perf_counter() - start
         except IOError as err:
             _, ffmpeg_error = self.proc.communicate()
             if ffmpeg_error is not None:
@@ -176,60 +541,86 @@ class FFMPEG_VideoWriter:
                 # so read the error from that file instead
                 self.logfile.seek(0)
                 ffmpeg_error = self.logfile.read()
+            raise self.write_error(err, ffmpeg_error)
 
-            error = (
-                f"{err}\n\nMoviePy error: FFMPEG encountered the following error while "
-                f"writing file {self.filename}:\n\n {ffmpeg_error}"
-            )
+    def write_error(self, err, ffmpeg_error):
+        """Returns the IOError explaining the error ``err`` raised while sending
+        a frame to ffmpeg, given the error output ``ffmpeg_error`` of ffmpeg.
+        """
+        error = (
+            f"{err}\n\nMoviePy error: FFMPEG encountered the following error while "
+            f"writing file {self.filename}:\n\n {ffmpeg_error}"
+        )
 
-            if "Unknown encoder" in ffmpeg_error or "Unknown decoder" in ffmpeg_error:
-                error += (
-                    "\n\nThe video export failed because FFMPEG didn't find the "
-                    "specified codec for video or audio. "
-                    "Please install this codec or change the codec when calling "
-                    "write_videofile.\nFor instance:\n"
-                    "  >>> clip.write_videofile('myvid.webm', audio='myaudio.mp3', "
-                    "codec='libvpx', audio_codec='aac')"
-                )
+        if "Unknown encoder" in ffmpeg_error or "Unknown decoder" in ffmpeg_error:
+            error += (
+                "\n\nThe video export failed because FFMPEG didn't find the "
+                "specified codec for video or audio. "
+                "Please install this codec or change the codec when calling "
+                "write_videofile.\nFor instance:\n"
+                "  >>> clip.write_videofile('myvid.webm', audio='myaudio.mp3', "
+                "codec='libvpx', audio_codec='aac')"
+            )
 
-            elif "incorrect codec parameters ?" in ffmpeg_error:
-                error += (
-                    "\n\nThe video export failed, possibly because the codec "
-                    f"specified for the video {self.codec} is not compatible with "
-                    f"the given extension {self.ext}.\n"
-                    "Please specify a valid 'codec' argument in write_videofile.\n"
-                    "This would be 'libx264' or 'mpeg4' for mp4, "
-                    "'libtheora' for ogv, 'libvpx for webm.\n"
-                    "Another possible reason is that the audio codec was not "
-                    "compatible with the video codec. For instance, the video "
-                    "extensions 'ogv' and 'webm' only allow 'libvorbis' (default) as a"
-                    "video codec."
-                )
+        elif "incorrect codec parameters ?" in ffmpeg_error:
+            error += (
+                "\n\nThe video export failed, possibly because the codec "
+                f"specified for the video {self.codec} is not compatible with "
+                f"the given extension {self.ext}.\n"
+                "Please specify a valid 'codec' argument in write_videofile.\n"
+                "This would be 'libx264' or 'mpeg4' for mp4, "
+                "'libtheora' for ogv, 'libvpx for webm.\n"
+                "Another possible reason is that the audio codec was not "
+                "compatible with the video codec. For instance, the video "
+                "extensions 'ogv' and 'webm' only allow 'libvorbis' (default) as a"
+                "video codec."
+            )
 
-            elif "bitrate not specified" in ffmpeg_error:
-                error += (
-                    "\n\nThe video export failed, possibly because the bitrate "
-                    "specified was too high or too low for the video codec."
-                )
+        elif "bitrate not specified" in ffmpeg_error:
+            error += (
+                "\n\nThe video export failed, possibly because the bitrate "
+                "specified was too high or too low for the video codec."
+            )
 
-            elif "Invalid encoder type" in ffmpeg_error:
-                error += (
-                    "\n\nThe video export failed because the codec "
-                    "or file extension you provided is not suitable for video"
-                )
+        elif "Invalid encoder type" in ffmpeg_error:
+            error += (
+                "\n\nThe video export failed because the codec "
+                "or file extension you provided is not suitable for video"
+            )
 
-            raise IOError(error)
+        return IOError(error)
 
     def close(self):
-        """Closes the writer, terminating the subprocess if is still alive."""
+        """Closes the writer, terminating the subprocess if is still alive.
+
+        If the writer has a queue, the frames still in it are written first,
+        and an error raised while writing them is raised.
+        """
+        if self.queue is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.queue = None
+
         if self.proc:
             self.proc.stdin.close()
+            if self.audio_thread is not None:
+                # ffmpeg reads the end of the sound once the video ended
+                self.audio_thread.join()
+                self.audio_thread = None
             if self.proc.stderr is not None:
                 self.proc.stderr.close()
             self.proc.wait()
 
             self.proc = None
 
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+        if self.audio_error is not None:
+            error, self.audio_error = self.audio_error, None
+            raise error
+
     # Support the Context Manager protocol, to ensure that resources are cleaned up.
 
     def __enter__(self):
@@ -239,6 +630,157 @@ class FFMPEG_VideoWriter:
         self.close()
 
 
+class FFMPEG_VideoStreamWriter(FFMPEG_VideoWriter):
+    """A ``FFMPEG_VideoWriter`` streaming the video while it is encoded, to a
+    file-like object, a socket or the standard output, in a format which can
+    be played before its end: fragmented MP4 or MPEG-TS.
+
+    The bytes written by ffmpeg are sent by a thread as soon as they are
+    produced. ffmpeg flushes the packets as they are muxed, and starts a new
+    fragment (MP4) with a keyframe every ``fragment_duration`` seconds, and
+    ``libx264`` is tuned for latency, without frames delayed for lookahead or
+    B-frames, so a frame written is streamed in at most ``fragment_duration``
+    seconds of video (plus ``queue_size`` frames if the writer has a queue).
+
+    The sound of ``audio_clip`` is interleaved with the frames. Note that, as
+    it is computed by its own thread, it is not slowed down to the pace of the
+    frames.
+
+    Parameters
+    ----------
+
+    output
+      A file-like object opened in binary mode (with a ``write`` method), a
+      connected socket (for instance a Unix socket), or ``"-"`` for the
+      standard output.
+
+    size : tuple or list
+      Size of the output video in pixels (width, height).
+
+    fps : int
+      Frames per second in the output video.
+
+    format : str, optional
+      ``"mp4"`` (default) for fragmented MP4, or ``"mpegts"``.
+
+    fragment_duration : float, optional
+      Duration in seconds of the fragments of the video, and interval between
+      its keyframes (unless set with ``-g`` in ``ffmpeg_params``). Default to
+      1.
+
+    codec : str, optional
+      FFMPEG codec, default to ``"libx264"``.
+
+    audio_codec : str, optional
+      FFMPEG audio codec for ``audio_clip``, default to ``"aac"``.
+
+    Other parameters are the ones of ``FFMPEG_VideoWriter``.
+
+    Attributes
+    ----------
+
+    metrics : dict
+      The metrics of ``FFMPEG_VideoWriter``, with ``"bytes_sent"``, the number
+      of bytes streamed so far.
+    """
+
+    stdout = sp.PIPE
+
+    def __init__(
+        self,
+        output,
+        size,
+        fps,
+        format="mp4",
+        fragment_duration=1,
+        codec="libx264",
+        audio_codec="aac",
+        ffmpeg_params=None,
+        **kwargs,
+    ):
+        if output == "-":
+            self.send = sys.stdout.buffer.write
+            self.flush = sys.stdout.buffer.flush
+        elif isinstance(output, socket.socket):
+            self.send, self.flush = output.sendall, None
+        else:
+            self.send, self.flush = output.write, getattr(output, "flush", None)
+
+        ffmpeg_params = list(ffmpeg_params or [])
+        if "-g" not in ffmpeg_params:
+            keyframes_interval = max(1, round(fragment_duration * fps))
+            ffmpeg_params.extend(["-g", str(keyframes_interval)])
+        if codec == "libx264":
+            ffmpeg_params.extend(["-tune", "zerolatency"])
+        ffmpeg_params.extend(["-f", format, "-flush_packets", "1"])
+        if format == "mp4":
+            ffmpeg_params.extend(
+                [
+                    "-movflags",
+                    "frag_keyframe+empty_moov+default_base_moof",
+                    "-frag_duration",
+                    "%d" % (fragment_duration * 1e6),
+                ]
+            )
+
+        self.stream_error = None
+        self.stream_thread = None
+        super().__init__(
+            "pipe:1",
+            size,
+            fps,
+            codec=codec,
+            audio_codec=audio_codec,
+            ffmpeg_params=ffmpeg_params,
+            **kwargs,
+        )
+        self.metrics["bytes_sent"] = 0
+        self.stream_thread = threading.Thread(target=self.send_stream, daemon=True)
+        self.stream_thread.start()
+
+    def send_stream(self):
+        """Sends the bytes written by ffmpeg to the output as soon as they are
+        written, until ffmpeg ends. Runs in the stream thread of the writer.
+        """
+        stdout = self.proc.stdout
+        while True:
+            data = os.read(stdout.fileno(), 1 << 16)
+            if not data:
+                break
+            if self.stream_error is not None:
+                # the output failed, the end of the video is discarded
+                continue
+            try:
+                self.send(data)
+                if self.flush is not None:
+                    self.flush()
+                self.metrics["bytes_sent"] += len(data)
+            except Exception as error:
+                self.stream_error = error
+        stdout.close()
+
+    def write_frame(self, img_array):
+        """Writes one frame in the stream, or raises the error of the output if
+        it failed.
+        """
+        if self.stream_error is not None:
+            raise self.stream_error
+        super().write_frame(img_array)
+
+    def close(self):
+        """Closes the writer, once the end of the video is streamed."""
+        try:
+            super().close()
+        finally:
+            if self.stream_thread is not None:
+                self.stream_thread.join()
+                self.stream_thread = None
+
+        if self.stream_error is not None:
+            error, self.stream_error = self.stream_error, None
+            raise error
+
+
 def ffmpeg_write_video(
     clip,
     filename,
@@ -253,9 +795,39 @@ def ffmpeg_write_video(
     ffmpeg_params=None,
     logger="bar",
     pixel_format=None,
+    workers=None,
+    segments=None,
+    queue_size=4,
+    audio_clip=None,
+    audio_fps=44100,
+    audio_nbytes=2,
+    audio_bufsize=2000,
+    audio_bitrate=None,
+    smart_render=False,
+    render_cache=None,
+    convert_to_yuv=False,
+    conversion_threads=None,
+    batch_size=None,
+    render_farm=None,
 ):
     """Write the clip to a videofile. See VideoClip.write_videofile for details
     on the parameters.
+
+    The frames are sent to ffmpeg by a thread of the ``FFMPEG_VideoWriter``
+    while the next ones are computed, from a queue of at most ``queue_size``
+    frames. Set it to None to send each frame before computing the next one.
+
+    The soundtrack is either the file ``audiofile``, or the sound of
+    ``audio_clip`` computed while the frames are written (see
+    ``FFMPEG_VideoWriter``). ``audio_clip`` can't be used with ``segments``,
+    ``smart_render``, ``render_cache`` nor ``render_farm``.
+
+    With ``convert_to_yuv``, the frames are converted to ``yuv420p`` in Python
+    before being sent to ffmpeg (see ``FFMPEG_VideoWriter``), by
+    ``conversion_threads`` threads, unless the video has a mask.
+
+    With ``batch_size``, the frames are computed by batches (see
+    ``Clip.iter_frames``), unless they are rendered by ``workers``.
     """
     logger = proglog.default_bar_logger(logger)
 
@@ -267,11 +839,139 @@ def ffmpeg_write_video(
     logger(message="MoviePy - Writing video %s\n" % filename)
 
     has_mask = clip.mask is not None
+    if has_mask and not ffmpeg_supports_alpha(codec, pixel_format):
+        # The alpha channel would be dropped by ffmpeg anyway, so don't
+        # compute the mask at all and only pipe RGB data.
+        has_mask = False
+    convert_to_yuv = convert_to_yuv and not has_mask
+
+    if ((workers and (workers > 1)) or (segments and (segments > 1))) and not (
+        can_fork()
+    ):
+        warnings.warn(
+            "Rendering frames in several processes requires to fork the current "
+            "process, which is not possible or safe on this platform. The frames "
+            "will be rendered by the current process only.",
+            UserWarning,
+        )
+        workers = segments = None
+
+    if (
+        (segments and (segments > 1)) or smart_render or render_cache or render_farm
+    ) and (audio_clip is not None):
+        raise ValueError(
+            "MoviePy error: the sound of an audio clip can't be piped to ffmpeg "
+            "when rendering segments or smartly, write it to an audio file first."
+        )
 
-    with FFMPEG_VideoWriter(
-        filename,
-        clip.size,
-        fps,
+    if render_cache and not has_mask:
+        from moviepy.video.io.render_cache import ffmpeg_write_video_cached
+
+        if ffmpeg_write_video_cached(
+            clip,
+            filename,
+            fps,
+            render_cache,
+            codec=codec,
+            bitrate=bitrate,
+            preset=preset,
+            audiofile=audiofile,
+            audio_codec=audio_codec,
+            threads=threads,
+            ffmpeg_params=ffmpeg_params,
+            pixel_format=pixel_format,
+            queue_size=queue_size,
+            logger=logger,
+        ):
+            if write_logfile:
+                logfile.close()
+            logger(message="MoviePy - Done !")
+            return
+
+    if smart_render and not has_mask:
+        if ffmpeg_write_video_smart(
+            clip,
+            filename,
+            fps,
+            codec=codec,
+            bitrate=bitrate,
+            preset=preset,
+            audiofile=audiofile,
+            audio_codec=audio_codec,
+            threads=threads,
+            ffmpeg_params=ffmpeg_params,
+            pixel_format=pixel_format,
+            queue_size=queue_size,
+            logger=logger,
+        ):
+            if write_logfile:
+                logfile.close()
+            logger(message="MoviePy - Done !")
+            return
+
+    if render_farm:
+        from moviepy.video.io.clip_graph import describe_clip
+        from moviepy.video.io.render_farm import ffmpeg_write_video_farm
+
+        try:
+            description = describe_clip(clip)
+        except ValueError as error:
+            logger(message="MoviePy - Rendering the frames locally: %s" % error)
+        else:
+            ffmpeg_write_video_farm(
+                clip,
+                filename,
+                fps,
+                render_farm,
+                segments=segments,
+                codec=codec,
+                bitrate=bitrate,
+                preset=preset,
+                audiofile=audiofile,
+                audio_codec=audio_codec,
+                threads=threads,
+                ffmpeg_params=ffmpeg_params,
+                with_mask=has_mask,
+                pixel_format=pixel_format,
+                logger=logger,
+                description=description,
+            )
+            if write_logfile:
+                logfile.close()
+            logger(message="MoviePy - Done !")
+            return
+
+    if segments and (segments > 1):
+        frame_ranges = segments_frame_ranges(
+            int(clip.duration * fps), segments, keyframes_interval(ffmpeg_params)
+        )
+        if len(frame_ranges) > 1:
+            ffmpeg_write_video_segments(
+                clip,
+                filename,
+                fps,
+                frame_ranges,
+                codec=codec,
+                bitrate=bitrate,
+                preset=preset,
+                audiofile=audiofile,
+                audio_codec=audio_codec,
+                threads=threads,
+                ffmpeg_params=ffmpeg_params,
+                with_mask=has_mask,
+                pixel_format=pixel_format,
+                queue_size=queue_size,
+                convert_to_yuv=convert_to_yuv,
+                conversion_threads=conversion_threads,
+                logfile=logfile,
+                logger=logger,
+            )
+            if write_logfile:
+                logfile.close()
+            logger(message="MoviePy - Done !")
+            return
+
+    writer_params = dict(
         codec=codec,
         preset=preset,
         bitrate=bitrate,
@@ -282,23 +982,554 @@ def ffmpeg_write_video(
         threads=threads,
         ffmpeg_params=ffmpeg_params,
         pixel_format=pixel_format,
-    ) as writer:
-        for t, frame in clip.iter_frames(
-            logger=logger, with_times=True, fps=fps, dtype="uint8"
-        ):
-            if clip.mask is not None:
-                mask = 255 * clip.mask.get_frame(t)
-                if mask.dtype != "uint8":
-                    mask = mask.astype("uint8")
-                frame = np.dstack([frame, mask])
-
-            writer.write_frame(frame)
+        queue_size=queue_size,
+        audio_clip=audio_clip,
+        audio_fps=audio_fps,
+        audio_nbytes=audio_nbytes,
+        audio_bufsize=audio_bufsize,
+        audio_bitrate=audio_bitrate,
+        convert_to_yuv=convert_to_yuv,
+        conversion_threads=conversion_threads,
+    )
+    if workers and (workers > 1):
+        metrics = ffmpeg_write_frames_in_processes(
+            clip, filename, fps, workers, writer_params, logger=logger
+        )
+    else:
+        with FFMPEG_VideoWriter(filename, clip.size, fps, **writer_params) as writer:
+            for t, frame in clip.iter_frames(
+                logger=logger,
+                with_times=True,
+                fps=fps,
+                dtype="uint8",
+                batch_size=batch_size,
+            ):
+                if has_mask:
+                    mask = 255 * clip.mask.get_frame(t)
+                    if mask.dtype != "uint8":
+                        mask = mask.astype("uint8")
+                    frame = np.dstack([frame, mask])
+
+                writer.write_frame(frame)
+        metrics = writer.metrics
 
     if write_logfile:
         logfile.close()
+    if queue_size:
+        logger(
+            message=(
+                "MoviePy - Frames waited %.2fs for ffmpeg (average queue of %.1f "
+                "frames), ffmpeg waited %.2fs for frames"
+            )
+            % (
+                metrics["queue_wait"],
+                metrics["mean_queue_depth"],
+                metrics["writer_idle"],
+            )
+        )
     logger(message="MoviePy - Done !")
 
 
+def can_fork():
+    """Returns whether the frames can be rendered in forked processes. Forking
+    is not possible on Windows, and not safe on macOS, whose system libraries
+    may use threads.
+    """
+    return ("fork" in multiprocessing.get_all_start_methods()) and (
+        sys.platform != "darwin"
+    )
+
+
+def fork_context():
+    """Returns the multiprocessing context forking the processes rendering
+    frames or segments, or raises a ValueError if forking is not possible or
+    safe on this platform (see ``can_fork``).
+    """
+    if not can_fork():
+        raise ValueError(
+            "MoviePy error: rendering frames in several processes requires to "
+            "fork the current process, which is not possible or safe on this "
+            "platform."
+        )
+    return multiprocessing.get_context("fork")
+
+
+# In the processes rendering frames or segments, the clip they render, and the
+# array of the shared memory where ``ffmpeg_write_frames_in_processes`` stores
+# the frames or the log file of ``ffmpeg_write_video_segments``, set by
+# ``start_rendering`` when the process starts. The processes are forked, so the
+# clip doesn't have to be pickled.
+RENDERING = {}
+
+
+def start_rendering(state):
+    """Initializer of the processes rendering frames or segments, which stores
+    the dictionary ``state`` in ``RENDERING``, and starts the render pass of
+    all the frames they render (see ``render_pass``).
+    """
+    RENDERING.update(state)
+    start_render_pass()
+
+
+def render_frame_in_slot(slot, t):
+    """Renders the frame of the clip being rendered at time ``t`` in the slot
+    ``slot`` of the shared memory, and returns the slot.
+    """
+    clip, frames = RENDERING["clip"], RENDERING["frames"]
+    frames[slot, :, :, :3] = clip.get_frame(t)
+    if RENDERING["with_mask"]:
+        frames[slot, :, :, 3] = 255 * clip.mask.get_frame(t)
+    return slot
+
+
+def ffmpeg_write_frames_in_processes(
+    clip, filename, fps, workers, writer_params=None, logger="bar"
+):
+    """Renders the frames of the clip in ``workers`` forked processes, and
+    writes them in order to a video file with a ``FFMPEG_VideoWriter``, and
+    returns the ``metrics`` of the writer.
+
+    Each process has its own copy of the clip, and thus of the readers of the
+    files it is made from. The frames are stored in slots of a shared memory,
+    and at most two frames per process are rendered in advance, to bound the
+    memory used. The processes are forked before the writer is made, so that
+    they don't inherit the threads it starts.
+
+    Parameters
+    ----------
+
+    clip : VideoClip
+        The clip to render.
+
+    filename : str
+        Name of the video file to write.
+
+    fps : float
+        Number of frames per second to render.
+
+    workers : int
+        Number of processes rendering the frames.
+
+    writer_params : dict, optional
+        Other parameters of the ``FFMPEG_VideoWriter``, where ``with_mask``
+        tells whether the frames are written with the clip mask as alpha
+        channel.
+
+    logger : str, optional
+        Either ``"bar"`` for progress bar or ``None`` or any Proglog logger.
+    """
+    logger = proglog.default_bar_logger(logger)
+    writer_params = writer_params or {}
+    with_mask = writer_params.get("with_mask", False)
+    w, h = clip.size
+    n_frames = int(clip.duration * fps)
+    n_slots = 2 * workers
+
+    memory = shared_memory.SharedMemory(
+        create=True, size=n_slots * h * w * (4 if with_mask else 3)
+    )
+    frames = np.ndarray(
+        (n_slots, h, w, 4 if with_mask else 3), dtype="uint8", buffer=memory.buf
+    )
+    state = dict(clip=clip, frames=frames, with_mask=with_mask)
+    try:
+        with fork_context().Pool(
+            workers, initializer=start_rendering, initargs=(state,)
+        ) as pool, FFMPEG_VideoWriter(
+            filename, clip.size, fps, **writer_params
+        ) as writer:
+            # Frames are rendered in the order of their index, the frame of
+            # index i in slot i % n_slots, once the previous one is written
+            rendering = deque(
+                pool.apply_async(
+                    render_frame_in_slot, (frame_index % n_slots, frame_index / fps)
+                )
+                for frame_index in range(min(n_slots, n_frames))
+            )
+            for frame_index in logger.iter_bar(frame_index=np.arange(n_frames)):
+                slot = rendering.popleft().get()
+                writer.write_frame(frames[slot])
+
+                next_index = frame_index + n_slots
+                if next_index < n_frames:
+                    rendering.append(
+                        pool.apply_async(render_frame_in_slot, (slot, next_index / fps))
+                    )
+    finally:
+        del frames, state
+        memory.unlink()
+        try:
+            memory.close()
+        except BufferError:
+            # A frame is still referenced by the traceback of an error, the
+            # memory will be released with it
+            pass
+    return writer.metrics
+
+
+def keyframes_interval(ffmpeg_params=None):
+    """Returns the number of frames between two keyframes of the videos written
+    with the given additional ffmpeg parameters, which is the value of their
+    ``-g`` option if any, and else 250, the default of most encoders.
+    """
+    if ffmpeg_params and ("-g" in ffmpeg_params):
+        return int(ffmpeg_params[ffmpeg_params.index("-g") + 1])
+    return 250
+
+
+def segments_frame_ranges(n_frames, segments, interval):
+    """Splits the ``n_frames`` frames of a video in at most ``segments`` ranges
+    of frames ``(first, end)`` of about the same length, each starting on a
+    keyframe, i.e. on a multiple of the keyframes ``interval``.
+    """
+    n_intervals = -(-n_frames // interval)
+    limits = sorted(
+        {
+            min(n_frames, round(k * n_intervals / segments) * interval)
+            for k in range(segments + 1)
+        }
+    )
+    return list(zip(limits[:-1], limits[1:]))
+
+
+def write_segment(filename, frame_range, fps, writer_params, clip=None):
+    """Writes the frames of the given range of ``clip``, or of the clip
+    rendered by the current process (see ``RENDERING``), with its log file if
+    any, in the video file ``filename``, and returns the number of frames
+    written.
+    """
+    if clip is None:
+        clip = RENDERING["clip"]
+        writer_params = dict(writer_params, logfile=RENDERING.get("logfile"))
+    with_mask = writer_params.get("with_mask", False)
+    with FFMPEG_VideoWriter(
+        filename, clip.size, fps, **writer_params
+    ) as writer, render_pass():
+        for frame_index in range(*frame_range):
+            t = frame_index / fps
+            frame = clip.get_frame(t).astype("uint8")
+            if with_mask:
+                mask = (255 * clip.mask.get_frame(t)).astype("uint8")
+                frame = np.dstack([frame, mask])
+            writer.write_frame(frame)
+    return frame_range[1] - frame_range[0]
+
+
+def ffmpeg_write_video_segments(
+    clip,
+    filename,
+    fps,
+    frame_ranges,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audiofile=None,
+    audio_codec=None,
+    threads=None,
+    ffmpeg_params=None,
+    with_mask=False,
+    pixel_format=None,
+    queue_size=None,
+    convert_to_yuv=False,
+    conversion_threads=None,
+    logfile=None,
+    logger="bar",
+):
+    """Writes the clip to a video file by rendering and encoding each range of
+    frames in a forked process, with its own ``FFMPEG_VideoWriter``, in at most
+    as many processes as CPUs. The segments are then joined without
+    re-encoding, and the audio file, if any, is muxed once.
+
+    The segments are encoded with a keyframe every ``keyframes_interval``
+    frames (250 unless set with ``-g`` in ``ffmpeg_params``), so the ranges of
+    frames should start on multiples of it (see ``segments_frame_ranges``) for
+    the keyframes of the video to be regular. The logs of the ffmpeg processes
+    writing the segments are written in the file object ``logfile``, if any.
+
+    See ``ffmpeg_write_video`` for the other parameters.
+    """
+    logger = proglog.default_bar_logger(logger)
+    ffmpeg_params = list(ffmpeg_params or [])
+    if "-g" not in ffmpeg_params:
+        ffmpeg_params.extend(["-g", str(keyframes_interval())])
+
+    writer_params = dict(
+        codec=codec,
+        preset=preset,
+        bitrate=bitrate,
+        with_mask=with_mask,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params,
+        pixel_format=pixel_format,
+        queue_size=queue_size,
+        convert_to_yuv=convert_to_yuv,
+        conversion_threads=conversion_threads,
+    )
+    ext = os.path.splitext(filename)[1]
+    directory = os.path.dirname(os.path.abspath(filename))
+
+    with tempfile.TemporaryDirectory(dir=directory) as segments_dir:
+        segments = [
+            os.path.join(segments_dir, "segment%05d%s" % (i, ext))
+            for i in range(len(frame_ranges))
+        ]
+        with fork_context().Pool(
+            min(len(frame_ranges), os.cpu_count() or 1),
+            initializer=start_rendering,
+            initargs=({"clip": clip, "logfile": logfile},),
+        ) as pool:
+            rendering = [
+                pool.apply_async(
+                    write_segment, (segment, frame_range, fps, writer_params)
+                )
+                for segment, frame_range in zip(segments, frame_ranges)
+            ]
+            for segment_rendering in logger.iter_bar(segment=rendering):
+                segment_rendering.get()
+
+        ffmpeg_concat_video_files(
+            segments,
+            filename,
+            audiofile=audiofile,
+            audio_codec=audio_codec or "copy",
+            logger=None,
+        )
+
+
+def video_stream_infos(filename):
+    """Returns the infos of the video stream of a file which must be the same
+    for two streams to be joined without re-encoding them: the codec, profile,
+    size and fps (see ``ffmpeg_parse_infos``), and the parameters of the
+    stream (see ``ffmpeg_video_headers``), like the pixel format with its color
+    properties, the sample aspect ratio, and the headers of the stream, with
+    the level of the codec.
+    """
+    infos = ffmpeg_parse_infos(filename)
+    stream_infos = {
+        key: infos.get(key)
+        for key in ("video_codec_name", "video_profile", "video_size", "video_fps")
+    }
+    stream_infos.update(ffmpeg_video_headers(filename))
+    return stream_infos
+
+
+def copyable_keyframes(filename, fps, stream_infos):
+    """Returns the times of the keyframes of the video stream of a file, in a
+    dictionary indexed by their frame numbers, or None if the stream can't be
+    joined without re-encoding it to the stream described by ``stream_infos``
+    (as returned by ``video_stream_infos``), because they differ in codec,
+    profile, size, fps, pixel format or headers.
+    """
+    infos = video_stream_infos(filename)
+    if any(
+        infos[key] != stream_infos.get(key) for key in infos if key != "video_fps"
+    ) or (abs(infos["video_fps"] - fps) > 0.001):
+        return None
+    return {round(t * fps): t for t in ffmpeg_keyframes_times(filename)}
+
+
+def smart_render_pieces(clip, fps, stream_infos):
+    """Splits the frames of the clip in pieces ``((first, end), source)``,
+    which are either rendered if ``source`` is None, or copied from the video
+    file ``filename`` from the keyframe at ``start_time`` if ``source`` is
+    ``(filename, start_time)``.
+
+    The frames copied are those of the sections of the clip playing a video
+    file unmodified (see the ``source`` and ``sections`` attributes of
+    ``VideoClip``), from the first to the last keyframe of the file in the
+    section, if the video stream of the file matches ``stream_infos``, the
+    infos of a file encoded like the rendered pieces (see
+    ``video_stream_infos``). Otherwise the frames of the file are rendered
+    like the others.
+    """
+    sections = getattr(clip, "sections", None)
+    if sections is None:
+        sections, timings = [clip], [0, clip.duration]
+    else:
+        timings = clip.timings
+
+    times = np.arange(int(clip.duration * fps)) / fps
+    # Same lookup as the frame function of the concatenated clips
+    sections_indices = np.searchsorted(timings, times, side="right") - 1
+
+    keyframes = {}
+    pieces = []
+    for index, section in enumerate(sections):
+        frames = np.flatnonzero(sections_indices == index)
+        if not len(frames):
+            continue
+        first, end = int(frames[0]), int(frames[-1]) + 1
+
+        source = getattr(section, "source", None)
+        if source is not None:
+            filename, start_time = source
+            if filename not in keyframes:
+                keyframes[filename] = copyable_keyframes(filename, fps, stream_infos)
+
+            # Indices in the file of the first and last frames of the section,
+            # computed like in ``FFMPEG_VideoReader.get_frame_number``
+            source_first, source_last = (
+                int(fps * (start_time + times[i] - timings[index]) + 0.00001)
+                for i in (first, end - 1)
+            )
+            if (keyframes[filename] is not None) and (
+                source_last - source_first == end - first - 1
+            ):
+                inner_keyframes = sorted(
+                    k
+                    for k in keyframes[filename]
+                    if source_first <= k <= source_last + 1
+                )
+                if len(inner_keyframes) > 1:
+                    copy_first = first + inner_keyframes[0] - source_first
+                    copy_end = first + inner_keyframes[-1] - source_first
+                    copy_source = (filename, keyframes[filename][inner_keyframes[0]])
+                    pieces.append(((first, copy_first), None))
+                    pieces.append(((copy_first, copy_end), copy_source))
+                    first = copy_end
+
+        pieces.append(((first, end), None))
+
+    # Join the consecutive frames to render, and drop the empty pieces
+    joined_pieces = []
+    for (first, end), source in pieces:
+        if first == end:
+            continue
+        if (source is None) and joined_pieces and (joined_pieces[-1][1] is None):
+            first = joined_pieces.pop()[0][0]
+        joined_pieces.append(((first, end), source))
+    return joined_pieces
+
+
+def ffmpeg_write_video_smart(
+    clip,
+    filename,
+    fps,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audiofile=None,
+    audio_codec=None,
+    threads=None,
+    ffmpeg_params=None,
+    pixel_format=None,
+    queue_size=None,
+    logger="bar",
+):
+    """Writes the clip to a video file by copying without re-encoding them the
+    frames of the parts of video files it plays unmodified, and by rendering
+    and encoding only its other frames, in pieces which are then joined with
+    the copied ones (see ``smart_render_pieces``). The audio file, if any, is
+    muxed once.
+
+    Returns False, without writing the video file, if no frames of the clip
+    can be copied.
+
+    See ``ffmpeg_write_video`` for the other parameters.
+    """
+    logger = proglog.default_bar_logger(logger)
+    writer_params = dict(
+        codec=codec,
+        preset=preset,
+        bitrate=bitrate,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params,
+        pixel_format=pixel_format,
+        queue_size=queue_size,
+    )
+    # The pieces are stored in Matroska files, which don't store the decoding
+    # timestamps of the frames, so that they are recomputed for the joined
+    # pieces, whose encoders may have delayed the first frames differently.
+    ext = ".mkv"
+    directory = os.path.dirname(os.path.abspath(filename))
+
+    with tempfile.TemporaryDirectory(dir=directory) as pieces_dir:
+        # The copied streams must match the ones of the encoded pieces
+        probe_file = os.path.join(pieces_dir, "probe%s" % ext)
+        with FFMPEG_VideoWriter(probe_file, clip.size, fps, **writer_params) as writer:
+            writer.write_frame(np.zeros((clip.h, clip.w, 3), dtype="uint8"))
+        pieces = smart_render_pieces(clip, fps, video_stream_infos(probe_file))
+
+        n_copied = sum(end - first for (first, end), source in pieces if source)
+        if not n_copied:
+            return False
+        logger(
+            message="MoviePy - Copying %d of the %d frames from the source files"
+            % (n_copied, sum(end - first for (first, end), _ in pieces))
+        )
+
+        pieces_files = []
+        for (first, end), source in logger.iter_bar(piece=pieces):
+            piece_file = os.path.join(
+                pieces_dir, "piece%05d%s" % (len(pieces_files), ext)
+            )
+            if source is None:
+                write_segment(piece_file, (first, end), fps, writer_params, clip=clip)
+            else:
+                source_filename, start_time = source
+                ffmpeg_copy_video_frames(
+                    source_filename,
+                    piece_file,
+                    start_time,
+                    end - first,
+                    logger=None,
+                )
+            pieces_files.append(piece_file)
+
+        ffmpeg_concat_video_files(
+            pieces_files,
+            filename,
+            audiofile=audiofile,
+            audio_codec=audio_codec or "copy",
+            logger=None,
+        )
+    return True
+
+
+def ffmpeg_write_videos(clip, outputs, fps, audiofile=None, queue_size=4, logger="bar"):
+    """Writes the clip to several video files at once, computing each frame
+    only once.
+
+    Each output is a dictionary of the parameters of its ``FFMPEG_VideoWriter``
+    (``filename``, ``size``, ``codec``, ``bitrate``...). The frames are resized
+    for the outputs smaller than the clip in a cascade, each size being made
+    from the next bigger one which isn't bigger than the clip, and fanned out
+    to the writers, which send them to
+    their ffmpeg processes from their own threads, so that the files are
+    encoded in parallel. The audio file, if any, is muxed in every output.
+    """
+    logger = proglog.default_bar_logger(logger)
+    outputs = sorted(outputs, key=lambda output: -output["size"][0])
+
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(
+                FFMPEG_VideoWriter(
+                    fps=fps,
+                    audiofile=audiofile,
+                    queue_size=queue_size,
+                    **output,
+                )
+            )
+            for output in outputs
+        ]
+        for frame in clip.iter_frames(logger=logger, fps=fps, dtype="uint8"):
+            # the frames are resized from the clip frame or from the smallest
+            # bigger output which isn't upscaled
+            source, image = frame, None
+            for writer, output in zip(writers, outputs):
+                size = tuple(output["size"])
+                if size == source.shape[1::-1]:
+                    writer.write_frame(source)
+                    continue
+                if image is None:
+                    image = Image.fromarray(source)
+                resized = np.array(image.resize(size, Image.Resampling.LANCZOS))
+                writer.write_frame(resized)
+                if (size[0] <= clip.w) and (size[1] <= clip.h):
+                    source, image = resized, None
+
+
 def ffmpeg_write_image(filename, image, logfile=False, pixel_format=None):
     """Writes an image (HxWx3 or HxWx4 numpy array) to a file, using ffmpeg.
 
@@ -327,7 +1558,7 @@ def ffmpeg_write_image(filename, image, logfile=False, pixel_format=None):
         pixel_format = "rgba" if (image.shape[2] == 4) else "rgb24"
 
     cmd = [
-        FFMPEG_BINARY,
+        ffmpeg_binary(),
         "-y",
         "-s",
         "%dx%d" % (image.shape[:2][::-1]),
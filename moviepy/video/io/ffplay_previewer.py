@@ -5,7 +5,7 @@ out of VideoClips
 
 import subprocess as sp
 
-from moviepy.config import FFPLAY_BINARY
+from moviepy.config import ffplay_binary
 from moviepy.tools import cross_platform_popen_params
 
 
@@ -34,7 +34,7 @@ class FFPLAY_VideoPreviewer:
     ):
         # order is important
         cmd = [
-            FFPLAY_BINARY,
+            ffplay_binary(),
             "-autoexit",  # If you don't precise, ffplay won't stop at end
             "-f",
             "rawvideo",
@@ -0,0 +1,333 @@
+"""Cache of the encoded segments of rendered videos, indexed by fingerprints of
+the parts of the clips they show, so that rendering a video again after editing
+its clip only renders the segments which changed.
+"""
+
+import hashlib
+import os
+import tempfile
+from numbers import Number
+
+import numpy as np
+import proglog
+
+from moviepy.tools import compute_position
+from moviepy.video import fx as vfx
+from moviepy.video.compositing.CompositeVideoClip import ClipsArray, CompositeVideoClip
+from moviepy.video.io.ffmpeg_tools import ffmpeg_concat_video_files
+from moviepy.video.io.ffmpeg_writer import keyframes_interval, write_segment
+from moviepy.video.VideoClip import ImageClip
+
+
+# Effects whose frame at time ``t`` only depends on the frame of the clip they
+# are applied to at time ``t``
+FRAME_EFFECTS = (
+    vfx.BlackAndWhite,
+    vfx.Blink,
+    vfx.Crop,
+    vfx.CrossFadeIn,
+    vfx.CrossFadeOut,
+    vfx.EvenSize,
+    vfx.FadeIn,
+    vfx.FadeOut,
+    vfx.GammaCorrection,
+    vfx.InvertColors,
+    vfx.LumContrast,
+    vfx.Margin,
+    vfx.MaskColor,
+    vfx.MirrorX,
+    vfx.MirrorY,
+    vfx.MultiplyColor,
+    vfx.Painting,
+    vfx.Resize,
+    vfx.Rotate,
+    vfx.SlideIn,
+    vfx.SlideOut,
+)
+
+
+def value_fingerprint(value):
+    """Returns a fingerprint of a parameter of an effect, or None if it can't
+    be identified, like a function.
+    """
+    if value is None:
+        return ("none",)
+    if isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Number):
+        return round(float(value), 6)
+    if isinstance(value, (tuple, list)):
+        items = tuple(value_fingerprint(item) for item in value)
+        return None if None in items else items
+    if isinstance(value, np.ndarray):
+        return (
+            "array",
+            value.shape,
+            str(value.dtype),
+            hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(),
+        )
+    return None
+
+
+def video_fingerprint(clip, start_time, end_time):
+    """Returns a fingerprint of the frames of a video clip between the times
+    ``start_time`` and ``end_time`` (in the clip): a structure of tuples
+    describing the files, images, effects, positions and time ranges they are
+    made of, which is the same for the same frames, or None if some of them
+    are computed by Python functions which can't be identified.
+
+    The fingerprint is built from the graph of clips which made the clip (see
+    ``Clip.source``, ``Clip.operation`` and ``VideoClip.sections``), where each
+    part of the graph only appears for the times it is played. Video files are
+    identified by their path, size and modification time.
+    """
+    span = (round(float(start_time), 6), round(float(end_time), 6))
+    node = (type(clip).__name__, tuple(clip.size), clip.is_mask)
+
+    if clip.source is not None:
+        filename, source_start = clip.source
+        stat = os.stat(filename)
+        return node + (
+            "file",
+            os.path.abspath(filename),
+            stat.st_size,
+            stat.st_mtime_ns,
+            round(float(source_start + start_time), 6),
+            round(float(source_start + end_time), 6),
+        )
+
+    if clip.operation is not None:
+        kind, parent, *args = clip.operation
+        if kind == "subclipped":
+            parent_fingerprint = video_fingerprint(
+                parent, args[0] + start_time, args[0] + end_time
+            )
+            if parent_fingerprint is None:
+                return None
+            return node + ("subclipped", parent_fingerprint)
+
+        effect = args[0]
+        params = value_fingerprint(sorted(vars(effect).items()))
+        if params is None:
+            return None
+        if isinstance(effect, FRAME_EFFECTS):
+            parent_fingerprint = video_fingerprint(parent, start_time, end_time)
+        elif parent.duration is not None:
+            # the frames may come from any time of the clip
+            parent_fingerprint = video_fingerprint(parent, 0, parent.duration)
+        else:
+            return None
+        if parent_fingerprint is None:
+            return None
+        return node + (
+            "effect",
+            type(effect).__name__,
+            params,
+            value_fingerprint(parent.duration),
+            span,
+            parent_fingerprint,
+        )
+
+    if clip.sections is not None:
+        sections = []
+        for section, section_start, section_end in zip(
+            clip.sections, clip.timings[:-1], clip.timings[1:]
+        ):
+            if (section_end <= start_time) or (section_start >= end_time):
+                continue
+            section_fingerprint = video_fingerprint(
+                section,
+                max(start_time, section_start) - section_start,
+                min(end_time, section_end) - section_start,
+            )
+            if section_fingerprint is None:
+                return None
+            sections.append(
+                (round(float(section_start - start_time), 6), section_fingerprint)
+            )
+        if (len(sections) == 1) and (sections[0][0] <= 0):
+            # the frames are the ones of a single section
+            return sections[0][1]
+        return node + ("sections", tuple(sections))
+
+    if isinstance(clip, CompositeVideoClip):
+        return composition_fingerprint(clip, start_time, end_time, node)
+
+    if isinstance(clip, ImageClip) and (clip.frame_function(0) is clip.img):
+        return node + ("image", value_fingerprint(clip.img))
+
+    return None
+
+
+def layer_fingerprint(clip, start_time, end_time):
+    """Returns the fingerprint of the frames and mask of a clip composed with
+    others between the times ``start_time`` and ``end_time`` (in the clip), or
+    None if they can't be identified.
+    """
+    frames = video_fingerprint(clip, start_time, end_time)
+    mask = "no mask"
+    if clip.mask is not None:
+        mask = video_fingerprint(clip.mask, start_time, end_time)
+    if (frames is None) or (mask is None):
+        return None
+    return (frames, mask)
+
+
+def composition_fingerprint(clip, start_time, end_time, node):
+    """Returns the fingerprint of the frames of a ``CompositeVideoClip``, made
+    of the fingerprints of its background and of the parts of its clips played
+    between the times ``start_time`` and ``end_time``.
+    """
+    if type(clip) is ClipsArray:
+        frame_function = ClipsArray.frame_function
+    else:
+        frame_function = CompositeVideoClip.frame_function
+    if (type(clip).frame_function is not frame_function) or (
+        "frame_function" in clip.__dict__
+    ):
+        return None
+
+    if clip.created_bg:
+        background = ("color", value_fingerprint(clip.bg_color))
+    else:
+        background = layer_fingerprint(
+            clip.bg, start_time - clip.bg.start, end_time - clip.bg.start
+        )
+        if background is None:
+            return None
+
+    # rectangles outside of which the clips are not drawn
+    regions = {
+        id(layer): value_fingerprint(layer.composition_bounds(0))
+        for layer in clip._flat_clips
+        if layer.composition_bounds is not None
+    }
+    if isinstance(clip, ClipsArray):
+        node += ("transparent", clip.transparent)
+        for layer, region, _ in clip.cells:
+            regions[id(layer)] = tuple((rows.start, rows.stop) for rows in region)
+
+    layers = []
+    for layer in clip._flat_clips:
+        layer_end = end_time if layer.end is None else min(layer.end, end_time)
+        if layer_end <= max(layer.start, start_time):
+            continue
+        if layer.constant_pos is None:
+            return None
+
+        fingerprint = layer_fingerprint(
+            layer, max(start_time, layer.start) - layer.start, layer_end - layer.start
+        )
+        if fingerprint is None:
+            return None
+        position = compute_position(
+            layer.size, clip.size, layer.constant_pos, layer.relative_pos
+        )
+        layers.append(
+            (
+                round(float(layer.start - start_time), 6),
+                value_fingerprint(position),
+                regions.get(id(layer), "no region"),
+                fingerprint,
+            )
+        )
+    return node + ("composition", background, tuple(layers))
+
+
+def ffmpeg_write_video_cached(
+    clip,
+    filename,
+    fps,
+    render_cache,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audiofile=None,
+    audio_codec=None,
+    threads=None,
+    ffmpeg_params=None,
+    pixel_format=None,
+    queue_size=None,
+    logger="bar",
+):
+    """Writes the clip to a video file joining, without re-encoding them,
+    segments of a keyframes interval (250 frames unless set with ``-g`` in
+    ``ffmpeg_params``) stored in the directory ``render_cache``. The segments
+    are named after the fingerprints of their part of the clip (see
+    ``video_fingerprint``) and of the encoding parameters, and only the ones
+    which are not in the directory yet are rendered and stored. The audio
+    file, if any, is muxed once.
+
+    The fingerprints only depend on the frames of the segments, not on their
+    times in the clip, so that the segments are still found after inserting or
+    removing whole segments earlier in the clip.
+
+    Returns False, without writing the video file, if the frames of the clip
+    can't be fingerprinted. The segments are written without mask:
+    ``ffmpeg_write_video`` doesn't use the cache for the clips whose mask is
+    written in the video, with a codec which can store transparency.
+
+    See ``ffmpeg_write_video`` for the other parameters.
+    """
+    logger = proglog.default_bar_logger(logger)
+    interval = keyframes_interval(ffmpeg_params)
+    ffmpeg_params = list(ffmpeg_params or [])
+    if "-g" not in ffmpeg_params:
+        ffmpeg_params.extend(["-g", str(interval)])
+    writer_params = dict(
+        codec=codec,
+        preset=preset,
+        bitrate=bitrate,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params,
+        pixel_format=pixel_format,
+        queue_size=queue_size,
+    )
+
+    n_frames = int(clip.duration * fps)
+    frame_ranges = [
+        (first, min(first + interval, n_frames))
+        for first in range(0, n_frames, interval)
+    ]
+    segments = []
+    for first, end in frame_ranges:
+        fingerprint = video_fingerprint(clip, first / fps, end / fps)
+        if fingerprint is None:
+            return False
+        # the same frames give the same segment wherever they are in the clip
+        key = repr(
+            (fingerprint, float(fps), end - first, sorted(writer_params.items()))
+        )
+        # Matroska files, like the pieces of ``ffmpeg_write_video_smart``
+        segments.append(
+            os.path.join(
+                render_cache, hashlib.sha256(key.encode()).hexdigest() + ".mkv"
+            )
+        )
+
+    os.makedirs(render_cache, exist_ok=True)
+    missing = [
+        (segment, frame_range)
+        for segment, frame_range in zip(segments, frame_ranges)
+        if not os.path.exists(segment)
+    ]
+    logger(
+        message="MoviePy - Rendering %d of the %d segments, the others are cached"
+        % (len(missing), len(segments))
+    )
+
+    for segment, frame_range in logger.iter_bar(segment=missing):
+        # written aside, so that interrupted renders leave no segment
+        with tempfile.TemporaryDirectory(dir=render_cache) as segment_dir:
+            segment_file = os.path.join(segment_dir, os.path.basename(segment))
+            write_segment(segment_file, frame_range, fps, writer_params, clip=clip)
+            os.replace(segment_file, segment)
+
+    ffmpeg_concat_video_files(
+        segments,
+        filename,
+        audiofile=audiofile,
+        audio_codec=audio_codec or "copy",
+        logger=None,
+    )
+    return True
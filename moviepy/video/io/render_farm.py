@@ -0,0 +1,503 @@
+"""Rendering of the segments of a video by workers on several hosts with access
+to the same media files, over TCP: a coordinator splits the timeline of a clip
+in segments, sends the description of the clip (see ``describe_clip``) to each
+worker once, then the segments to render, and joins the encoded segments they
+send back.
+
+Start a worker on each host with::
+
+    python -m moviepy.video.io.render_farm --host 0.0.0.0 --port 5700
+
+The messages can only hold numbers, strings, containers and numpy arrays, the
+other pickled objects are refused. The workers still render any clip they are
+sent, so they should only be reachable from trusted hosts.
+"""
+
+import argparse
+import io
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+import traceback
+from collections import deque
+
+import proglog
+
+from moviepy.video.io.clip_graph import build_clip, describe_clip
+from moviepy.video.io.ffmpeg_tools import ffmpeg_concat_video_files
+from moviepy.video.io.ffmpeg_writer import (
+    keyframes_interval,
+    segments_frame_ranges,
+    write_segment,
+)
+
+
+# Objects which can be unpickled from the messages, besides the builtin values
+MESSAGE_CLASSES = {
+    ("numpy", "dtype"),
+    ("numpy", "ndarray"),
+    ("numpy.core.multiarray", "_reconstruct"),
+    ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy.core.multiarray", "scalar"),
+    ("numpy._core.multiarray", "scalar"),
+    ("numpy.core.numeric", "_frombuffer"),
+    ("numpy._core.numeric", "_frombuffer"),
+}
+
+
+class MessageUnpickler(pickle.Unpickler):
+    """Unpickler of the messages of the render farm, which only makes numpy
+    arrays and numbers besides the builtin values.
+    """
+
+    def find_class(self, module, name):
+        """Returns the class ``name`` of ``module``, or raises an
+        UnpicklingError if it is not one of the ``MESSAGE_CLASSES``.
+        """
+        if (module, name) not in MESSAGE_CLASSES:
+            raise pickle.UnpicklingError("Forbidden object %s.%s" % (module, name))
+        return super().find_class(module, name)
+
+
+def send_message(connection, message):
+    """Sends ``message`` to the socket ``connection``, pickled and prefixed
+    with its length.
+    """
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    connection.sendall(struct.pack("!Q", len(data)) + data)
+
+
+def receive_bytes(connection, size):
+    """Returns the next ``size`` bytes received by the socket ``connection``,
+    or raises a ConnectionError if it is closed before.
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise ConnectionError("The connection was closed.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def receive_message(connection):
+    """Returns the next message sent with ``send_message`` to the socket
+    ``connection``.
+    """
+    (size,) = struct.unpack("!Q", receive_bytes(connection, 8))
+    return MessageUnpickler(io.BytesIO(receive_bytes(connection, size))).load()
+
+
+def worker_name(address):
+    """Returns the name ``"host:port"`` of the worker at ``address``."""
+    return "%s:%d" % tuple(address)
+
+
+class RenderWorkerHandler(socketserver.BaseRequestHandler):
+    """Renders the segments asked by a coordinator on a connection, until it
+    closes it. The first message of the connection is the description of the
+    clip, the next ones are the jobs.
+    """
+
+    def handle(self):
+        """Receives the description of the clip, then renders the jobs and
+        sends their replies until the coordinator closes the connection.
+        """
+        try:
+            description = receive_message(self.request)
+            while True:
+                job = receive_message(self.request)
+                send_message(self.request, self.server.render(job, description))
+        except ConnectionError:
+            return
+        finally:
+            self.server.close_clip()
+
+
+class RenderWorker(socketserver.TCPServer):
+    """Worker of a render farm, rendering the segments of videos sent by
+    coordinators (see ``ffmpeg_write_video_farm``) with ``write_segment``, one
+    at a time. The clip of a connection is built from its description with the
+    first segment, and kept for the next ones until the connection is closed.
+
+    Parameters
+    ----------
+
+    host : str, optional
+      Address on which the worker listens, default to ``"127.0.0.1"`` (only
+      reachable from the same host). Use ``"0.0.0.0"`` for every interface.
+
+    port : int, optional
+      Port on which the worker listens, default to 0 for a free port, see
+      ``address``.
+
+    Attributes
+    ----------
+
+    address : tuple
+      The ``(host, port)`` on which the worker listens.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        with RenderWorker("0.0.0.0", 5700) as worker:
+            worker.serve_forever()
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), RenderWorkerHandler)
+        self.address = self.server_address[:2]
+        # clip of the connection, with its description
+        self.built_clip = (None, None)
+
+    def clip(self, description):
+        """Returns the clip of ``description``, built again only if it is not
+        the description of the last clip.
+        """
+        if self.built_clip[0] is not description:
+            self.close_clip()
+            self.built_clip = (description, build_clip(description))
+        return self.built_clip[1]
+
+    def close_clip(self):
+        """Closes the clip of the connection, and its media files."""
+        clip = self.built_clip[1]
+        self.built_clip = (None, None)
+        if clip is not None:
+            clip.close()
+
+    def render(self, job, description):
+        """Renders the segment of a job of the clip of ``description``. The job
+        is a dictionary with the ``frame_range`` of the segment, the ``fps``,
+        the ``writer_params`` of ``write_segment`` and the ``extension`` of the
+        segment file. Returns a dictionary with the bytes of the segment file
+        (``"data"``), the number of frames rendered and the time it took in
+        seconds, or with the ``"error"`` which prevented it.
+        """
+        try:
+            start = time.perf_counter()
+            clip = self.clip(description)
+            with tempfile.TemporaryDirectory() as segment_dir:
+                segment = os.path.join(segment_dir, "segment" + job["extension"])
+                n_frames = write_segment(
+                    segment,
+                    job["frame_range"],
+                    job["fps"],
+                    job["writer_params"],
+                    clip=clip,
+                )
+                with open(segment, "rb") as file:
+                    data = file.read()
+            return {
+                "data": data,
+                "frames": n_frames,
+                "seconds": time.perf_counter() - start,
+            }
+        except Exception:
+            return {"error": traceback.format_exc()}
+
+    def server_close(self):
+        """Closes the socket of the worker, and the clip it was rendering."""
+        super().server_close()
+        self.close_clip()
+
+
+class RenderCoordinator:
+    """Dispatches the segments of a video to the workers of a render farm,
+    each one from its own thread, until they are all rendered. See
+    ``ffmpeg_write_video_farm``.
+    """
+
+    def __init__(self, workers, retries=2, timeout=None):
+        self.workers = [tuple(address) for address in workers]
+        self.retries = retries
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        # jobs to render, as (index, job, addresses of the workers it failed on)
+        self.pending = deque()
+        self.remaining = 0
+        self.workers_left = set()
+        self.error = None
+        self.stats = {
+            worker_name(address): {
+                "segments": 0,
+                "frames": 0,
+                "seconds": 0.0,
+                "fps": 0.0,
+                "failures": 0,
+            }
+            for address in self.workers
+        }
+
+    def render(self, description, jobs, segments, logger):
+        """Renders the jobs (see ``RenderWorker.render``) of the clip of
+        ``description`` with the workers, and writes the segment of each job in
+        the file of the same index in the list ``segments``.
+        """
+        self.description = description
+        self.pending.extend((index, job, ()) for index, job in enumerate(jobs))
+        self.remaining, self.workers_left = len(jobs), set(self.workers)
+        self.segments, self.logger = segments, logger
+        threads = [
+            threading.Thread(target=self.dispatch, args=(address,), daemon=True)
+            for address in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+        with self.condition:
+            while (self.remaining > 0) and (self.error is None):
+                self.condition.wait()
+        for thread in threads:
+            thread.join()
+        if self.error is not None:
+            raise IOError(self.error)
+
+    def next_job(self, address):
+        """Returns the next job for the worker at ``address``, waiting for one
+        to fail if none is left but some are being rendered, or None when there
+        is no more. The jobs which failed on the worker are only given to it
+        again if they failed on all the other workers left.
+        """
+        with self.condition:
+            while (self.remaining > 0) and (self.error is None):
+                for item in self.pending:
+                    failed_on = item[2]
+                    if (address not in failed_on) or self.workers_left.issubset(
+                        failed_on
+                    ):
+                        self.pending.remove(item)
+                        return item
+                self.condition.wait()
+            return None
+
+    def failed(self, address, index, job, failed_on, error):
+        """Gives the job back to the workers after a failure on the worker at
+        ``address``, or stops the render if it failed too many times.
+        """
+        self.logger(
+            message="MoviePy - Worker %s:%d failed to render segment %d: %s"
+            % (address + (index, error.strip().splitlines()[-1]))
+        )
+        with self.condition:
+            self.stats[worker_name(address)]["failures"] += 1
+            failed_on = failed_on + (address,)
+            if len(failed_on) > self.retries:
+                self.error = "The segment %d failed %d times, last on %s:%d: %s" % (
+                    (index, len(failed_on)) + address + (error,)
+                )
+            else:
+                self.pending.append((index, job, failed_on))
+            self.condition.notify_all()
+
+    def dispatch(self, address):
+        """Sends the jobs to the worker at ``address`` one after the other, and
+        writes the segments it renders, until there is no job left or the
+        connection fails.
+        """
+        try:
+            connection = socket.create_connection(address, timeout=self.timeout)
+            send_message(connection, self.description)
+        except OSError as error:
+            self.stop_worker(address, "can't connect: %s" % error)
+            return
+
+        with connection:
+            while True:
+                item = self.next_job(address)
+                if item is None:
+                    return
+                index, job, failed_on = item
+                try:
+                    send_message(connection, job)
+                    reply = receive_message(connection)
+                except (OSError, pickle.UnpicklingError) as error:
+                    self.failed(address, index, job, failed_on, repr(error))
+                    self.stop_worker(address, "lost the connection")
+                    return
+                if "error" in reply:
+                    self.failed(address, index, job, failed_on, reply["error"])
+                    continue
+
+                with open(self.segments[index], "wb") as file:
+                    file.write(reply["data"])
+                with self.condition:
+                    stats = self.stats[worker_name(address)]
+                    stats["segments"] += 1
+                    stats["frames"] += reply["frames"]
+                    stats["seconds"] += reply["seconds"]
+                    if stats["seconds"] > 0:
+                        stats["fps"] = stats["frames"] / stats["seconds"]
+                    self.remaining -= 1
+                    self.condition.notify_all()
+
+    def stop_worker(self, address, reason):
+        """Stops sending jobs to a worker, and stops the render if it was the
+        last one.
+        """
+        self.logger(
+            message="MoviePy - Worker %s:%d stopped: %s" % (address + (reason,))
+        )
+        with self.condition:
+            self.workers_left.discard(address)
+            if not self.workers_left and (self.remaining > 0) and (self.error is None):
+                self.error = "No worker is left to render the segments."
+            self.condition.notify_all()
+
+
+def ffmpeg_write_video_farm(
+    clip,
+    filename,
+    fps,
+    workers,
+    segments=None,
+    retries=2,
+    timeout=None,
+    codec="libx264",
+    bitrate=None,
+    preset="medium",
+    audiofile=None,
+    audio_codec=None,
+    threads=None,
+    ffmpeg_params=None,
+    with_mask=False,
+    pixel_format=None,
+    logger="bar",
+    description=None,
+):
+    """Writes the clip to a video file by sending its segments to be rendered
+    and encoded by the workers of a render farm (see ``RenderWorker``), which
+    must have access to the media files of the clip at the same paths. The
+    segments are then joined without re-encoding, and the audio file, if any,
+    is muxed once.
+
+    The clip is sent to each worker once, as its description (see
+    ``describe_clip``), so it raises a ValueError if the clip can't be
+    described, like clips whose frames are computed by Python functions.
+
+    Each worker renders one segment at a time. A segment which fails, because
+    of an error of the worker or of the connection to it, is sent again to the
+    next worker available, and the workers whose connection fails are not sent
+    segments anymore. Raises an IOError if a segment fails more than
+    ``retries`` times, or if no worker is left.
+
+    Parameters
+    ----------
+
+    workers : list
+      Addresses ``(host, port)`` of the workers.
+
+    segments : int, optional
+      Number of segments of the video, each one starting on a keyframe (every
+      250 frames unless set with ``-g`` in ``ffmpeg_params``), so short clips
+      have fewer segments. Default to 4 segments per worker, so that the
+      fastest workers render more segments.
+
+    retries : int, optional
+      Number of times a segment is sent again after a failure.
+
+    timeout : float, optional
+      Time in seconds after which a worker which doesn't answer is considered
+      failed. Must be longer than the time it takes to render a segment.
+      Default to None (no timeout).
+
+    description : dict, optional
+      The description of the clip, if it is already made.
+
+    See ``ffmpeg_write_video`` for the other parameters.
+
+    Returns
+    -------
+
+    The statistics of each worker, a dictionary of dictionaries by
+    ``"host:port"``, with the number of ``"segments"`` and ``"frames"`` it
+    rendered, the ``"seconds"`` it took, its throughput in frames per second
+    (``"fps"``), and its number of ``"failures"``.
+    """
+    logger = proglog.default_bar_logger(logger)
+    if description is None:
+        description = describe_clip(clip)
+
+    ffmpeg_params = list(ffmpeg_params or [])
+    interval = keyframes_interval(ffmpeg_params)
+    if "-g" not in ffmpeg_params:
+        ffmpeg_params.extend(["-g", str(interval)])
+    writer_params = dict(
+        codec=codec,
+        preset=preset,
+        bitrate=bitrate,
+        with_mask=with_mask,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params,
+        pixel_format=pixel_format,
+    )
+    frame_ranges = segments_frame_ranges(
+        int(clip.duration * fps), segments or 4 * len(workers), interval
+    )
+    ext = os.path.splitext(filename)[1]
+    jobs = [
+        {
+            "frame_range": frame_range,
+            "fps": fps,
+            "writer_params": writer_params,
+            "extension": ext,
+        }
+        for frame_range in frame_ranges
+    ]
+
+    logger(
+        message="MoviePy - Rendering %d segments with %d workers"
+        % (len(jobs), len(workers))
+    )
+    coordinator = RenderCoordinator(workers, retries=retries, timeout=timeout)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.TemporaryDirectory(dir=directory) as segments_dir:
+        segment_files = [
+            os.path.join(segments_dir, "segment%05d%s" % (index, ext))
+            for index in range(len(jobs))
+        ]
+        coordinator.render(description, jobs, segment_files, logger)
+        ffmpeg_concat_video_files(
+            segment_files,
+            filename,
+            audiofile=audiofile,
+            audio_codec=audio_codec or "copy",
+            logger=None,
+        )
+
+    for address, stats in coordinator.stats.items():
+        logger(
+            message="MoviePy - Worker %s rendered %d frames in %d segments "
+            "(%.1f frames per second), %d failures"
+            % (
+                address,
+                stats["frames"],
+                stats["segments"],
+                stats["fps"],
+                stats["failures"],
+            )
+        )
+    return coordinator.stats
+
+
+def main():
+    """Runs a render farm worker, with the address given in the command line."""
+    parser = argparse.ArgumentParser(description="MoviePy render farm worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5700)
+    args = parser.parse_args()
+    with RenderWorker(args.host, args.port) as worker:
+        print("MoviePy - Render farm worker listening on %s:%d" % worker.address)
+        worker.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Lookup tables of the pointwise color transformations of RGB frames, which can
+be fused so that chains of color effects transform the frames at once.
+"""
+
+import numpy as np
+
+
+def is_rgb_frame(frame):
+    """Returns whether ``frame`` is a RGB frame (or a stack of RGB frames) with
+    8 bits per channel, which can be transformed by a ``ColorTable``.
+    """
+    return (
+        isinstance(frame, np.ndarray)
+        and (frame.dtype == np.uint8)
+        and (frame.ndim >= 3)
+        and (frame.shape[-1] == 3)
+    )
+
+
+class ColorTable:
+    """Pointwise transformation of the colors of RGB frames with 8 bits per
+    channel, as an optional matrix mixing the channels followed by a lookup
+    table of 256 values per channel.
+
+    Consecutive color tables are fused in a single one with ``then`` when the
+    second has no matrix, so that a chain of color effects costs a single
+    table lookup per value of the frames, without conversion to floats.
+
+    Parameters
+    ----------
+
+    lut : np.ndarray
+      Array of shape (256, 3) where ``lut[v, c]`` is the new value of the
+      channel ``c`` of value ``v``, or of shape (256,) for a table shared by
+      the channels.
+
+    matrix : np.ndarray, optional
+      Array of shape (3, 3) where ``matrix[c]`` are the weights of the red,
+      green and blue values in the channel ``c``, applied before the table.
+      The mixed values are clipped to [0, 255] and truncated.
+    """
+
+    def __init__(self, lut, matrix=None):
+        lut = np.asarray(lut)
+        if lut.ndim == 1:
+            lut = np.repeat(lut[:, None], 3, axis=1)
+        self.lut = lut.astype("uint8")
+        self.matrix = None if matrix is None else np.asarray(matrix, dtype=float)
+
+    @classmethod
+    def from_function(cls, image_func):
+        """Returns the table of ``image_func``, a function transforming RGB
+        frames with 8 bits per channel value by value, each channel
+        independently of the others.
+        """
+        values = np.repeat(np.arange(256, dtype="uint8")[:, None, None], 3, axis=2)
+        return cls(np.asarray(image_func(values)).astype("uint8").reshape(256, 3))
+
+    def is_identity(self):
+        """Returns whether the table leaves the frames unchanged."""
+        return (self.matrix is None) and np.array_equal(
+            self.lut, np.repeat(np.arange(256)[:, None], 3, axis=1)
+        )
+
+    def then(self, other):
+        """Returns the table transforming the colors like this table followed
+        by the table ``other``, or None if they can't be fused, when ``other``
+        mixes the channels of the values transformed by this table.
+        """
+        if other.matrix is None:
+            return ColorTable(
+                np.take_along_axis(other.lut, self.lut.astype(np.intp), axis=0),
+                self.matrix,
+            )
+        if self.is_identity():
+            return other
+        return None
+
+    def apply(self, frame):
+        """Returns the frame, or stack of frames, with its colors transformed.
+        ``frame`` must be a RGB frame with 8 bits per channel (see
+        ``is_rgb_frame``).
+        """
+        if self.matrix is None:
+            return self.lookup(frame)
+
+        if (self.matrix == self.matrix[0]).all():
+            # the channels get the same values, like with shades of gray
+            weights = [self.matrix[0]]
+        else:
+            weights = self.matrix
+        mixed = np.stack(
+            [
+                red * frame[..., 0] + green * frame[..., 1] + blue * frame[..., 2]
+                for red, green, blue in weights
+            ],
+            axis=-1,
+        )
+        np.clip(mixed, 0, 255, out=mixed)
+        return self.lookup(mixed.astype("uint8"))
+
+    def lookup(self, values):
+        """Returns the values of the table for ``values``, an array of shape
+        (..., 3) of the values of each channel, or (..., 1) of values shared by
+        the channels.
+        """
+        result = np.empty(values.shape[:-1] + (3,), dtype="uint8")
+        for channel in range(3):
+            np.take(
+                self.lut[:, channel],
+                values[..., min(channel, values.shape[-1] - 1)],
+                out=result[..., channel],
+                mode="wrap",  # the values are valid, no need to check them
+            )
+        return result
+
+
+def fuse_color_tables(tables):
+    """Returns the shortest list of tables transforming the colors like the
+    tables of the list ``tables`` applied one after the other, where None is a
+    table leaving the colors unchanged.
+    """
+    fused = []
+    for table in tables:
+        if table is None:
+            continue
+        if fused:
+            table_then = fused[-1].then(table)
+            if table_then is not None:
+                fused[-1] = table_then
+                continue
+        fused.append(table)
+    return fused
@@ -0,0 +1,398 @@
+"""Optimization of the graphs of clips, rewriting the chains of operations which
+made a clip (see ``Clip.operation``) into equivalent chains with fewer steps per
+frame.
+"""
+
+import bisect
+
+from moviepy.audio.fx.MultiplyVolume import MultiplyVolume
+from moviepy.video.compositing.CompositeVideoClip import ClipsArray, CompositeVideoClip
+from moviepy.video.fx.Crop import Crop
+from moviepy.video.fx.MultiplySpeed import MultiplySpeed
+from moviepy.video.fx.Resize import Resize
+from moviepy.video.fx.Rotate import Rotate
+
+
+def optimize(clip, resample=False):
+    """Returns a clip playing the same frames as ``clip`` with fewer Python
+    functions per frame, and the list of the changes made, as sentences.
+
+    The graph of clips which made the clip (see ``Clip.operation``,
+    ``VideoClip.sections`` and the layers of ``CompositeVideoClip``), and of
+    their masks and sounds, is rewritten with these rules:
+
+    - The effects leaving the frames unchanged, like ``Rotate(0)``,
+      ``MultiplyVolume(1)``, ``MultiplySpeed(1)`` or ``subclipped(0)``, are
+      dropped.
+    - Chains of ``subclipped`` and ``MultiplySpeed`` are collapsed in a single
+      change of time.
+    - The sections of a concatenation which are parts of a clip, like the ones
+      of ``with_effects_on_subclip``, get their frames from this clip directly.
+
+    And, with ``resample=True``:
+
+    - Consecutive ``Resize`` with constant sizes are merged in a single one.
+    - ``Crop`` after a ``Resize`` is done before it, on fewer pixels, when the
+      cropped rectangle has integer coordinates in the clip before resizing.
+
+    These give frames resampled once instead of several times, which may
+    differ slightly, while the other rules give the same frames. The clips,
+    positions, masks and sounds of the graph are otherwise unchanged, only the
+    functions computing the frames are.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        clip = VideoFileClip("video.mp4").subclipped(10, 20).subclipped(2, 4)
+        clip, changes = optimize(clip)
+        print(changes)  # ['collapsed 2 time changes (subclipped, subclipped)']
+    """
+    optimizer = ClipOptimizer(resample=resample)
+    return optimizer.optimize(clip), optimizer.changes
+
+
+def constant_resize(clip):
+    """Returns whether ``clip`` was made with a ``Resize`` to a constant size."""
+    if (clip.operation is None) or (clip.operation[0] != "effect"):
+        return False
+    effect = clip.operation[2]
+    return isinstance(effect, Resize) and not any(
+        callable(value) for value in (effect.new_size, effect.height, effect.width)
+    )
+
+
+def identity_name(clip):
+    """Returns the name of the operation which made ``clip``, if it leaves the
+    frames of its clip unchanged, else None.
+    """
+    if clip.operation is None:
+        return None
+    kind, parent, *args = clip.operation
+    if kind == "subclipped":
+        return "subclipped" if args[0] == 0 else None
+
+    effect = args[0]
+    if isinstance(effect, MultiplySpeed):
+        identity = effect.factor == 1
+    elif isinstance(effect, MultiplyVolume):
+        identity = (
+            (effect.factor == 1)
+            and (effect.start_time is None)
+            and (effect.end_time is None)
+        )
+    elif isinstance(effect, Rotate):
+        angle = effect.angle
+        identity = (
+            not callable(angle)
+            and (angle % 360 == 0)
+            and effect.expand
+            and not (effect.center or effect.translate or effect.bg_color)
+        )
+    elif isinstance(effect, Resize):
+        # the frames of masks are rounded to 8 bits when resized
+        identity = (
+            constant_resize(clip)
+            and (tuple(clip.size) == tuple(parent.size))
+            and not clip.is_mask
+        )
+    elif isinstance(effect, Crop):
+        rectangle = tuple(
+            int(value) for value in (effect.x1, effect.y1, effect.x2, effect.y2)
+        )
+        identity = rectangle == (0, 0) + tuple(parent.size)
+    else:
+        identity = False
+    return type(effect).__name__ if identity else None
+
+
+def time_change(clip):
+    """Returns the change of time of the operation which made ``clip``, as a
+    function returning the time of its clip for a time ``t`` of ``clip``, if it
+    is ``subclipped`` or ``MultiplySpeed``, else None.
+    """
+    if clip.operation is None:
+        return None
+    kind, parent, *args = clip.operation
+    if kind == "subclipped":
+        start_time = args[0]
+        return lambda t: t + start_time
+    if isinstance(args[0], MultiplySpeed):
+        factor = args[0].factor
+        return lambda t: factor * t
+    return None
+
+
+def apply_operation(clip, operation):
+    """Returns the clip made from ``clip`` with ``operation`` (see
+    ``Clip.operation``).
+    """
+    kind, _, *args = operation
+    if kind == "subclipped":
+        return clip.subclipped(args[0], args[1])
+    return clip.with_effects([args[0]])
+
+
+class ClipOptimizer:
+    """Rewrites graphs of clips, see ``optimize``.
+
+    Each clip of the graph is optimized once, so that the clips used several
+    times are still shared by the optimized graph. The clips are rewritten from
+    the final clip to the clips it was made from, so that each chain of
+    operations is rewritten at once.
+
+    Parameters
+    ----------
+
+    resample : bool, optional
+      Whether the rules changing how the frames are resampled are applied.
+
+    Attributes
+    ----------
+
+    changes : list
+      The changes made, as sentences.
+    """
+
+    def __init__(self, resample=False):
+        self.resample = resample
+        self.changes = []
+        # optimized clips by id of their clip, with their clip so that its id
+        # is not reused
+        self.optimized = {}
+
+    def optimize(self, clip):
+        """Returns the optimized version of ``clip`` and of its mask and
+        sound.
+        """
+        if id(clip) in self.optimized:
+            return self.optimized[id(clip)][1]
+
+        new_clip = self.optimize_frames(clip)
+        for attribute in ("mask", "audio"):
+            value = getattr(clip, attribute, None)
+            if value is None:
+                continue
+            new_value = self.optimize(value)
+            if new_value is not value:
+                if new_clip is clip:
+                    new_clip = clip.copy()
+                setattr(new_clip, attribute, new_value)
+
+        self.optimized[id(clip)] = (clip, new_clip)
+        return new_clip
+
+    def optimize_frames(self, clip):
+        """Returns ``clip``, or a copy of it computing the same frames with
+        fewer functions.
+        """
+        if clip.operation is not None:
+            return self.optimize_operation(clip)
+        if getattr(clip, "sections", None) is not None:
+            return self.optimize_sections(clip)
+        if getattr(type(clip), "frame_function", None) in (
+            CompositeVideoClip.frame_function,
+            ClipsArray.frame_function,
+        ) and ("frame_function" not in clip.__dict__):
+            return self.optimize_composition(clip)
+        return clip
+
+    def with_frames_of(self, clip, frames_clip):
+        """Returns a copy of ``clip`` computing its frames like
+        ``frames_clip``.
+        """
+        new_clip = clip.copy()
+        new_clip.frame_function = frames_clip.frame_function
+        new_clip.frames_function = frames_clip.frames_function
+        new_clip.operation = frames_clip.operation
+        if hasattr(clip, "color_tables"):
+            new_clip.color_tables = getattr(frames_clip, "color_tables", None)
+        return new_clip
+
+    def skip_identities(self, clip):
+        """Returns the first clip the frames of ``clip`` come from which is not
+        made with an operation leaving the frames unchanged, and the names of
+        these operations.
+        """
+        names = []
+        while identity_name(clip) is not None:
+            names.append(identity_name(clip))
+            clip = clip.operation[1]
+        return clip, names
+
+    def time_changes(self, clip):
+        """Returns the first clip the frames of ``clip`` come from which is not
+        made with a change of time, the changes of time from ``clip`` to this
+        clip, the names of their operations, and the names of the operations
+        leaving the frames unchanged between them.
+        """
+        time_funcs, names, identities = [], [], []
+        while True:
+            clip, skipped = self.skip_identities(clip)
+            identities.extend(skipped)
+            time_func = time_change(clip)
+            if time_func is None:
+                return clip, time_funcs, names, identities
+            time_funcs.append(time_func)
+            names.append(clip.operation[0])
+            if names[-1] == "effect":
+                names[-1] = type(clip.operation[2]).__name__
+            clip = clip.operation[1]
+
+    def resizes(self, clip):
+        """Returns the first clip the frames of ``clip`` come from which is not
+        made with a constant ``Resize`` or an operation leaving the frames
+        unchanged, and the number of resizings.
+        """
+        n_resizes = 0
+        while True:
+            clip, _ = self.skip_identities(clip)
+            if not constant_resize(clip):
+                return clip, n_resizes
+            n_resizes += 1
+            clip = clip.operation[1]
+
+    def optimize_operation(self, clip):
+        """Rewrites a clip made with ``subclipped`` or an effect, see
+        ``optimize``.
+        """
+        kind, parent, *args = clip.operation
+
+        base, names = self.skip_identities(clip)
+        if names:
+            self.changes.append("dropped the identity operations " + ", ".join(names))
+            return self.with_frames_of(clip, self.optimize(base))
+
+        base, time_funcs, names, identities = self.time_changes(clip)
+        if len(time_funcs) > 1:
+            if identities:
+                self.changes.append(
+                    "dropped the identity operations " + ", ".join(identities)
+                )
+            self.changes.append(
+                "collapsed %d time changes (%s)" % (len(time_funcs), ", ".join(names))
+            )
+            base = self.optimize(base)
+
+            def time_func(t):
+                for func in time_funcs:
+                    t = func(t)
+                return t
+
+            new_clip = clip.copy()
+            new_clip.frame_function = lambda t: base.get_frame(time_func(t))
+            new_clip.frames_function = (
+                lambda ts: base.get_frames([time_func(t) for t in ts]),
+                new_clip.frame_function,
+            )
+            if hasattr(clip, "color_tables"):
+                new_clip.color_tables = None
+            return new_clip
+
+        if self.resample and constant_resize(clip):
+            base, n_resizes = self.resizes(parent)
+            if n_resizes:
+                self.changes.append("merged %d resizings" % (n_resizes + 1))
+                resized = self.optimize(base).with_effects([Resize(tuple(clip.size))])
+                return self.with_frames_of(clip, resized)
+
+        if self.resample and (kind == "effect") and isinstance(args[0], Crop):
+            base, n_resizes = self.resizes(parent)
+            crop = self.crop_before_resize(clip, base)
+            if n_resizes and (crop is not None):
+                self.changes.append("moved a crop before %d resizings" % n_resizes)
+                resized = self.optimize(base).with_effects(
+                    [crop, Resize(tuple(clip.size))]
+                )
+                return self.with_frames_of(clip, resized)
+
+        new_parent = self.optimize(parent)
+        if new_parent is parent:
+            return clip
+        return self.with_frames_of(clip, apply_operation(new_parent, clip.operation))
+
+    def crop_before_resize(self, clip, base):
+        """Returns the ``Crop`` of ``base`` giving the region of its frames
+        which, resized, gives the frames of ``clip`` (a crop of resized frames
+        of ``base``), or None if it has no integer coordinates.
+        """
+        effect = clip.operation[2]
+        parent = clip.operation[1]
+        coordinates = []
+        for value, base_size, size in zip(
+            (effect.x1, effect.y1, effect.x2, effect.y2),
+            2 * tuple(base.size),
+            2 * tuple(parent.size),
+        ):
+            base_value, remainder = divmod(int(value) * base_size, size)
+            if remainder:
+                return None
+            coordinates.append(base_value)
+        x1, y1, x2, y2 = coordinates
+        return Crop(x1=x1, y1=y1, x2=x2, y2=y2)
+
+    def optimize_sections(self, clip):
+        """Rewrites a concatenation of clips played one after the other, whose
+        sections made with changes of time get their frames from the clips
+        these changes apply to.
+        """
+        starts = list(clip.timings[:-1])
+        getters, n_direct = [], 0
+        for section, start in zip(clip.sections, starts):
+            base, time_funcs, _, _ = self.time_changes(section)
+            if base is not section:
+                n_direct += 1
+            getters.append((self.optimize(base).get_frame, time_funcs, start))
+
+        sections = [self.optimize(section) for section in clip.sections]
+        if not n_direct and all(
+            new_section is section
+            for section, new_section in zip(clip.sections, sections)
+        ):
+            return clip
+        if n_direct:
+            self.changes.append(
+                "got the frames of %d sections of a concatenation from the clips "
+                "they were cut from" % n_direct
+            )
+
+        def frame_function(t):
+            index = max(0, bisect.bisect_right(starts, t) - 1)
+            get_frame, time_funcs, start = getters[index]
+            t = t - start
+            for func in time_funcs:
+                t = func(t)
+            return get_frame(t)
+
+        new_clip = clip.copy()
+        new_clip.frame_function = frame_function
+        new_clip.sections = sections
+        if hasattr(clip, "clips"):
+            new_clip.clips = sections
+        return new_clip
+
+    def optimize_composition(self, clip):
+        """Rewrites the layers (and background) of a ``CompositeVideoClip``."""
+        layers = [self.optimize(layer) for layer in clip.clips]
+        bg = clip.bg if clip.created_bg else self.optimize(clip.bg)
+        if (bg is clip.bg) and all(
+            new_layer is layer for layer, new_layer in zip(clip.clips, layers)
+        ):
+            return clip
+
+        new_clip = clip.copy()
+        new_clip.clips = layers
+        new_clip.bg = bg
+        if isinstance(clip, ClipsArray):
+            new_clip._flat_clips = layers
+            new_layers = {
+                id(layer): new_layer for layer, new_layer in zip(clip.clips, layers)
+            }
+            new_clip.cells = [
+                (new_layers.get(id(layer), layer), region, layer_region)
+                for layer, region, layer_region in clip.cells
+            ]
+        else:
+            new_clip._flat_clips = new_clip.flatten_clips(layers)
+        return new_clip
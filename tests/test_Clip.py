@@ -1,13 +1,15 @@
 """Clip tests."""
 
+import asyncio
 import copy
 
 import numpy as np
 
 import pytest
 
-from moviepy.Clip import Clip
-from moviepy.video.VideoClip import BitmapClip, ColorClip
+from moviepy.Clip import Clip, render_pass
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.VideoClip import BitmapClip, ColorClip, VideoClip
 
 
 def test_clip_equality():
@@ -255,5 +257,111 @@ def test_clip_memoize():
     assert isinstance(memoize_clip.get_frame(1), np.ndarray)
 
 
+def test_render_pass():
+    times = []
+
+    def frame_function(t):
+        times.append(t)
+        return np.full((4, 6, 3), 100 * t, dtype="uint8")
+
+    # the same clip as background and foreground, and as mask of the foreground
+    clip = VideoClip(frame_function, duration=1)
+    mask = clip.with_updated_frame_function(lambda t: clip.get_frame(t)[:, :, 0] / 255)
+    mask.is_mask = True
+    composition = CompositeVideoClip(
+        [clip, clip.with_position((1, 1)).with_mask(mask)], size=(8, 6)
+    )
+    expected = [composition.get_frame(t) for t in [0, 0.5, 0.9]]
+
+    times.clear()
+    with render_pass():
+        frames = [composition.get_frame(t) for t in [0, 0.5, 0.9]]
+    assert all(np.array_equal(*pair) for pair in zip(frames, expected))
+    # the shared frames are computed once, from the first frame where they
+    # were asked twice
+    assert times == [0, 0, 0.5, 0.9]
+
+    times.clear()
+    assert len(list(composition.iter_frames(fps=2))) == 2
+    assert times == [0, 0, 0.5]
+
+    # no render pass is left open in the thread of the caller between frames
+    iterator = composition.iter_frames(fps=2)
+    next(iterator)
+    times.clear()
+    composition.get_frame(0)
+    # the frames of the pass would have been reused
+    assert times == [0, 0, 0]
+    iterator.close()
+
+    # the frames iterated in coroutines are computed in a single render pass
+    async def iterate():
+        return [frame async for frame in composition.iter_frames_async(fps=2)]
+
+    times.clear()
+    assert len(asyncio.run(iterate())) == 2
+    assert times == [0, 0, 0.5]
+
+
+def test_frame_steps():
+    times = []
+
+    def frame_function(t):
+        times.append(t)
+        return np.full((2, 2, 3), t)
+
+    clip = VideoClip(frame_function, duration=10)
+
+    # longer chains than the recursion limit
+    new_clip = clip
+    for _ in range(1000):
+        new_clip = new_clip.image_transform(lambda frame: frame + 1)
+        new_clip = new_clip.time_transform(lambda t: t / 2, keep_duration=True)
+    assert new_clip.frame_steps[0] is clip
+    assert len(new_clip.frame_steps[1]) == 2000
+    times.clear()
+    assert new_clip.get_frame(3)[0, 0, 0] == 1000
+    assert times == [3 / 2**1000]
+
+    # and of the transformations of stacks of frames
+    batched_clip = clip
+    for _ in range(1000):
+        batched_clip = batched_clip.image_transform(
+            lambda frame: frame + 1, batched=True
+        )
+    assert np.array_equal(batched_clip.get_frames([1, 2])[:, 0, 0, 0], [1001, 1002])
+
+    # functions of the frames before them, and chains forking
+    shifted = clip.time_transform(lambda t: t + 1).image_transform(
+        lambda frame: 2 * frame
+    )
+    summed = shifted.transform(lambda get_frame, t: get_frame(t) + get_frame(t + 1))
+    reversed_clip = shifted.time_transform(lambda t: 5 - t)
+    assert summed.get_frame(1)[0, 0, 0] == 2 * 2 + 2 * 3
+    assert reversed_clip.get_frame(1)[0, 0, 0] == 2 * 5
+    assert summed.frame_steps[0] is reversed_clip.frame_steps[0] is clip
+
+    # the shared frames of the clips made by the steps are computed once in a
+    # render pass
+    doublings = []
+
+    def double(frame):
+        doublings.append(frame)
+        return 2 * frame
+
+    doubled = clip.image_transform(double)
+    increased = doubled.image_transform(lambda frame: frame + 1)
+    increased = increased.time_transform(lambda t: t, keep_duration=True)
+    doublings.clear()
+    with render_pass():
+        for t in [0, 1, 2]:
+            assert doubled.get_frame(t)[0, 0, 0] == increased.get_frame(t)[0, 0, 0] - 1
+    assert len(doublings) == 4
+
+    # frame functions replaced after the steps are not skipped
+    replaced = shifted.with_updated_frame_function(lambda t: np.zeros((2, 2, 3)))
+    assert replaced.image_transform(lambda frame: frame + 1).get_frame(0).max() == 1
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -1,5 +1,6 @@
 """VideoClip tests."""
 
+import asyncio
 import copy
 import os
 
@@ -9,7 +10,7 @@ from PIL import Image
 import pytest
 
 from moviepy import *
-from moviepy.tools import convert_to_seconds
+from moviepy.tools import convert_to_seconds, is_constant_frame
 
 
 def test_aspect_ratio():
@@ -106,6 +107,129 @@ def test_write_videofiles_with_temp_audiofile_path(util):
     assert any(file.startswith("temp_audiofile_path") for file in contents_of_temp_dir)
 
 
+@pytest.mark.skipif(os.name == "nt", reason="Piping audio requires pass_fds")
+def test_write_videofile_pipe_audio(util):
+    clip = VideoFileClip("media/big_buck_bunny_432_433.webm").subclipped(0.2, 0.5)
+    location = os.path.join(util.TMP_DIR, "pipe_audio.mp4")
+    temp_location = os.path.join(util.TMP_DIR, "pipe_audio")
+    if not os.path.exists(temp_location):
+        os.mkdir(temp_location)
+    clip.write_videofile(
+        location, temp_audiofile_path=temp_location, pipe_audio=True, logger=None
+    )
+    assert os.listdir(temp_location) == []  # no temporary audio file
+
+    with VideoFileClip(location) as result:
+        assert result.audio is not None
+        assert abs(result.audio.duration - clip.duration) < 0.05
+
+    # errors while computing the sound are raised
+    def frame_function(t):
+        if np.max(t) > 0.1:
+            raise ValueError("no sound")
+        return np.zeros((np.size(t), 2))
+
+    clip.audio = AudioClip(frame_function, duration=clip.duration)
+    with pytest.raises(ValueError, match="no sound"):
+        clip.write_videofile(location, pipe_audio=True, logger=None)
+
+
+def test_write_videofile_async(util):
+    clip = VideoFileClip("media/big_buck_bunny_432_433.webm").subclipped(0.2, 0.5)
+    location = os.path.join(util.TMP_DIR, "write_videofile_async.mp4")
+
+    async def write():
+        frames = [frame async for frame in clip.iter_frames_async(dtype="uint8")]
+        progress = [p async for p in clip.write_videofile_progress(location)]
+        return frames, progress
+
+    frames, progress = asyncio.run(write())
+    assert all(
+        np.array_equal(a, b) for a, b in zip(frames, clip.iter_frames(dtype="uint8"))
+    )
+    assert progress == [(i, 7) for i in range(1, 8)]
+    with VideoFileClip(location) as result:
+        assert result.reader.n_frames == 7
+        assert abs(result.audio.duration - clip.duration) < 0.05
+        assert np.abs(result.get_frame(0) - frames[0].astype(int)).mean() < 5
+
+    # the video is left unfinished when the task is cancelled
+    async def cancel():
+        long_clip = ColorClip((64, 32), (255, 0, 0), duration=1000).with_fps(10)
+        task = asyncio.ensure_future(long_clip.write_videofile_async(location))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+
+    # also while the sound is written, before the frames
+    async def cancel_audio():
+        long_clip = ColorClip((64, 32), (255, 0, 0), duration=10000).with_fps(10)
+        long_clip.audio = AudioClip(
+            lambda t: np.zeros((np.size(t), 2)), duration=10000, fps=44100
+        )
+        task = asyncio.ensure_future(
+            long_clip.write_videofile_async(location, temp_audiofile_path=util.TMP_DIR)
+        )
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_audio())
+    assert not [name for name in os.listdir(util.TMP_DIR) if "wvf_snd" in name]
+
+
+def test_write_videofiles(util):
+    clip = VideoFileClip("media/big_buck_bunny_432_433.webm").subclipped(0.2, 0.5)
+    temp_location = os.path.join(util.TMP_DIR, "write_videofiles")
+    if not os.path.exists(temp_location):
+        os.mkdir(temp_location)
+    locations = [
+        os.path.join(util.TMP_DIR, name)
+        for name in ("renditions_720.mp4", "renditions_180.mp4", "renditions.webm")
+    ]
+    clip.write_videofiles(
+        [
+            {"filename": locations[0], "height": 720},
+            {"filename": locations[1], "size": (320, 180), "preset": "fast"},
+            {"filename": locations[2]},
+        ],
+        temp_audiofile_path=temp_location,
+        logger=None,
+    )
+    assert os.listdir(temp_location) == []  # the temporary audio file is removed
+
+    for location, size in zip(locations, [(1280, 720), (320, 180), clip.size]):
+        with VideoFileClip(location) as result:
+            assert result.size == list(size)
+            assert result.reader.n_frames == round(clip.duration * clip.fps)
+            assert abs(result.audio.duration - clip.duration) < 0.05
+
+            expected = clip.with_effects([vfx.Resize(size)]).get_frame(0)
+            assert np.abs(result.get_frame(0) - expected.astype(int)).mean() < 5
+
+
+def test_write_videofiles_codecs(util):
+    """The codecs of the outputs are the ones of ``write_videofile``."""
+    clip = VideoFileClip("media/big_buck_bunny_432_433.webm").subclipped(0.2, 0.5)
+    location = os.path.join(util.TMP_DIR, "renditions_raw16.mkv")
+    clip.write_videofiles(
+        [{"filename": location, "codec": "libx264", "audio_codec": "raw16"}],
+        logger=None,
+    )
+    with VideoFileClip(location) as result:
+        assert abs(result.audio.duration - clip.duration) < 0.05
+
+    with pytest.raises(ValueError, match="couldn't find the codec"):
+        clip.write_videofiles(
+            [{"filename": os.path.join(util.TMP_DIR, "renditions.xyz")}],
+            logger=None,
+        )
+
+
 def test_write_videofiles_audio_codec_error(util, video):
     """Checks error cases return helpful messages."""
     clip = video()
@@ -435,6 +559,72 @@ def test_slice_speed():
     assert clip1 == target1
 
 
+def test_color_clip_constant_frames():
+    clip = ColorClip((1920, 1080), color=(255, 0, 0, 127.5), duration=1)
+    frame = clip.get_frame(0)
+    assert frame.shape == (1080, 1920, 3)
+    assert frame.base.nbytes == 3 * frame.itemsize
+    assert is_constant_frame(frame)
+    assert is_constant_frame(clip.mask.get_frame(0))
+    assert clip.mask.get_frame(0)[0, 0] == 0.5
+
+    # implicit opaque masks and opacity keep frames constant
+    opaque = ColorClip((1920, 1080), color=(0, 0, 255)).with_opacity(0.5)
+    assert is_constant_frame(opaque.mask.get_frame(0))
+    assert opaque.mask.get_frame(0)[0, 0] == 0.5
+
+    # pointwise effects too
+    inverted = clip.with_effects([vfx.InvertColors(), vfx.MultiplyColor(0.5)])
+    assert is_constant_frame(inverted.get_frame(0))
+    assert np.array_equal(inverted.get_frame(0)[100, 100], [0, 127, 127])
+
+
+@pytest.mark.parametrize(
+    "clip",
+    [
+        VideoClip(
+            lambda t: np.full((4, 6, 3), 100 * t, dtype="uint8"), duration=2
+        ).with_fps(10),
+        ColorClip((6, 4), color=(200, 100, 50), duration=2).with_fps(10),
+        ImageClip(np.arange(72, dtype="uint8").reshape((4, 6, 3)), duration=2),
+    ],
+)
+def test_get_frames(clip):
+    clip = clip.with_effects(
+        [
+            vfx.FadeIn(0.5),
+            vfx.FadeOut(0.5),
+            vfx.MultiplyColor(1.2),
+            vfx.GammaCorrection(0.8),
+            vfx.InvertColors(),
+            vfx.BlackAndWhite(),
+        ]
+    )
+    assert clip.frames_function is not None
+    times = np.arange(20) / 10
+    frames = clip.get_frames(times)
+    assert frames.shape == (20, 4, 6, 3)
+    assert np.array_equal(frames, np.stack([clip.get_frame(t) for t in times]))
+
+    batches = list(clip.iter_frames(fps=10, dtype="uint8", batch_size=6))
+    assert np.array_equal(batches, list(clip.iter_frames(fps=10, dtype="uint8")))
+
+    # effects without batched version compute the frames one by one
+    mirrored = clip.with_effects([vfx.MirrorX()])
+    assert mirrored.frames_function is None
+    assert np.array_equal(mirrored.get_frames(times), frames[:, :, ::-1])
+
+
+def test_get_frames_after_frame_function_is_replaced():
+    clip = ColorClip((6, 4), color=(200, 100, 50), duration=2).with_effects(
+        [vfx.InvertColors()]
+    )
+    # like the readers of ImageSequenceClip and VideoFileClip, which set the
+    # frame function of the clip directly
+    clip.frame_function = lambda t: np.full((4, 6, 3), 10, dtype="uint8")
+    assert np.array_equal(clip.get_frames([0, 1]), np.full((2, 4, 6, 3), 10))
+
+
 def test_mul():
     clip = VideoFileClip("media/fire2.mp4")
     new_clip = clip[0:1] * 2.5
@@ -2,12 +2,22 @@
 
 import copy
 import os
+import pickle
+import sys
+
+import numpy as np
 
 import pytest
 
-from moviepy.video.compositing.CompositeVideoClip import clips_array
+from moviepy import vfx
+from moviepy.video.compositing.CompositeVideoClip import (
+    CompositeVideoClip,
+    clips_array,
+    concatenate_videoclips,
+)
+from moviepy.video.io.clip_graph import ClipGraph, build_clip, describe_clip
 from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.video.VideoClip import ColorClip
+from moviepy.video.VideoClip import ColorClip, VideoClip
 
 
 def test_setup(util):
@@ -83,6 +93,25 @@ def test_videofileclip_safe_deepcopy(monkeypatch):
     assert copy.deepcopy(clip) == "foo"
 
 
+def test_videofileclip_source():
+    clip = VideoFileClip("media/chaplin.mp4")
+    assert clip.source == ("media/chaplin.mp4", 0)
+
+    subclip = clip.subclipped(1, 3).subclipped(0.5)
+    assert subclip.source == ("media/chaplin.mp4", 1.5)
+    assert subclip.with_duration(1).source == subclip.source
+
+    # the frames of the file are modified
+    assert subclip.resized(0.5).source is None
+    assert subclip.with_speed_scaled(2).subclipped(0.5).source is None
+
+    resized_clip = VideoFileClip("media/chaplin.mp4", target_resolution=(32, None))
+    assert resized_clip.source is None
+
+    resized_clip.close()
+    clip.close()
+
+
 def test_ffmpeg_transparency_mask(util):
     """Test VideoFileClip and FFMPEG reading of video with transparency."""
     video_file = "media/transparent.webm"
@@ -98,5 +127,64 @@ def test_ffmpeg_transparency_mask(util):
     video.close()
 
 
+def test_clip_graph():
+    video = VideoFileClip("media/big_buck_bunny_432_433.webm").subclipped(0.1, 0.6)
+    small = video.with_effects([vfx.Resize(0.5), vfx.FadeIn(0.2)])
+    title = ColorClip((50, 20), color=(200, 10, 10), duration=0.5).with_opacity(0.5)
+    composition = CompositeVideoClip(
+        [video, small.with_position(("center", 10)), title.with_start(0.1)],
+        use_bgclip=True,
+    )
+    clip = concatenate_videoclips([composition, video.with_effects([vfx.MirrorX()])])
+
+    graph = pickle.loads(pickle.dumps(ClipGraph(clip)))
+    nodes = graph.description["nodes"]
+    # the video is described once, with its sound
+    assert [node["type"] for node in nodes].count("VideoFileClip") == 1
+    assert nodes[graph.description["root"]]["type"] == "concatenation"
+
+    built_clip = graph.clip
+    assert built_clip.duration == clip.duration
+    for t in [0, 0.15, 0.3, 0.7, 0.9]:
+        assert np.array_equal(built_clip.get_frame(t), clip.get_frame(t))
+    times = np.linspace(0.5, 0.51, 50)
+    assert np.array_equal(
+        built_clip.audio.get_frame(times), clip.audio.get_frame(times)
+    )
+
+    # the mask and sound replacing the ones opened with the file are described
+    file_clip = video.operation[1]
+    mask = ColorClip(file_clip.size, 0.5, is_mask=True, duration=file_clip.duration)
+    masked = pickle.loads(pickle.dumps(ClipGraph(file_clip.with_mask(mask)))).clip
+    assert np.array_equal(masked.mask.get_frame(0.2), mask.get_frame(0.2))
+    muted = pickle.loads(pickle.dumps(ClipGraph(file_clip.without_audio()))).clip
+    assert muted.audio is None
+    with pytest.raises(ValueError, match="Python function"):
+        describe_clip(file_clip.with_mask(VideoClip(lambda t: mask.get_frame(t))))
+
+    with pytest.raises(ValueError, match="Python function"):
+        describe_clip(VideoClip(lambda t: video.get_frame(t), duration=1))
+    with pytest.raises(ValueError, match="function of time"):
+        describe_clip(video.with_position(lambda t: (t, 0)))
+    with pytest.raises(ValueError, match="effect parameter"):
+        describe_clip(video.with_effects([vfx.Resize(lambda t: 1 + t)]))
+
+    # only the modules of the effects of MoviePy are imported
+    description = describe_clip(ColorClip((4, 4), (1, 2, 3), duration=1))
+    root = description["root"]
+    node = dict(description["nodes"][root], type="effect", clip=root, params={})
+    description["nodes"].append(node)
+    description["root"] = len(description["nodes"]) - 1
+    node["effect"] = ("moviepy.video.fx.MirrorX", "MirrorX")
+    assert isinstance(build_clip(description).operation[2], vfx.MirrorX)
+    node["effect"] = ("this", "Effect")
+    with pytest.raises(ValueError, match="can't be found"):
+        build_clip(description)
+    assert "this" not in sys.modules
+    node["effect"] = ("moviepy.video.fx.MirrorX", "np")
+    with pytest.raises(ValueError, match="is not an effect"):
+        build_clip(description)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -1,5 +1,6 @@
 """Compositing tests for use with pytest."""
 
+import copy
 import os
 
 import numpy as np
@@ -7,6 +8,7 @@ import numpy as np
 import pytest
 
 from moviepy import *
+from moviepy.video.compositing.CompositeVideoClip import ClipsArray
 
 
 class ClipPixelTest:
@@ -63,6 +65,60 @@ def test_clips_array_duration(util):
     video.write_videofile(filename)
 
 
+def test_clips_array_cells():
+    red = ColorClip((20, 10), color=(255, 0, 0), duration=2)
+    green = ColorClip((10, 10), color=(0, 255, 0), duration=1)
+    blue = ColorClip((20, 20), color=(0, 0, 255), duration=2)
+
+    video = clips_array([[red, green], [blue, red]], bg_color=(9, 9, 9))
+    assert video.size == (40, 30)
+    assert video.duration == 2
+    assert video.mask is None
+
+    frame = video.get_frame(0.5)
+    assert np.array_equal(frame[5, 10], [255, 0, 0])
+    assert np.array_equal(frame[5, 30], [0, 255, 0])  # centered in its cell
+    assert np.array_equal(frame[5, 22], [9, 9, 9])
+    assert np.array_equal(frame[20, 30], [255, 0, 0])
+    assert np.array_equal(frame[28, 30], [9, 9, 9])
+    # green has ended, its cell is only background
+    assert np.array_equal(video.get_frame(1.5)[5, 30], [9, 9, 9])
+
+    # transparent padding
+    mask = clips_array([[red, green], [blue, red]]).mask.get_frame(0.5)
+    assert mask[5, 30] == 1 and mask[5, 22] == 0
+
+    # overlapping clips are still blitted over one another
+    overlapping = clips_array([[blue, red]], cols_heights=[10, 20], bg_color=(0, 0, 0))
+    assert not isinstance(overlapping, ClipsArray)
+    assert np.array_equal(overlapping.get_frame(0)[5, 15], [255, 0, 0])
+    assert np.array_equal(overlapping.get_frame(0)[15, 5], [0, 0, 255])
+
+
+def test_clips_array_masked_cells():
+    """The masked cells of a ``ClipsArray`` are blended exactly like the
+    clips blitted by ``CompositeVideoClip``.
+    """
+    rng = np.random.default_rng(0)
+    clips = []
+    for mask in (rng.random((40, 30)), np.full((40, 30), 0.5), np.full((40, 30), 0.3)):
+        frame = rng.integers(0, 256, (40, 30, 3)).astype("uint8")
+        clips.append(
+            ImageClip(frame, duration=1).with_mask(
+                ImageClip(mask, is_mask=True, duration=1)
+            )
+        )
+
+    video = clips_array([clips], bg_color=(30, 200, 90))
+    assert isinstance(video, ClipsArray)
+    composite = CompositeVideoClip(
+        [clip.with_position((30 * i, 0)) for i, clip in enumerate(clips)],
+        size=(90, 40),
+        bg_color=(30, 200, 90),
+    )
+    assert np.array_equal(video.get_frame(0), composite.get_frame(0))
+
+
 def test_concatenate_self(util):
     clip = BitmapClip([["AAA", "BBB"], ["CCC", "DDD"]], fps=1)
     target = BitmapClip([["AAA", "BBB"], ["CCC", "DDD"]], fps=1)
@@ -175,6 +231,67 @@ def test_compositing_with_transparency_colors(util):
     assert abs(opacity3 - 0.657) < 0.01
 
 
+def test_nested_composite_clips_are_flattened():
+    red = ColorClip((40, 40), color=(255, 0, 0), duration=2)
+    green = ColorClip((10, 10), color=(0, 255, 0), duration=1)
+    # red overflows the nested composition, which must crop it
+    nested = CompositeVideoClip(
+        [red.with_position((-20, 0)), green.with_position((5, 5)).with_start(0.5)],
+        size=(30, 30),
+    )
+    composite = CompositeVideoClip(
+        [
+            ColorClip((100, 100), color=(0, 0, 255), duration=2),
+            nested.with_position((50, 50)).with_start(0.5),
+        ]
+    )
+
+    assert len(composite.clips) == 2
+    assert len(composite._flat_clips) == 3
+    assert composite.duration == 2.5
+
+    frame = composite.get_frame(1.25)
+    assert np.array_equal(frame[52, 52], [255, 0, 0])
+    assert np.array_equal(frame[57, 57], [0, 255, 0])  # green started at 1s
+    assert np.array_equal(frame[55, 45], [0, 0, 255])  # red cropped on the left
+    assert np.array_equal(frame[85, 55], [0, 0, 255])  # not drawn below nested
+    assert np.array_equal(frame[70, 75], [0, 0, 255])  # transparent in nested
+
+    mask = composite.mask.get_frame(1.25)
+    assert mask.min() == 1
+
+    # the flattened clips keep the rectangle of the nested composition
+    assert np.array_equal(copy.deepcopy(composite).get_frame(1.25), frame)
+    deeper = CompositeVideoClip(
+        [composite.with_position((-50, -50))], size=(40, 40), bg_color=(0, 0, 0)
+    )
+    assert len(deeper._flat_clips) == 3
+    assert np.array_equal(deeper.get_frame(1.25), frame[50:90, 50:90])
+
+    # compositions with modified frames are blitted as a whole
+    modified = CompositeVideoClip([nested.with_opacity(0.5), nested.subclipped(0, 1)])
+    assert len(modified._flat_clips) == 2
+
+
+def test_composite_clip_threads():
+    rng = np.random.default_rng(0)
+    image = ImageClip(rng.integers(0, 255, (37, 53, 3)).astype("uint8"), duration=2)
+    mask = ImageClip(rng.random((37, 53)), is_mask=True, duration=2)
+    clips = [
+        image.with_mask(mask).with_position(lambda t: (int(10 * t) - 5, -3)),
+        ColorClip((30, 20), (200, 10, 10), duration=2).with_opacity(0.4),
+        image.with_position((40, 60)),
+    ]
+
+    composite = CompositeVideoClip(clips, size=(100, 90))
+    threaded = CompositeVideoClip(clips, size=(100, 90), threads=4)
+    assert threaded.mask.threads == 4
+
+    for t in [0, 0.5, 1.9]:
+        assert np.array_equal(composite.get_frame(t), threaded.get_frame(t))
+        assert np.array_equal(composite.mask.get_frame(t), threaded.mask.get_frame(t))
+
+
 def test_slide_in():
     duration = 0.1
     size = (10, 1)
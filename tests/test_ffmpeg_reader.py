@@ -1,17 +1,21 @@
 """FFmpeg reader tests meant to be run with pytest."""
 
+import asyncio
 import os
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
 import pytest
 
 from moviepy.audio.AudioClip import AudioClip
+from moviepy.audio.io.readers import FFMPEG_AudioReader
 from moviepy.config import FFMPEG_BINARY
 from moviepy.tools import ffmpeg_escape_filename
 from moviepy.video.compositing.CompositeVideoClip import clips_array
+from moviepy.video.io.ffmpeg_async import FFMPEG_AsyncVideoReader
 from moviepy.video.io.ffmpeg_reader import (
     FFMPEG_VideoReader,
     FFmpegInfosParser,
@@ -833,5 +837,58 @@ def test_frame_seek():
     assert not np.array_equal(frame, frame2)
 
 
+def test_ffmpeg_readers_threads():
+    reader = FFMPEG_VideoReader("media/big_buck_bunny_0_30.webm")
+    audio_reader = FFMPEG_AudioReader("media/big_buck_bunny_0_30.webm", 200000)
+    times = np.arange(0, 2, 1 / reader.fps)
+    frames = [np.array(reader.get_frame(t)) for t in times]
+    audio_times = np.arange(0, 1, 1 / audio_reader.fps)
+    sound = audio_reader.get_frame(audio_times)
+
+    def read(start):
+        # each thread reads from its own position, in order
+        for i in range(start, len(times)):
+            assert np.array_equal(reader.get_frame(times[i]), frames[i])
+        assert np.array_equal(audio_reader.get_frame(audio_times), sound)
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(read, [0, 12, 24, 36, 0, 6]))
+    assert len(reader.cursors) == len(audio_reader.cursors) == 5
+
+    reader.close()
+    audio_reader.close()
+    assert not any(cursor.proc for cursor in reader.cursors + audio_reader.cursors)
+
+    # the threads beyond max_cursors share the cursors
+    reader = FFMPEG_VideoReader("media/big_buck_bunny_0_30.webm", max_cursors=2)
+    audio_reader = FFMPEG_AudioReader(
+        "media/big_buck_bunny_0_30.webm", 200000, max_cursors=2
+    )
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(read, [0, 12, 24, 36]))
+    assert len(reader.cursors) == len(audio_reader.cursors) == 2
+    reader.close()
+    audio_reader.close()
+
+
+def test_ffmpeg_async_videoreader():
+    reader = FFMPEG_VideoReader("media/big_buck_bunny_432_433.webm")
+
+    async def read(start_time):
+        async with await FFMPEG_AsyncVideoReader.open(
+            "media/big_buck_bunny_432_433.webm", start_time=start_time
+        ) as async_reader:
+            return [frame async for frame in async_reader]
+
+    frames = asyncio.run(read(0))
+    assert len(frames) == reader.n_frames
+    for i, frame in enumerate(frames):
+        assert np.array_equal(frame, reader.get_frame(i / reader.fps))
+
+    frames = asyncio.run(read(0.5))
+    assert np.array_equal(frames[0], reader.get_frame(0.5))
+    reader.close()
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -3,15 +3,22 @@
 import os
 import shutil
 
+import numpy as np
+
 import pytest
 
 from moviepy.video.io.ffmpeg_tools import (
+    ffmpeg_concat_video_files,
+    ffmpeg_copy_video_frames,
     ffmpeg_extract_subclip,
+    ffmpeg_keyframes_times,
     ffmpeg_resize,
     ffmpeg_stabilize_video,
     ffmpeg_version,
+    ffmpeg_video_headers,
 )
 from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.VideoClip import ColorClip, VideoClip
 
 
 def test_ffmpeg_extract_subclip(util):
@@ -48,6 +55,60 @@ def test_ffmpeg_extract_subclip(util):
             pass
 
 
+def test_ffmpeg_concat_video_files(util):
+    inputfiles = []
+    for i, color in enumerate([(255, 0, 0), (0, 0, 255)]):
+        inputfile = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_concat_%d.avi" % i)
+        clip = ColorClip((16, 16), color=color, duration=0.5)
+        clip.write_videofile(inputfile, fps=10, codec="png", logger=None)
+        inputfiles.append(inputfile)
+
+    outputfile = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_concat.avi")
+    ffmpeg_concat_video_files(inputfiles, outputfile, logger=None)
+
+    with VideoFileClip(outputfile) as clip:
+        assert clip.duration == 1
+        assert list(clip.get_frame(0.2)[0, 0]) == [255, 0, 0]
+        assert list(clip.get_frame(0.7)[0, 0]) == [0, 0, 255]
+    assert not os.path.exists(outputfile + ".concat.txt")
+
+
+def test_ffmpeg_copy_video_frames(util):
+    inputfile = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_keyframes.mp4")
+    clip = VideoClip(
+        lambda t: np.full((16, 16, 3), int(200 * t), dtype="uint8"), duration=1
+    )
+    clip.write_videofile(
+        inputfile,
+        fps=10,
+        ffmpeg_params=["-g", "4", "-sc_threshold", "0"],
+        logger=None,
+    )
+    keyframes_times = ffmpeg_keyframes_times(inputfile)
+    assert keyframes_times == pytest.approx([0, 0.4, 0.8])
+
+    outputfile = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_copy_frames.mp4")
+    ffmpeg_copy_video_frames(inputfile, outputfile, keyframes_times[1], 4, logger=None)
+
+    with VideoFileClip(inputfile) as source, VideoFileClip(outputfile) as clip:
+        frames = list(clip.iter_frames())
+        assert len(frames) == 4
+        for i, frame in enumerate(frames):
+            assert np.array_equal(frame, source.get_frame(0.4 + i / 10))
+
+
+def test_ffmpeg_video_headers():
+    headers = ffmpeg_video_headers("media/chaplin.mp4")
+    assert headers["pixel_format"] == "yuv420p(progressive)"
+    assert headers["sample_aspect_ratio"] is None
+    assert "Sequence Parameter Set" in headers["headers"]
+    assert any(line.split()[1] == "level_idc" for line in headers["headers"][1:])
+
+    # ffmpeg can't decode the headers of every codec
+    headers = ffmpeg_video_headers("media/pigs_in_a_polka.gif")
+    assert headers["headers"] is None
+
+
 def test_ffmpeg_resize(util):
     outputfile = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_resize.mp4")
     if os.path.isfile(outputfile):
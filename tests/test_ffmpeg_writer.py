@@ -1,16 +1,48 @@
 """FFmpeg writer tests of moviepy."""
 
+import asyncio
+import io
 import multiprocessing
+import multiprocessing.pool
 import os
+import shutil
+import socket
+import sys
+import threading
+import time
 
+import numpy as np
 from PIL import Image
 
 import pytest
 
 from moviepy import *
 from moviepy.video.compositing.CompositeVideoClip import concatenate_videoclips
-from moviepy.video.io.ffmpeg_writer import ffmpeg_write_image, ffmpeg_write_video
+from moviepy.video.io import render_farm
+from moviepy.video.io.ffmpeg_async import (
+    FFMPEG_AsyncAudioWriter,
+    FFMPEG_AsyncVideoWriter,
+    ffmpeg_audiowrite_async,
+    ffmpeg_write_video_async,
+)
+from moviepy.video.io.ffmpeg_filter_graph import FFMPEG_FilterGraph
+from moviepy.video.io.ffmpeg_writer import (
+    FFMPEG_VideoStreamWriter,
+    FFMPEG_VideoWriter,
+    YUV420pConverter,
+    can_fork,
+    ffmpeg_supports_alpha,
+    ffmpeg_write_image,
+    ffmpeg_write_video,
+    ffmpeg_write_videos,
+    fork_context,
+    segments_frame_ranges,
+    smart_render_pieces,
+    video_stream_infos,
+)
 from moviepy.video.io.gif_writers import write_gif_with_imageio
+from moviepy.video.io.render_cache import video_fingerprint
+from moviepy.video.io.render_farm import RenderWorker, ffmpeg_write_video_farm
 from moviepy.video.tools.drawing import color_gradient
 
 
@@ -94,15 +126,16 @@ def test_ffmpeg_write_video(
         assert g == 0
         assert b == 0
 
+        # mp4 can't store transparency, so the mask is ignored
         r, g, b = final_clip.get_frame(0.1)[0][0]
-        assert r == (0 if not with_mask else 1)
-        assert g == (255 if not with_mask else 1)
+        assert r == 0
+        assert g == 255
         assert b == 1
 
         r, g, b = final_clip.get_frame(0.2)[0][0]
         assert r == 0
         assert g == 0
-        assert b == (255 if not with_mask else 0)
+        assert b == 255
 
     if write_logfile:
         assert os.path.isfile(logfile_name)
@@ -255,6 +288,814 @@ def test_transparent_video(util):
     result.close()
 
 
+@pytest.mark.parametrize(
+    ("codec", "pixel_format", "expected"),
+    (
+        ("libx264", None, False),
+        ("mpeg4", None, False),
+        ("libvpx", None, True),
+        ("png", None, True),
+        ("png", "rgb24", False),
+        ("prores_ks", "yuva444p10le", True),
+    ),
+)
+def test_ffmpeg_supports_alpha(codec, pixel_format, expected):
+    assert ffmpeg_supports_alpha(codec, pixel_format) is expected
+
+
+def test_ffmpeg_write_video_skips_unsupported_mask(util):
+    filename = os.path.join(util.TMP_DIR, "moviepy_skip_mask.mp4")
+    clip = CompositeVideoClip(
+        [ColorClip((10, 10), color=(255, 0, 0)).with_position((5, 5))],
+        size=(20, 20),
+    ).with_duration(0.3)
+
+    def mask_frame_function(t):
+        raise AssertionError("the mask must not be computed")
+
+    clip.mask.frame_function = mask_frame_function
+    ffmpeg_write_video(clip, filename, fps=10, logger=None)
+
+    with VideoFileClip(filename) as result:
+        assert result.get_frame(0)[0][0][0] < 5
+        assert result.get_frame(0)[10][10][0] > 250
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="Rendering frames in processes requires forking",
+)
+def test_ffmpeg_write_video_workers(util, video):
+    clip = video(start_time=0.2, end_time=0.6)
+    clip = CompositeVideoClip([clip, clip.with_opacity(0.5).with_position((10, 10))])
+    mask = ColorClip(clip.size, 0.5, is_mask=True, duration=clip.duration)
+    clip = clip.with_mask(mask)
+
+    frames = {}
+    for workers in [None, 3]:
+        filename = os.path.join(util.TMP_DIR, "moviepy_workers_%s.avi" % workers)
+        ffmpeg_write_video(
+            clip, filename, fps=10, codec="png", workers=workers, logger=None
+        )
+        with VideoFileClip(filename, has_mask=True) as result:
+            frames[workers] = [
+                np.dstack([frame, 255 * mask]).astype("uint8")
+                for frame, mask in zip(result.iter_frames(), result.mask.iter_frames())
+            ]
+
+    assert len(frames[3]) == len(frames[None]) > 0
+    assert all(np.array_equal(a, b) for a, b in zip(frames[None], frames[3]))
+    # the reader of the clip is still usable by this process
+    assert clip.get_frame(0.1).shape == (*clip.size[::-1], 3)
+
+    # videos can be written by workers from several threads at once
+    def write_color(color):
+        clip = ColorClip((16, 16), color=color, duration=1).with_fps(10)
+        filename = os.path.join(
+            util.TMP_DIR, "moviepy_workers_%02x%02x%02x.avi" % color
+        )
+        ffmpeg_write_video(clip, filename, fps=10, codec="png", workers=2, logger=None)
+        with VideoFileClip(filename) as result:
+            return {tuple(frame[0, 0]) for frame in result.iter_frames()}
+
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    threads = [
+        threading.Thread(target=lambda c=c: results.update({c: write_color(c)}))
+        for c in colors
+    ]
+    results = {}
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {color: {color} for color in colors}
+
+
+# names of the threads of this process when it forks, while recorded
+FORK_THREADS = []
+RECORD_FORK_THREADS = threading.Event()
+
+
+def record_fork_threads():
+    if RECORD_FORK_THREADS.is_set():
+        FORK_THREADS.extend(thread.name for thread in threading.enumerate())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=record_fork_threads)
+
+
+@pytest.mark.skipif(
+    not can_fork(), reason="Rendering frames in processes requires forking"
+)
+def test_ffmpeg_write_video_workers_fork_before_threads(util):
+    clip = ColorClip((16, 16), color=(255, 0, 0), duration=1).with_fps(10)
+    audio_clip = AudioClip(lambda t: np.zeros((np.size(t), 2)), duration=1, fps=44100)
+    filename = os.path.join(util.TMP_DIR, "moviepy_workers_threads.mkv")
+
+    FORK_THREADS.clear()
+    RECORD_FORK_THREADS.set()
+    try:
+        ffmpeg_write_video(
+            clip,
+            filename,
+            fps=10,
+            codec="png",
+            workers=2,
+            audio_clip=audio_clip,
+            audio_codec="pcm_s16le",
+            logger=None,
+        )
+    finally:
+        RECORD_FORK_THREADS.clear()
+
+    # the processes are forked before the writer starts its threads
+    assert FORK_THREADS
+    assert not [
+        name
+        for name in FORK_THREADS
+        if ("send_queued_frames" in name) or ("send_audio" in name)
+    ]
+    with VideoFileClip(filename) as result:
+        assert list(result.get_frame(0.5)[0, 0]) == [255, 0, 0]
+        assert result.audio is not None
+
+
+def test_ffmpeg_write_video_workers_without_fork(util, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "darwin")
+    assert not can_fork()
+    with pytest.raises(ValueError, match="fork"):
+        fork_context()
+
+    # the frames are rendered by the current process
+    clip = ColorClip((16, 16), color=(255, 0, 0), duration=1).with_fps(10)
+    filename = os.path.join(util.TMP_DIR, "moviepy_workers_without_fork.avi")
+    with pytest.warns(UserWarning, match="fork"):
+        ffmpeg_write_video(clip, filename, fps=10, codec="png", workers=2, logger=None)
+    with VideoFileClip(filename) as result:
+        assert len(list(result.iter_frames())) == 10
+
+
+def test_ffmpeg_write_video_workers_render_pass(util):
+    calls = multiprocessing.get_context("fork").Value("i", 0)
+
+    def frame_function(t):
+        with calls.get_lock():
+            calls.value += 1
+        return np.full((4, 6, 3), 100 * t, dtype="uint8")
+
+    clip = VideoClip(frame_function, duration=1)
+    clip = CompositeVideoClip([clip, clip.with_position((1, 1))], size=(8, 6))
+    calls.value = 0
+    filename = os.path.join(util.TMP_DIR, "moviepy_workers_render_pass.avi")
+    ffmpeg_write_video(clip, filename, fps=10, codec="png", workers=2, logger=None)
+    # each process keeps a render pass for all its frames, where the frames of
+    # the shared clip are computed once, but for the first one
+    assert calls.value <= 10 + 2
+
+    # so do the writers of coroutines
+    async def write():
+        async for _ in ffmpeg_write_video_async(clip, filename, fps=10, codec="png"):
+            pass
+
+    calls.value = 0
+    asyncio.run(write())
+    assert calls.value == 10 + 1
+
+
+@pytest.mark.parametrize(
+    ("n_frames", "segments", "interval", "expected"),
+    (
+        (100, 4, 10, [(0, 20), (20, 50), (50, 80), (80, 100)]),
+        (95, 2, 10, [(0, 50), (50, 95)]),
+        (100, 4, 250, [(0, 100)]),
+        (30, 4, 10, [(0, 10), (10, 20), (20, 30)]),
+    ),
+)
+def test_segments_frame_ranges(n_frames, segments, interval, expected):
+    assert segments_frame_ranges(n_frames, segments, interval) == expected
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="Rendering segments in processes requires forking",
+)
+def test_ffmpeg_write_video_segments(util, video, monkeypatch):
+    clip = video(start_time=0.2, end_time=0.6).resized(0.1)
+
+    # there are no more processes than CPUs
+    pools_processes = []
+    pool_init = multiprocessing.pool.Pool.__init__
+
+    def recording_pool_init(pool, processes=None, *args, **kwargs):
+        pools_processes.append(processes)
+        pool_init(pool, processes, *args, **kwargs)
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(multiprocessing.pool.Pool, "__init__", recording_pool_init)
+
+    frames = {}
+    for segments in [None, 4]:
+        filename = os.path.join(util.TMP_DIR, "moviepy_segments_%s.avi" % segments)
+        ffmpeg_write_video(
+            clip,
+            filename,
+            fps=10,
+            codec="png",
+            segments=segments,
+            ffmpeg_params=["-g", "1"],
+            logger=None,
+        )
+        with VideoFileClip(filename) as result:
+            frames[segments] = list(result.iter_frames())
+
+    assert len(frames[4]) == len(frames[None]) > 0
+    assert all(np.array_equal(a, b) for a, b in zip(frames[None], frames[4]))
+    assert pools_processes == [2]
+
+    # the segment writers log in the log file
+    filename = os.path.join(util.TMP_DIR, "moviepy_segments_logged.mp4")
+    ffmpeg_write_video(
+        clip,
+        filename,
+        fps=10,
+        segments=3,
+        ffmpeg_params=["-g", "1"],
+        write_logfile=True,
+        logger=None,
+    )
+    with open(filename + ".log") as logfile:
+        assert logfile.read().count("Output #0") == 3
+
+
+@pytest.mark.parametrize("queue_size", (None, 2))
+def test_ffmpeg_videowriter_queue(util, queue_size):
+    filename = os.path.join(util.TMP_DIR, "moviepy_writer_queue.avi")
+    with FFMPEG_VideoWriter(
+        filename, (16, 8), 10, codec="png", queue_size=queue_size
+    ) as writer:
+        # the same array is reused for all the frames
+        frame = np.empty((8, 16, 3), dtype="uint8")
+        for i in range(10):
+            frame[:] = 20 * i
+            writer.write_frame(frame)
+        # non contiguous frames are sent too
+        writer.write_frame(np.broadcast_to(np.uint8(7), (8, 16, 3)))
+
+    assert writer.metrics["frames"] == 11
+    if queue_size:
+        assert 0 <= writer.metrics["mean_queue_depth"] <= 2
+        assert writer.metrics["max_queue_depth"] <= 2
+        assert writer.metrics["queue_wait"] >= 0
+        assert writer.metrics["writer_idle"] >= 0
+
+    with VideoFileClip(filename) as clip:
+        values = [frame[0, 0, 0] for frame in clip.iter_frames()]
+    assert values == [20 * i for i in range(10)] + [7]
+
+
+def test_ffmpeg_videowriter_queue_error(util):
+    filename = os.path.join(util.TMP_DIR, "moviepy_writer_queue_error.mp4")
+    with pytest.raises(IOError, match="Unknown encoder"):
+        with FFMPEG_VideoWriter(
+            filename, (160, 80), 10, codec="nonexistent", queue_size=2
+        ) as writer:
+            # more frames than the pipe to ffmpeg can buffer
+            for i in range(100):
+                writer.write_frame(np.zeros((80, 160, 3), dtype="uint8"))
+
+
+def test_ffmpeg_async_videowriter(util):
+    filename = os.path.join(util.TMP_DIR, "moviepy_async_writer.avi")
+    frames = [np.full((8, 16, 3), 20 * i, dtype="uint8") for i in range(10)]
+
+    async def write():
+        async with FFMPEG_AsyncVideoWriter(
+            filename, (16, 8), 10, codec="png"
+        ) as writer:
+            for frame in frames:
+                await writer.write_frame(frame)
+
+    asyncio.run(write())
+    with VideoFileClip(filename) as result:
+        assert all(np.array_equal(a, b) for a, b in zip(result.iter_frames(), frames))
+
+    # cancelling the task writing the frames terminates ffmpeg
+    processes = []
+
+    async def write_forever():
+        async with FFMPEG_AsyncVideoWriter(
+            filename, (16, 8), 10, codec="png"
+        ) as writer:
+            processes.append(writer.proc)
+            while True:
+                await writer.write_frame(frames[0])
+
+    async def cancel():
+        task = asyncio.ensure_future(write_forever())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    assert processes[0].returncode is not None
+
+    with pytest.raises(ValueError, match="queue_size"):
+        FFMPEG_AsyncVideoWriter(filename, (16, 8), 10, queue_size=2)
+
+
+def test_ffmpeg_audiowrite_async(util, monkeypatch):
+    filename = os.path.join(util.TMP_DIR, "moviepy_async_audiowriter.wav")
+    clip = AudioClip(
+        lambda t: np.array([0.5 * np.sin(440 * 2 * np.pi * t)] * 2).T,
+        duration=1,
+        fps=44100,
+    )
+    asyncio.run(ffmpeg_audiowrite_async(clip, filename, 44100, 2, 2000, "pcm_s16le"))
+    times = np.arange(100) / 44100
+    with AudioFileClip(filename) as result:
+        assert abs(result.duration - 1) < 0.01
+        assert np.allclose(result.get_frame(times), clip.get_frame(times), atol=1e-3)
+
+    # cancelling the task writing the sound terminates ffmpeg
+    processes = []
+    start = FFMPEG_AsyncAudioWriter.start
+
+    async def start_and_record(writer):
+        await start(writer)
+        processes.append(writer.proc)
+
+    monkeypatch.setattr(FFMPEG_AsyncAudioWriter, "start", start_and_record)
+    long_clip = AudioClip(lambda t: np.zeros((np.size(t), 2)), duration=10000)
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            ffmpeg_audiowrite_async(long_clip, filename, 44100, 2, 2000, "pcm_s16le")
+        )
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    assert processes and all(proc.returncode is not None for proc in processes)
+
+    with pytest.raises(ValueError, match="logfile"):
+        FFMPEG_AsyncAudioWriter(filename, 44100, logfile=open(os.devnull, "w"))
+
+
+def test_ffmpeg_videostreamwriter_socket(util):
+    sender, receiver = socket.socketpair()
+    received = []
+
+    def receive():
+        while True:
+            data = receiver.recv(1 << 16)
+            if not data:
+                break
+            received.append(data)
+
+    thread = threading.Thread(target=receive)
+    thread.start()
+    with FFMPEG_VideoStreamWriter(
+        sender, (32, 16), 10, fragment_duration=0.5, preset="ultrafast"
+    ) as writer:
+        for i in range(30):
+            writer.write_frame(np.full((16, 32, 3), 8 * i, dtype="uint8"))
+
+        # the first fragments are streamed before the end of the video
+        deadline = time.time() + 10
+        while (b"moof" not in b"".join(received)) and (time.time() < deadline):
+            time.sleep(0.05)
+        assert b"moof" in b"".join(received)
+    sender.close()
+    thread.join()
+    receiver.close()
+    assert writer.metrics["bytes_sent"] == sum(len(data) for data in received)
+
+    filename = os.path.join(util.TMP_DIR, "moviepy_videostream_socket.mp4")
+    with open(filename, "wb") as f:
+        f.write(b"".join(received))
+    with VideoFileClip(filename) as clip:
+        assert clip.n_frames == 30
+        assert abs(clip.get_frame(1.05)[0, 0, 0] - 80) < 8
+
+
+def test_ffmpeg_write_videos(util):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (16, 32, 3)).astype("uint8")
+    clip = ImageClip(image, duration=0.3)
+    sizes = [(64, 32), (32, 16), (16, 8), (8, 4)]
+    filenames = [
+        os.path.join(util.TMP_DIR, "moviepy_write_videos_%d.avi" % width)
+        for width, _ in sizes
+    ]
+    ffmpeg_write_videos(
+        clip,
+        [
+            {"filename": filename, "size": size, "codec": "png"}
+            for filename, size in zip(filenames, sizes)
+        ],
+        fps=10,
+        logger=None,
+    )
+
+    # the 16x8 frames are made from the clip frames, not from the upscaled ones,
+    # and the 8x4 frames from the 16x8 ones
+    expected = {(32, 16): image}
+    expected[(64, 32)] = np.array(
+        Image.fromarray(image).resize((64, 32), Image.LANCZOS)
+    )
+    expected[(16, 8)] = np.array(Image.fromarray(image).resize((16, 8), Image.LANCZOS))
+    expected[(8, 4)] = np.array(
+        Image.fromarray(expected[(16, 8)]).resize((8, 4), Image.LANCZOS)
+    )
+    for filename, size in zip(filenames, sizes):
+        with VideoFileClip(filename) as result:
+            assert np.array_equal(result.get_frame(0.1), expected[size])
+
+
+@pytest.mark.skipif(os.name == "nt", reason="the sound is piped with pass_fds")
+def test_write_videostream_audio(util):
+    clip = ColorClip((32, 16), (255, 0, 0), duration=1).with_audio(
+        AudioClip(lambda t: np.sin(880 * 2 * np.pi * t), duration=1, fps=22050)
+    )
+    output = io.BytesIO()
+    clip.write_videostream(output, fps=10, logger=None)
+
+    filename = os.path.join(util.TMP_DIR, "moviepy_videostream_audio.mp4")
+    with open(filename, "wb") as f:
+        f.write(output.getvalue())
+    with VideoFileClip(filename) as video:
+        assert abs(video.duration - 1) < 0.1
+        assert abs(video.audio.duration - 1) < 0.1
+        assert video.audio.get_frame(np.linspace(0.5, 0.51, 50)).std() > 0.2
+
+
+@pytest.mark.parametrize("threads", [None, 3])
+def test_yuv420p_converter(threads):
+    frame = np.random.default_rng(0).integers(0, 256, (12, 16, 3), dtype="uint8")
+    image = YUV420pConverter((16, 12), threads=threads).convert(frame)
+    assert image.shape == (16 * 12 * 3 // 2,)
+
+    # BT.601 limited range formulas, in floating point
+    rgb = frame.astype(float) / 255
+    luma = 16 + rgb @ [65.481, 128.553, 24.966]
+    blocks = (rgb[0::2, 0::2] + rgb[1::2, 0::2] + rgb[0::2, 1::2] + rgb[1::2, 1::2]) / 4
+    u = 128 + blocks @ [-37.797, -74.203, 112]
+    v = 128 + blocks @ [112, -93.786, -18.214]
+    assert np.abs(image[:192].reshape(12, 16) - luma).max() < 1
+    assert np.abs(image[192:240].reshape(6, 8) - u).max() < 1
+    assert np.abs(image[240:].reshape(6, 8) - v).max() < 1
+
+    with pytest.raises(ValueError, match="must be even"):
+        YUV420pConverter((15, 12))
+
+
+def test_write_videofile_convert_to_yuv(util):
+    clip = VideoClip(
+        lambda t: np.dstack(
+            [
+                np.tile(np.linspace(0, 255, 32), (16, 1)),
+                np.full((16, 32), 200 * t),
+                np.tile(np.linspace(255, 0, 16)[:, None], (1, 32)),
+            ]
+        ).astype("uint8"),
+        duration=1,
+    )
+    # the frames are the same as with the conversion of ffmpeg
+    filenames = []
+    for convert_to_yuv in [False, True]:
+        filename = os.path.join(util.TMP_DIR, "moviepy_yuv_%d.mp4" % convert_to_yuv)
+        clip.write_videofile(
+            filename,
+            fps=10,
+            convert_to_yuv=convert_to_yuv,
+            conversion_threads=2 if convert_to_yuv else None,
+            ffmpeg_params=["-qp", "0"],
+            logger=None,
+        )
+        filenames.append(filename)
+    with VideoFileClip(filenames[0]) as expected, VideoFileClip(filenames[1]) as video:
+        assert video.n_frames == 10
+        for t in [0, 0.5]:
+            difference = video.get_frame(t).astype(int) - expected.get_frame(t)
+            assert np.abs(difference).mean() < 1
+
+
+def test_write_videofile_smart_render(util):
+    source_filename = os.path.join(util.TMP_DIR, "moviepy_smart_render_source.mp4")
+    VideoClip(
+        lambda t: np.full((16, 16, 3), int(100 * t), dtype="uint8"), duration=2
+    ).write_videofile(
+        source_filename,
+        fps=10,
+        ffmpeg_params=["-g", "4", "-sc_threshold", "0"],
+        logger=None,
+    )
+
+    with VideoFileClip(source_filename) as source:
+        clip = concatenate_videoclips(
+            [
+                source.subclipped(0.3, 1.1),
+                source.subclipped(0.2, 0.6).with_effects([vfx.InvertColors()]),
+                source.subclipped(1.2),
+            ]
+        )
+        pieces = smart_render_pieces(clip, 10, video_stream_infos(source_filename))
+        assert pieces == [
+            ((0, 1), None),
+            ((1, 5), (source_filename, pytest.approx(0.4))),
+            ((5, 12), None),
+            ((12, 16), (source_filename, pytest.approx(1.2))),
+            ((16, 20), None),
+        ]
+
+        filename = os.path.join(util.TMP_DIR, "moviepy_smart_render.mp4")
+        clip.write_videofile(filename, smart_render=True, logger=None)
+        with VideoFileClip(filename) as result:
+            frames = list(result.iter_frames())
+            assert len(frames) == 20
+            for i, frame in enumerate(frames):
+                expected = clip.get_frame(i / 10)
+                if (1 <= i < 5) or (12 <= i < 16):  # copied frames
+                    assert np.array_equal(frame, expected)
+                else:
+                    assert np.abs(frame - expected.astype(int)).max() < 10
+
+
+@pytest.mark.parametrize(
+    "source_params",
+    (
+        pytest.param(["-profile:v", "baseline"], id="profile"),
+        pytest.param(["-level", "5.1"], id="level"),
+        pytest.param(["-vf", "setsar=2"], id="sample_aspect_ratio"),
+    ),
+)
+def test_write_videofile_smart_render_incompatible_source(util, source_params):
+    source_filename = os.path.join(util.TMP_DIR, "moviepy_smart_render_source.mp4")
+    VideoClip(
+        lambda t: np.full((16, 16, 3), int(100 * t), dtype="uint8"), duration=2
+    ).write_videofile(
+        source_filename,
+        fps=10,
+        ffmpeg_params=["-g", "4", "-sc_threshold", "0"] + source_params,
+        logger=None,
+    )
+    probe_filename = os.path.join(util.TMP_DIR, "moviepy_smart_render_probe.mkv")
+    ColorClip((16, 16), (0, 0, 0), duration=0.1).write_videofile(
+        probe_filename, fps=10, logger=None
+    )
+
+    with VideoFileClip(source_filename) as source:
+        clip = concatenate_videoclips(
+            [
+                source.subclipped(0.3, 1.1),
+                source.subclipped(0.2, 0.6).with_effects([vfx.InvertColors()]),
+            ]
+        )
+        # the stream of the source can't be joined to the rendered pieces
+        pieces = smart_render_pieces(clip, 10, video_stream_infos(probe_filename))
+        assert pieces == [((0, 12), None)]
+
+        # so the whole clip is rendered
+        filename = os.path.join(util.TMP_DIR, "moviepy_smart_render.mp4")
+        clip.write_videofile(filename, smart_render=True, logger=None)
+        with VideoFileClip(filename) as result:
+            frames = list(result.iter_frames())
+            assert len(frames) == 12
+            for i, frame in enumerate(frames):
+                expected = clip.get_frame(i / 10)
+                assert np.abs(frame - expected.astype(int)).max() < 10
+
+
+def test_write_videofile_ffmpeg_filters(util):
+    source_filename = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_filters_source.mp4")
+    VideoClip(
+        lambda t: np.full((32, 32, 3), int(100 * t), dtype="uint8"), duration=2
+    ).write_videofile(source_filename, fps=10, logger=None)
+
+    with VideoFileClip(source_filename) as source:
+        part1 = source.subclipped(0.5, 1.5).with_effects([vfx.FadeIn(0.4)])
+        part2 = source.with_effects(
+            [vfx.Resize(2), vfx.Crop(x1=16, y1=16, width=32, height=32)]
+        )
+        logo = ColorClip((8, 8), color=(255, 0, 0)).with_duration(1)
+        clip = CompositeVideoClip(
+            [
+                concatenate_videoclips([part1, part2.subclipped(1)]),
+                logo.with_start(0.5).with_position((4, 8)),
+            ]
+        )
+        audio = AudioFileClip("media/crunching.mp3")
+        clip.audio = audio.subclipped(0, 2).with_effects([afx.MultiplyVolume(0.5)])
+        FFMPEG_FilterGraph(10).video(clip, clip.duration)  # doesn't raise
+
+        filename = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_filters.mp4")
+        clip.write_videofile(filename, ffmpeg_filters=True, logger=None)
+        with VideoFileClip(filename) as result:
+            frames = list(result.iter_frames())
+            assert len(frames) == 20
+            for i, frame in enumerate(frames):
+                expected = clip.get_frame(i / 10)
+                assert np.abs(frame - expected.astype(int)).mean() < 5
+
+            assert result.audio.duration == pytest.approx(2, abs=0.05)
+            volume = np.abs(result.audio.to_soundarray()).mean()
+            assert volume == pytest.approx(
+                np.abs(clip.audio.to_soundarray()).mean(), rel=0.1
+            )
+        audio.close()
+
+
+def test_ffmpeg_filter_graph_blocking_clip(util):
+    clip = concatenate_videoclips(
+        [
+            ColorClip((8, 8), color=(255, 0, 0), duration=1),
+            ColorClip((8, 8), color=(0, 255, 0), duration=1).with_effects(
+                [vfx.MirrorX()]
+            ),
+        ]
+    )
+    with pytest.raises(ValueError, match="the effect MirrorX has no ffmpeg filter"):
+        FFMPEG_FilterGraph(10).video(clip, clip.duration)
+
+    # the frames are rendered in Python instead
+    filename = os.path.join(util.TMP_DIR, "moviepy_ffmpeg_filters_fallback.mp4")
+    clip.write_videofile(filename, fps=10, ffmpeg_filters=True, logger=None)
+    with VideoFileClip(filename) as result:
+        assert result.duration == pytest.approx(2)
+
+
+def test_video_fingerprint(util):
+    source_filename = os.path.join(util.TMP_DIR, "moviepy_fingerprint_source.mp4")
+    VideoClip(
+        lambda t: np.full((16, 16, 3), int(100 * t), dtype="uint8"), duration=2
+    ).write_videofile(source_filename, fps=10, logger=None)
+
+    def timeline(title_color):
+        title = ColorClip((8, 4), color=title_color, duration=0.5)
+        return concatenate_videoclips(
+            [
+                source.subclipped(0, 1).with_effects([vfx.FadeIn(0.5)]),
+                CompositeVideoClip([source, title.with_position((4, 4))]),
+            ]
+        )
+
+    with VideoFileClip(source_filename) as source:
+        clip, edited_clip = timeline((255, 0, 0)), timeline((0, 255, 0))
+        assert video_fingerprint(clip, 0, 1) == video_fingerprint(edited_clip, 0, 1)
+        assert video_fingerprint(clip, 0, 1) != video_fingerprint(clip, 1, 2)
+        assert video_fingerprint(clip, 1, 2) != video_fingerprint(edited_clip, 1, 2)
+        # the title is only shown until 1.5s
+        assert video_fingerprint(clip, 2, 3) == video_fingerprint(edited_clip, 2, 3)
+
+        # frames computed by a function can't be identified
+        moving = source.image_transform(lambda frame: frame // 2)
+        assert video_fingerprint(moving, 0, 1) is None
+
+
+def test_write_videofile_render_cache(util):
+    source_filename = os.path.join(util.TMP_DIR, "moviepy_render_cache_source.mp4")
+    VideoClip(
+        lambda t: np.full((16, 16, 3), int(50 * t), dtype="uint8"), duration=4
+    ).write_videofile(source_filename, fps=10, logger=None)
+    render_cache = os.path.join(util.TMP_DIR, "moviepy_render_cache")
+    shutil.rmtree(render_cache, ignore_errors=True)
+
+    with VideoFileClip(source_filename) as source:
+        filename = os.path.join(util.TMP_DIR, "moviepy_render_cache.mp4")
+        for title_color, n_segments in [((255, 0, 0), 4), ((0, 255, 0), 5)]:
+            title = ColorClip((8, 4), color=title_color, duration=0.5)
+            clip = CompositeVideoClip(
+                [source, title.with_start(2.2).with_position((4, 4))]
+            )
+            clip.write_videofile(
+                filename,
+                render_cache=render_cache,
+                ffmpeg_params=["-g", "10"],
+                logger=None,
+            )
+            # only the segment showing the edited title was rendered again
+            assert len(os.listdir(render_cache)) == n_segments
+
+            with VideoFileClip(filename) as result:
+                frames = list(result.iter_frames())
+                assert len(frames) == 40
+                for i, frame in enumerate(frames):
+                    expected = clip.get_frame(i / 10)
+                    assert np.abs(frame - expected.astype(int)).mean() < 5
+
+        # the segments are found again after inserting a segment before them
+        intro = ColorClip((16, 16), color=(0, 0, 255), duration=1)
+        clip = concatenate_videoclips([intro, clip])
+        clip.write_videofile(
+            filename,
+            render_cache=render_cache,
+            ffmpeg_params=["-g", "10"],
+            logger=None,
+        )
+        assert len(os.listdir(render_cache)) == 6
+        with VideoFileClip(filename) as result:
+            frames = list(result.iter_frames())
+            assert len(frames) == 50
+            for i, frame in enumerate(frames):
+                expected = clip.get_frame(i / 10)
+                assert np.abs(frame - expected.astype(int)).mean() < 5
+
+
+class FailingRenderWorker(RenderWorker):
+    def render(self, job, description):
+        return {"error": "IOError: the worker failed"}
+
+
+class RecordingRenderWorker(RenderWorker):
+    def __init__(self):
+        super().__init__()
+        self.clips = []
+
+    def render(self, job, description):
+        reply = super().render(job, description)
+        self.clips.append((job, self.built_clip[1]))
+        return reply
+
+
+class InstantRenderWorker(RenderWorker):
+    def render(self, job, description):
+        # segments rendered faster than the resolution of the clock
+        return dict(super().render(job, description), seconds=0.0)
+
+
+def test_ffmpeg_write_video_farm(util, video, monkeypatch):
+    clip = video(start_time=0.2, end_time=0.6).resized(0.1)
+    workers = [RecordingRenderWorker(), InstantRenderWorker(), FailingRenderWorker()]
+    for worker in workers:
+        threading.Thread(target=worker.serve_forever, daemon=True).start()
+    with socket.socket() as closed:
+        closed.bind(("127.0.0.1", 0))
+        closed_address = closed.getsockname()
+
+    try:
+        local_filename = os.path.join(util.TMP_DIR, "moviepy_render_farm_local.avi")
+        ffmpeg_write_video(clip, local_filename, fps=10, codec="png", logger=None)
+        filename = os.path.join(util.TMP_DIR, "moviepy_render_farm.avi")
+        stats = ffmpeg_write_video_farm(
+            clip,
+            filename,
+            10,
+            [worker.address for worker in workers] + [closed_address],
+            segments=4,
+            codec="png",
+            ffmpeg_params=["-g", "1"],
+            logger=None,
+        )
+        with VideoFileClip(filename) as result, VideoFileClip(local_filename) as local:
+            frames, local_frames = list(result.iter_frames()), list(local.iter_frames())
+        assert len(frames) == len(local_frames) > 0
+        assert all(np.array_equal(a, b) for a, b in zip(frames, local_frames))
+
+        # the failed segments were rendered by the other workers
+        good, other, failing, closed = stats.values()
+        assert good["segments"] + other["segments"] == len(frames)
+        assert good["frames"] + other["frames"] == len(frames)
+        assert failing["segments"] == 0 and failing["failures"] > 0
+        assert closed["segments"] == closed["failures"] == 0
+        assert other["fps"] == 0.0
+        # the clip is sent and built once per connection
+        jobs, clips = zip(*workers[0].clips)
+        assert all("description" not in job for job in jobs)
+        assert len(set(map(id, clips))) == 1
+
+        with pytest.raises(IOError, match="failed 3 times"):
+            ffmpeg_write_video_farm(
+                clip, filename, 10, [workers[2].address], codec="png", logger=None
+            )
+
+        # clips which can't be described are rendered locally
+        VideoClip(lambda t: np.zeros((4, 4, 3)), duration=0.2).write_videofile(
+            filename, fps=10, codec="png", render_farm=[closed_address]
+        )
+
+        # but not the clips whose render fails
+        def failing_farm(*args, **kwargs):
+            raise ValueError("the render failed")
+
+        monkeypatch.setattr(render_farm, "ffmpeg_write_video_farm", failing_farm)
+        with pytest.raises(ValueError, match="the render failed"):
+            clip.write_videofile(
+                filename,
+                fps=10,
+                codec="png",
+                audio=False,
+                render_farm=[closed_address],
+            )
+    finally:
+        for worker in workers:
+            worker.shutdown()
+            worker.server_close()
+
+
 def test_write_file_with_spaces(util):
     filename = os.path.join(util.TMP_DIR, "name with spaces.mp4")
     clip = ColorClip((1, 1), color=1, is_mask=True).with_fps(1).with_duration(0.3)
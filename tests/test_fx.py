@@ -1090,6 +1090,70 @@ def test_time_symmetrize():
     assert clip1 == target1
 
 
+def test_color_tables():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(4, 6, 8, 3), dtype="uint8")
+    clip = VideoClip(lambda t: frames[int(t * 4)], duration=1).with_fps(4)
+
+    effects = [
+        vfx.MultiplyColor(1.3),
+        vfx.GammaCorrection(0.8),
+        vfx.InvertColors(),
+        vfx.LumContrast(lum=10, contrast=0.2),
+        vfx.BlackAndWhite(),
+        vfx.MultiplyColor(0.9),
+        vfx.FadeIn(1),
+    ]
+    fused_clip = clip.with_effects(effects)
+    # the effects are fused with the frames of the first clip of the chain
+    source, color_tables, _, _ = fused_clip.color_tables
+    assert len(color_tables) == len(effects)
+    assert source.frame_function is clip.frame_function
+
+    for t in [0, 0.25, 0.5, 0.75]:
+        # the effects applied one after the other, without color tables
+        expected = frames[int(t * 4)]
+        for effect in effects:
+            image = ImageClip(expected, duration=1).with_effects([effect])
+            expected = image.get_frame(t).astype("uint8")
+        assert np.array_equal(fused_clip.get_frame(t), expected)
+
+    assert np.array_equal(
+        fused_clip.get_frames([0, 0.5]),
+        np.stack([fused_clip.get_frame(0), fused_clip.get_frame(0.5)]),
+    )
+
+    # the frames of masks are not RGB frames, the effects are applied to them
+    mask = ColorClip((8, 6), color=0.8, is_mask=True, duration=1)
+    mask = mask.with_effects([vfx.InvertColors(), vfx.FadeIn(1)])
+    assert np.allclose(mask.get_frame(0.5), 0.1)
+    assert np.allclose(mask.get_frames([0.5, 1])[:, 0, 0], [0.1, 0.2])
+
+    # from the frame of the first clip, computed once
+    times = []
+
+    def frame_function(t):
+        times.append(t)
+        return np.full((6, 8), 0.8)
+
+    mask = VideoClip(frame_function, is_mask=True, duration=1)
+    mask = mask.with_effects([vfx.InvertColors(), vfx.FadeIn(1), vfx.FadeOut(1)])
+    times.clear()
+    assert np.allclose(mask.get_frame(0.5), 0.05)
+    assert times == [0.5]
+
+    # the color tables of a replaced frame function are not fused, like with
+    # the readers of ImageSequenceClip and VideoFileClip, which set the frame
+    # function of the clip directly
+    inverted = ColorClip((6, 4), color=(200, 100, 50), duration=2).with_effects(
+        [vfx.InvertColors()]
+    )
+    inverted.frame_function = lambda t: np.full((4, 6, 3), 10, dtype="uint8")
+    multiplied = inverted.with_effects([vfx.MultiplyColor(2)])
+    assert np.array_equal(multiplied.get_frame(0), np.full((4, 6, 3), 20))
+    assert np.array_equal(multiplied.get_frames([0]), np.full((1, 4, 6, 3), 20))
+
+
 def test_audio_normalize():
     clip = AudioFileClip("media/crunching.mp3")
     clip = clip.with_effects([afx.AudioNormalize()])
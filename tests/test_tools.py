@@ -5,11 +5,16 @@ import importlib
 import io
 import os
 import shutil
+import subprocess
 import sys
 
+import numpy as np
+
 import pytest
 
 import moviepy.tools as tools
+from moviepy import AudioClip, ColorClip, Effect
+from moviepy.decorators import audio_video_effect
 
 
 @pytest.mark.parametrize(
@@ -33,6 +38,26 @@ def test_find_extensions_not_found():
         tools.find_extension("flashvideo")
 
 
+def test_is_constant_frame():
+    assert tools.is_constant_frame(np.broadcast_to(np.array([1, 2, 3]), (4, 5, 3)))
+    assert tools.is_constant_frame(np.broadcast_to(0.5, (4, 5)))
+    assert not tools.is_constant_frame(np.zeros((4, 5, 3)))
+    assert not tools.is_constant_frame(None)
+
+
+def test_pointwise():
+    invert = tools.pointwise(lambda frame: 255 - frame)
+
+    constant = np.broadcast_to(np.array([0, 100, 255]), (4, 5, 3))
+    result = invert(constant)
+    assert tools.is_constant_frame(result)
+    assert result.shape == (4, 5, 3)
+    assert np.array_equal(result[3, 4], [255, 155, 0])
+
+    frame = np.arange(60).reshape((4, 5, 3))
+    assert np.array_equal(invert(frame), 255 - frame)
+
+
 @pytest.mark.parametrize(
     "given, expected",
     [
@@ -137,13 +162,22 @@ def test_config(
     prev_ffmpeg_binary = os.environ.get("FFMPEG_BINARY")
     os.environ["FFMPEG_BINARY"] = ffmpeg_binary
 
+    # the binary is found when it is first needed, not when importing the module
+    moviepy_config_module = importlib.import_module("moviepy.config")
+
     if ffmpeg_binary_error is not None:
         with pytest.raises(ffmpeg_binary_error[0]) as exc:
-            importlib.import_module("moviepy.config")
+            moviepy_config_module.ffmpeg_binary()
         assert ffmpeg_binary_error[1] in str(exc.value)
+    else:
+        assert moviepy_config_module.FFMPEG_BINARY == (
+            moviepy_config_module.ffmpeg_binary()
+        )
 
     if prev_ffmpeg_binary is not None:
         os.environ["FFMPEG_BINARY"] = prev_ffmpeg_binary
+    else:
+        del os.environ["FFMPEG_BINARY"]
 
     if "moviepy.config" in sys.modules:
         del sys.modules["moviepy.config"]
@@ -181,6 +215,45 @@ def test_config_check():
         del sys.modules["moviepy.config"]
 
 
+def test_import_moviepy_is_lazy():
+    """``import moviepy`` must not import the submodules of MoviePy and their
+    dependencies, nor run ffmpeg.
+    """
+    code = (
+        "import subprocess, sys\n"
+        "subprocess.Popen = None\n"
+        "import moviepy\n"
+        "print(' '.join(sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = result.stdout.split()
+    for module in (
+        "numpy",
+        "PIL",
+        "imageio",
+        "imageio_ffmpeg",
+        "proglog",
+        "decorator",
+        "dotenv",
+        "IPython",
+    ):
+        assert module not in modules
+    assert "moviepy.video.fx.Crop" not in modules
+
+    # the names are imported when first used
+    import moviepy
+
+    assert moviepy.vfx.Crop.__name__ == "Crop"
+    assert "ColorClip" in dir(moviepy)
+    with pytest.raises(AttributeError):
+        moviepy.NotAMoviePyName
+
+
 @pytest.mark.skipif(sys.version_info < (3, 8), reason="Requires Python 3.8 or greater")
 @pytest.mark.parametrize(
     "decorator_name",
@@ -231,5 +304,21 @@ def test_decorators_argument_converters_consistency(
                 assert function_data["function_arguments"]
 
 
+def test_audio_video_effect():
+    class ScaleSound(Effect):
+        @audio_video_effect
+        def apply(self, clip, factor=2):
+            return clip.transform(lambda get_frame, t: factor * get_frame(t))
+
+    sound = AudioClip(lambda t: 0.1 * np.ones_like(t), duration=1, fps=10)
+    clip = ColorClip((2, 2), duration=1).with_audio(sound)
+
+    assert ScaleSound().apply(clip.copy()).audio.get_frame(0.5) == pytest.approx(0.2)
+    # the arguments given to the effect are used on the sound
+    scaled = ScaleSound().apply(clip.copy(), factor=3)
+    assert scaled.audio.get_frame(0.5) == pytest.approx(0.3)
+    assert ScaleSound().apply(sound, 4).get_frame(0.5) == pytest.approx(0.4)
+
+
 if __name__ == "__main__":
     pytest.main()
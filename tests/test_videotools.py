@@ -21,6 +21,7 @@ from moviepy.video.tools.cuts import (
 )
 from moviepy.video.tools.drawing import circle, color_gradient, color_split
 from moviepy.video.tools.interpolators import Interpolator, Trajectory
+from moviepy.video.tools.optimize import optimize
 
 
 try:
@@ -1100,5 +1101,62 @@ def test_find_audio_period(mono_wave, stereo_wave, wave_type):
     assert round(find_audio_period(loop_clip), 6) == pytest.approx(0.29932, 0.1)
 
 
+def test_optimize():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(40, 48, 64, 3), dtype="uint8")
+    calls = []
+
+    def frame_function(t):
+        calls.append(t)
+        return frames[int(round(t * 10)) % 40]
+
+    clip = VideoClip(frame_function, duration=4).with_fps(10)
+
+    # time changes collapsed, identity effects dropped
+    times = clip.subclipped(0.5, 3.5).with_effects(
+        [vfx.MultiplySpeed(2), vfx.Rotate(0)]
+    )
+    times = times.subclipped(0.2, 1.2).with_position((5, 5)).with_start(1)
+    optimized, changes = optimize(times)
+    assert changes == [
+        "dropped the identity operations Rotate",
+        "collapsed 3 time changes (subclipped, MultiplySpeed, subclipped)",
+    ]
+    assert (optimized.start, optimized.pos(0)) == (1, (5, 5))
+    for t in [0, 0.3, 0.7]:
+        assert np.array_equal(optimized.get_frame(t), times.get_frame(t))
+
+    # parts of a clip in a concatenation, in a composition
+    composition = CompositeVideoClip(
+        [clip.with_effects_on_subclip([vfx.InvertColors()], 1, 2), times]
+    )
+    optimized, changes = optimize(composition)
+    assert "got the frames of 2 sections of a concatenation" in changes[1]
+    for t in [0, 0.5, 1.2, 1.5, 2.5, 3.9]:
+        assert np.array_equal(optimized.get_frame(t), composition.get_frame(t))
+
+    # resizings merged, crop before resizing, only when asked for since the
+    # frames are resampled differently
+    resized = clip.with_effects(
+        [vfx.Resize(0.5), vfx.Resize(0.5), vfx.Crop(x1=2, y1=2, x2=10, y2=10)]
+    )
+    assert optimize(resized) == (resized, [])
+    optimized, changes = optimize(resized, resample=True)
+    assert changes == ["moved a crop before 2 resizings"]
+    assert optimized.get_frame(1).shape == (8, 8, 3)
+    resized = clip.with_effects([vfx.Resize(0.5)] * 3)
+    assert optimize(resized) == (resized, [])
+    optimized, changes = optimize(resized, resample=True)
+    assert changes == ["merged 3 resizings"]
+    assert optimized.size == (8, 6)
+
+    # resizing masks to their size rounds their frames
+    mask = ColorClip((64, 48), 0.3, is_mask=True, duration=1)
+    resized = mask.with_effects([vfx.Resize((64, 48))])
+    assert optimize(resized) == (resized, [])
+
+    assert optimize(clip) == (clip, [])
+
+
 if __name__ == "__main__":
     pytest.main()